@@ -1,14 +1,17 @@
 from __future__ import annotations
+import threading
 import pygame
 from llm_rpg.game.game_config import GameConfig
 from llm_rpg.scenes.factory import SceneFactory
 from llm_rpg.systems.hero.hero import Hero
-from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm import LLM, get_provider_llms
+from llm_rpg.llm.async_llm import default_event_loop
 
 from typing import TYPE_CHECKING
 from llm_rpg.scenes.scene import SceneTypes
 from llm_rpg.utils.theme import Theme
 from llm_rpg.systems.generation.enemy_generator import EnemyGenerator
+from llm_rpg.systems.generation.enemy_pool import EnemyPool
 
 if TYPE_CHECKING:
     from llm_rpg.scenes.scene import Scene
@@ -42,7 +45,23 @@ class Game:
             adjectives=self.config.enemy_generation_adjectives,
             places=self.config.enemy_generation_places,
             debug=self.config.debug_mode,
+            enemy_library=self.config.enemy_library,
+            library_reuse_ratio=self.config.enemy_library_reuse_ratio,
+            batch_size=self.config.enemy_generation_batch_size,
         )
+        self.enemy_pool = (
+            EnemyPool(self.enemy_generator, size=self.config.enemy_pool_size)
+            if self.config.enemy_pool_size > 0
+            else None
+        )
+        # a local judge runs its first forward pass here, llm judges do nothing
+        threading.Thread(
+            target=self._warmup_action_judge, daemon=True, name="judge-warmup"
+        ).start()
+        if self.config.sprite_generator_warmup:
+            threading.Thread(
+                target=self._warmup_sprite_generator, daemon=True, name="sprite-warmup"
+            ).start()
         # pygame initialization early so surfaces can convert properly
         pygame.init()
         pygame.display.set_caption("LLM RPG")
@@ -61,6 +80,20 @@ class Game:
         self.battles_won = 0
         self.llms = self._get_llms()
 
+    def _warmup_action_judge(self):
+        try:
+            self.action_judge.warmup()
+        except Exception as exc:
+            # the first judgment then pays for it instead
+            print(f"Action judge warmup failed: {exc}")
+
+    def _warmup_sprite_generator(self):
+        try:
+            self.config.sprite_generator.warmup()
+        except Exception as exc:
+            # the first enemy then loads the pipeline instead
+            print(f"Sprite generator warmup failed: {exc}")
+
     def _setup_fullscreen(self):
         display_info = pygame.display.Info()
         scale_x = display_info.current_w // self.DESIGN_WIDTH
@@ -79,6 +112,7 @@ class Game:
         self.screen = pygame.display.set_mode((window_width, window_height))
 
     def change_scene(self, scene_type: SceneTypes):
+        self.current_scene.close()
         if scene_type == SceneTypes.BATTLE:
             self.current_scene = self.scene_factory.get_battle_scene()
         elif scene_type == SceneTypes.RESTING_HUB:
@@ -93,17 +127,14 @@ class Game:
             raise ValueError(f"Tried to change to invalid scene: {scene_type}")
 
     def _get_llms(self) -> list[LLM]:
-        llms = []
-        for provider in [
-            self.action_judge,
-            self.action_narrator,
-            self.enemy_action_generator,
-            self.enemy_generator,
-        ]:
-            llm = getattr(provider, "llm", None)
-            if llm is not None:
-                llms.append(llm)
-        return llms
+        return get_provider_llms(
+            [
+                self.action_judge,
+                self.action_narrator,
+                self.enemy_action_generator,
+                self.enemy_generator,
+            ]
+        )
 
     def _get_total_llm_cost(self) -> float:
         return sum(llm.llm_cost_tracker.total_cost for llm in self.llms)
@@ -123,4 +154,13 @@ class Game:
             self.screen.blit(scaled, (0, 0))
             pygame.display.flip()
 
+        self.current_scene.close()
+        if self.enemy_pool is not None:
+            self.enemy_pool.close()
         print(f"Total llm cost $: {self._get_total_llm_cost()}")
+        if self.config.llm_metrics_export_path is not None:
+            self.config.llm_metrics.export_json(self.config.llm_metrics_export_path)
+        self.config.close()
+        if default_event_loop.is_running:
+            default_event_loop.run(self.config.aclose())
+            default_event_loop.stop()
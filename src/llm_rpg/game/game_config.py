@@ -1,6 +1,10 @@
 from functools import cached_property
+import hashlib
+import json
+import os
 from pathlib import Path
 from typing import Optional
+import warnings
 import yaml
 
 from llm_rpg.objects.character import Stats
@@ -9,13 +13,16 @@ from llm_rpg.objects.item import (
     DefenderStartingItem,
     FocusStartingItem,
 )
+from llm_rpg.systems.battle.battle_context import BattleContextBuilder
 from llm_rpg.systems.battle.damage_calculator import DamageCalculationConfig
 from llm_rpg.systems.battle.action_judges import (
     ActionJudge,
     LLMActionJudge,
     TransformersActionJudge,
 )
+from llm_rpg.systems.battle.action_judge_narrators import LLMActionJudgeNarrator
 from llm_rpg.systems.battle.action_narrators import ActionNarrator, LLMActionNarrator
+from llm_rpg.systems.battle.judgment_cache import CachedActionJudge
 from llm_rpg.systems.battle.enemy_action_generators import (
     EnemyActionGenerator,
     LLMEnemyActionGenerator,
@@ -25,9 +32,25 @@ from llm_rpg.systems.battle.enemy_scaling import (
     LevelScaling,
     LevelingAttributeProbs,
 )
+from llm_rpg.systems.generation.enemy_library import EnemyLibrary
 from llm_rpg.systems.hero.hero import HeroClass
-from llm_rpg.llm.llm import LLM, OllamaLLM, GroqLLM
+from llm_rpg.llm.async_llm import (
+    AsyncGroqLLM,
+    AsyncLLM,
+    AsyncOllamaLLM,
+    SyncLLMAdapter,
+)
+from llm_rpg.llm.cached_llm import CachedLLM, LLMResponseCache
+from llm_rpg.llm.hedged_llm import HedgedLLM
+from llm_rpg.llm.http_clients import HTTPClientLimits, OpenAIClientRegistry
+from llm_rpg.llm.fake_llm import Distribution, FakeLLM, LatencyProfile
+from llm_rpg.llm.llm import LLM, OllamaLLM, GroqLLM, OpenAICompatibleLLM
 from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+from llm_rpg.llm.rate_limiter import RateLimiter, RequestPriority
+from llm_rpg.llm.retry import RetryPolicy
+from llm_rpg.llm.router_llm import RouterLLM, RouterTarget
+from llm_rpg.llm.token_counter import get_token_counter
 from llm_rpg.sprite_generator.sprite_generator import (
     DummySpriteGenerator,
     SDSpriteGenerator,
@@ -35,6 +58,36 @@ from llm_rpg.sprite_generator.sprite_generator import (
 )
 from llm_rpg.ui.backgrounds import BattleBackgroundConfig
 
+LEAF_LLM_TYPES = ["ollama", "groq", "openai_compatible", "fake"]
+
+# llm block settings that do not change what a model generates
+NON_SEMANTIC_LLM_KEYS = {
+    "api_key_env",
+    "async",
+    "cache",
+    "ejection_s",
+    "hedge_after_s",
+    "keep_alive",
+    "keepalive_expiry_s",
+    "max_connections",
+    "max_error_rate",
+    "min_requests_for_ejection",
+    "retry",
+    "speed_multiplier",
+    "time_to_first_token_s",
+    "timeout_s",
+    "tokens_per_s",
+    "window_size",
+}
+
+LLM_CALL_SITE_PRIORITIES = {
+    "judge": RequestPriority.INTERACTIVE,
+    "narrator": RequestPriority.INTERACTIVE,
+    "enemy_action": RequestPriority.ENEMY_ACTION,
+    "enemy_generation": RequestPriority.BACKGROUND,
+    "sprite_prompt": RequestPriority.BACKGROUND,
+}
+
 
 class GameConfig:
     def __init__(self, config_path: str):
@@ -43,31 +96,244 @@ class GameConfig:
         self.game_root = self.config_dir.parent
         with open(self.config_path, "r") as file:
             self.game_config = yaml.safe_load(file)
+        self._llm_response_caches: dict[tuple[str, str], LLMResponseCache] = {}
+        self._async_llms: list[AsyncLLM] = []
+
+    def _build_async_llm(
+        self, llm_config: dict, llm_cost_tracker: LLMCostTracker
+    ) -> AsyncLLM:
+        async_llm = self._build_uncached_async_llm(llm_config, llm_cost_tracker)
+        self._async_llms.append(async_llm)
+        return async_llm
+
+    def _build_uncached_async_llm(
+        self, llm_config: dict, llm_cost_tracker: LLMCostTracker
+    ) -> AsyncLLM:
+        if llm_config["type"] == "ollama":
+            return AsyncOllamaLLM(
+                llm_cost_tracker=llm_cost_tracker,
+                model=llm_config["model"],
+                keep_alive=llm_config.get("keep_alive"),
+            )
+        if llm_config["type"] == "groq":
+            return AsyncGroqLLM(
+                llm_cost_tracker=llm_cost_tracker,
+                model=llm_config["model"],
+                client_registry=self.llm_client_registry,
+            )
+        raise ValueError(f"Unsupported LLM type: {llm_config['type']}")
+
+    def close(self):
+        self.llm_client_registry.close()
+        for cache in self._llm_response_caches.values():
+            cache.close()
+        self._llm_response_caches.clear()
+        # only close the enemy library if it was opened
+        if self.__dict__.get("enemy_library") is not None:
+            self.enemy_library.close()
+        if "sprite_generator" in self.__dict__:
+            self.sprite_generator.close()
+        # stops the batching thread of a local judge
+        if "action_judge" in self.__dict__:
+            self.action_judge.close()
+
+    async def aclose(self):
+        # must run on the event loop the async clients were used on
+        await self.llm_client_registry.aclose()
+        async_llms = list(self._async_llms)
+        self._async_llms.clear()
+        for async_llm in async_llms:
+            await async_llm.aclose()
+
+    def _get_llm_response_cache(self, cache_config: dict) -> LLMResponseCache:
+        if not isinstance(cache_config, dict) or "path" not in cache_config:
+            raise ValueError("llm.cache must include a path")
+        mode = cache_config.get("mode", "read_write")
+        if mode not in ["read_write", "replay"]:
+            raise ValueError(f"Unsupported llm.cache mode: {mode}")
+        path = self._resolve_path(cache_config["path"])
+        cache_key = (path, mode)
+        if cache_key not in self._llm_response_caches:
+            ttl_seconds = cache_config.get("ttl_seconds")
+            self._llm_response_caches[cache_key] = LLMResponseCache(
+                path=path,
+                max_entries=int(cache_config.get("max_entries", 10000)),
+                ttl_seconds=float(ttl_seconds) if ttl_seconds is not None else None,
+                read_only=mode == "replay",
+            )
+        return self._llm_response_caches[cache_key]
+
+    def _get_retry_policy(self, retry_config: Optional[dict]) -> RetryPolicy:
+        if retry_config is None:
+            return RetryPolicy()
+        if not isinstance(retry_config, dict):
+            raise ValueError("llm.retry must be a dict")
+        defaults = RetryPolicy()
+        policy = RetryPolicy(
+            max_transport_attempts=int(
+                retry_config.get(
+                    "max_transport_attempts", defaults.max_transport_attempts
+                )
+            ),
+            max_parse_attempts=int(
+                retry_config.get("max_parse_attempts", defaults.max_parse_attempts)
+            ),
+            base_delay_s=float(retry_config.get("base_delay_s", defaults.base_delay_s)),
+            max_delay_s=float(retry_config.get("max_delay_s", defaults.max_delay_s)),
+            jitter=bool(retry_config.get("jitter", defaults.jitter)),
+        )
+        if policy.max_transport_attempts < 1 or policy.max_parse_attempts < 1:
+            raise ValueError("llm.retry attempts must be at least 1")
+        return policy
 
-    def _build_llm(self, llm_config: dict) -> LLM:
+    def _build_llm(
+        self,
+        llm_config: dict,
+        call_site: str,
+        llm_cost_tracker: Optional[LLMCostTracker] = None,
+    ) -> LLM:
+        # nested llms of one section share a tracker so costs are reported together
+        llm_cost_tracker = llm_cost_tracker or LLMCostTracker()
+        if llm_config["type"] == "hedged":
+            llm = self._build_hedged_llm(llm_config, call_site, llm_cost_tracker)
+        elif llm_config["type"] == "router":
+            llm = self._build_router_llm(llm_config, call_site, llm_cost_tracker)
+        else:
+            llm = self._build_uncached_llm(llm_config, llm_cost_tracker)
+            llm.retry_policy = self._get_retry_policy(llm_config.get("retry"))
+            self._configure_leaf_llm(llm, llm_config["type"], call_site)
+        if "cache" in llm_config:
+            llm = CachedLLM(
+                llm=llm, cache=self._get_llm_response_cache(llm_config["cache"])
+            )
+        return llm
+
+    def _build_hedged_llm(
+        self,
+        llm_config: dict,
+        call_site: str,
+        llm_cost_tracker: LLMCostTracker,
+    ) -> HedgedLLM:
+        if "retry" in llm_config:
+            raise ValueError("llm.retry must be set on the primary and fallback llms")
+        hedge_after_s = float(llm_config.get("hedge_after_s", 2.0))
+        if hedge_after_s < 0:
+            raise ValueError("llm.hedge_after_s must be non-negative")
+        return HedgedLLM(
+            primary=self._build_llm(llm_config["primary"], call_site, llm_cost_tracker),
+            fallback=self._build_llm(
+                llm_config["fallback"], call_site, llm_cost_tracker
+            ),
+            hedge_after_s=hedge_after_s,
+        )
+
+    def _build_router_llm(
+        self,
+        llm_config: dict,
+        call_site: str,
+        llm_cost_tracker: LLMCostTracker,
+    ) -> RouterLLM:
+        if "retry" in llm_config:
+            raise ValueError("llm.retry must be set on the router targets")
+        window_size = int(llm_config.get("window_size", 20))
+        if window_size < 1:
+            raise ValueError("llm.window_size must be at least 1")
+        targets = [
+            RouterTarget(
+                llm=self._build_llm(target_config, call_site, llm_cost_tracker),
+                weight=float(target_config.get("weight", 1.0)),
+                window_size=window_size,
+            )
+            for target_config in llm_config["targets"]
+        ]
+        return RouterLLM(
+            targets=targets,
+            max_error_rate=float(llm_config.get("max_error_rate", 0.5)),
+            min_requests_for_ejection=int(
+                llm_config.get("min_requests_for_ejection", 3)
+            ),
+            ejection_s=float(llm_config.get("ejection_s", 30.0)),
+        )
+
+    def _configure_leaf_llm(self, llm: LLM, llm_type: str, call_site: str):
+        if isinstance(llm, SyncLLMAdapter):
+            llm = llm.async_llm
+        llm.rate_limiter = self.llm_rate_limiters.get(llm_type)
+        llm.priority = LLM_CALL_SITE_PRIORITIES[call_site]
+        llm.metrics = self.llm_metrics
+        llm.call_site = call_site
+
+    def _build_uncached_llm(
+        self, llm_config: dict, llm_cost_tracker: LLMCostTracker
+    ) -> LLM:
+        if llm_config.get("async", False):
+            return SyncLLMAdapter(
+                async_llm=self._build_async_llm(llm_config, llm_cost_tracker)
+            )
         if llm_config["type"] == "ollama":
             return OllamaLLM(
-                llm_cost_tracker=LLMCostTracker(),
+                llm_cost_tracker=llm_cost_tracker,
                 model=llm_config["model"],
+                keep_alive=llm_config.get("keep_alive"),
             )
         if llm_config["type"] == "groq":
             return GroqLLM(
-                llm_cost_tracker=LLMCostTracker(),
+                llm_cost_tracker=llm_cost_tracker,
+                model=llm_config["model"],
+                client_registry=self.llm_client_registry,
+            )
+        if llm_config["type"] == "openai_compatible":
+            if "base_url" not in llm_config:
+                raise ValueError("openai_compatible llm requires base_url")
+            api_key_env = llm_config.get("api_key_env")
+            api_key = os.environ.get(api_key_env) if api_key_env else None
+            return OpenAICompatibleLLM(
+                llm_cost_tracker=llm_cost_tracker,
                 model=llm_config["model"],
+                base_url=llm_config["base_url"],
+                api_key=api_key or "not-needed",
+                client_registry=self.llm_client_registry,
+            )
+        if llm_config["type"] == "fake":
+            return FakeLLM(
+                llm_cost_tracker=llm_cost_tracker,
+                model=llm_config["model"],
+                latency_profile=self._get_latency_profile(llm_config),
+                seed=int(llm_config.get("seed", 0)),
             )
         raise ValueError(f"Unsupported LLM type: {llm_config['type']}")
 
-    def _is_llm_block(self, block: dict) -> bool:
-        return (
-            "type" in block
-            and "model" in block
-            and block["type"]
-            in [
-                "ollama",
-                "groq",
-            ]
+    def _get_latency_profile(self, llm_config: dict) -> LatencyProfile:
+        defaults = LatencyProfile()
+        return LatencyProfile(
+            time_to_first_token_s=(
+                Distribution.from_config(llm_config["time_to_first_token_s"])
+                if "time_to_first_token_s" in llm_config
+                else defaults.time_to_first_token_s
+            ),
+            tokens_per_s=(
+                Distribution.from_config(llm_config["tokens_per_s"])
+                if "tokens_per_s" in llm_config
+                else defaults.tokens_per_s
+            ),
         )
 
+    def _is_llm_block(self, block: dict) -> bool:
+        if not isinstance(block, dict):
+            return False
+        if block.get("type") == "hedged":
+            return self._is_llm_block(block.get("primary")) and self._is_llm_block(
+                block.get("fallback")
+            )
+        if block.get("type") == "router":
+            targets = block.get("targets")
+            return (
+                isinstance(targets, list)
+                and len(targets) > 0
+                and all(self._is_llm_block(target) for target in targets)
+            )
+        return "type" in block and "model" in block and block["type"] in LEAF_LLM_TYPES
+
     def _extract_llm_block(self, block: dict) -> dict:
         if "llm" in block:
             return block["llm"]
@@ -97,6 +363,66 @@ class GameConfig:
             lines = [line.strip() for line in file.readlines()]
         return [line for line in lines if line and not line.startswith("#")]
 
+    @cached_property
+    def llm_client_registry(self) -> OpenAIClientRegistry:
+        section = self.game_config.get("llm_http_client", {})
+        if not isinstance(section, dict):
+            raise ValueError("llm_http_client must be a dict")
+        defaults = HTTPClientLimits()
+        limits = HTTPClientLimits(
+            max_connections=int(
+                section.get("max_connections", defaults.max_connections)
+            ),
+            max_keepalive_connections=int(
+                section.get(
+                    "max_keepalive_connections", defaults.max_keepalive_connections
+                )
+            ),
+            keepalive_expiry_s=float(
+                section.get("keepalive_expiry_s", defaults.keepalive_expiry_s)
+            ),
+            timeout_s=float(section.get("timeout_s", defaults.timeout_s)),
+        )
+        if limits.max_keepalive_connections > limits.max_connections:
+            raise ValueError(
+                "llm_http_client.max_keepalive_connections cannot exceed max_connections"
+            )
+        return OpenAIClientRegistry(limits=limits)
+
+    @cached_property
+    def llm_rate_limiters(self) -> dict[str, RateLimiter]:
+        section = self.game_config.get("llm_rate_limits", {})
+        if not isinstance(section, dict):
+            raise ValueError("llm_rate_limits must be a dict")
+        rate_limiters = {}
+        for llm_type, limits in section.items():
+            if llm_type not in LEAF_LLM_TYPES:
+                raise ValueError(f"Unsupported llm_rate_limits type: {llm_type}")
+            if not isinstance(limits, dict):
+                raise ValueError(f"llm_rate_limits.{llm_type} must be a dict")
+            requests_per_minute = limits.get("requests_per_minute")
+            tokens_per_minute = limits.get("tokens_per_minute")
+            rate_limiters[llm_type] = RateLimiter(
+                requests_per_minute=(
+                    float(requests_per_minute) if requests_per_minute else None
+                ),
+                tokens_per_minute=(
+                    float(tokens_per_minute) if tokens_per_minute else None
+                ),
+            )
+        return rate_limiters
+
+    @cached_property
+    def llm_metrics(self) -> LLMMetricsRegistry:
+        return LLMMetricsRegistry()
+
+    @cached_property
+    def llm_metrics_export_path(self) -> Optional[str]:
+        section = self.game_config.get("llm_metrics", {})
+        if not isinstance(section, dict):
+            raise ValueError("llm_metrics must be a dict")
+        return self._resolve_path(section.get("export_path"))
+
     @cached_property
     def debug_mode(self) -> bool:
         return self.game_config["debug_mode"]
@@ -106,6 +432,29 @@ class GameConfig:
         section = self.game_config.get("action_judge")
         if section is None:
             raise ValueError("Missing required config section 'action_judge'")
+        judge = self._build_action_judge(section)
+        cache_config = section.get("judgment_cache")
+        if cache_config is None:
+            return judge
+        if not isinstance(cache_config, dict):
+            raise ValueError("action_judge.judgment_cache must be a dict")
+        if isinstance(judge, ActionNarrator):
+            warnings.warn(
+                "action_judge.judgment_cache is ignored for a judge that also "
+                "narrates, a cache hit would repeat the cached narration",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            return judge
+        ttl_s = cache_config.get("ttl_s")
+        return CachedActionJudge(
+            judge=judge,
+            max_entries=int(cache_config.get("max_entries", 256)),
+            ttl_s=float(ttl_s) if ttl_s is not None else None,
+            metrics=self.llm_metrics,
+        )
+
+    def _build_action_judge(self, section: dict) -> ActionJudge:
         backend = section.get("backend")
         if backend is None:
             if self._is_llm_block(section) or "llm" in section:
@@ -116,22 +465,44 @@ class GameConfig:
             llm_config = self._extract_llm_block(section)
             if not self._is_llm_block(llm_config):
                 raise ValueError("action_judge.llm must include type/model")
-            llm = self._build_llm(llm_config)
+            llm = self._build_llm(llm_config, "judge")
             return LLMActionJudge(
-                llm=llm, prompt=self.action_judge_prompt, debug=self.debug_mode
+                llm=llm,
+                prompt=self.action_judge_prompt,
+                debug=self.debug_mode,
+                batch_size=self.action_judge_batch_size,
+            )
+        if backend == "judge_and_narrate":
+            llm_config = self._extract_llm_block(section)
+            if not self._is_llm_block(llm_config):
+                raise ValueError("action_judge.llm must include type/model")
+            llm = self._build_llm(llm_config, "judge")
+            return LLMActionJudgeNarrator(
+                llm=llm,
+                prompt=self.action_judge_and_narrate_prompt,
+                debug=self.debug_mode,
+                batch_size=self.action_judge_batch_size,
             )
         if backend == "transformers":
             model_name = section.get("model")
             if model_name is None:
                 raise ValueError("action_judge.model is required for transformers")
-            device = section.get("device", "cpu")
-            return TransformersActionJudge(model_name=model_name, device=device)
+            return TransformersActionJudge(
+                model_name=model_name,
+                device=section.get("device", "cpu"),
+                quantize=section.get("quantize", False),
+                max_length=section.get("max_length", 256),
+                max_batch_size=section.get("max_batch_size", 8),
+                max_batch_wait_s=section.get("max_batch_wait_s", 0.005),
+            )
         raise ValueError(f"Unsupported action_judge backend: {backend}")
 
     @cached_property
     def action_narrator(self) -> ActionNarrator:
+        if isinstance(self.action_judge, LLMActionJudgeNarrator):
+            return self.action_judge
         llm_config = self._get_llm_config("narrator")
-        llm = self._build_llm(llm_config)
+        llm = self._build_llm(llm_config, "narrator")
         return LLMActionNarrator(
             llm=llm, prompt=self.action_narration_prompt, debug=self.debug_mode
         )
@@ -139,15 +510,105 @@ class GameConfig:
     @cached_property
     def enemy_action_generator(self) -> EnemyActionGenerator:
         llm_config = self._get_llm_config("enemy_action")
-        llm = self._build_llm(llm_config)
+        llm = self._build_llm(llm_config, "enemy_action")
         return LLMEnemyActionGenerator(
             llm=llm, prompt=self.enemy_next_action_prompt, debug=self.debug_mode
         )
 
+    @cached_property
+    def hero_judgment_speculation_idle_s(self) -> Optional[float]:
+        idle_s = self.game_config["action_judge"].get("speculate_after_idle_s")
+        if idle_s is None:
+            return None
+        if float(idle_s) < 0:
+            raise ValueError("action_judge.speculate_after_idle_s must be non-negative")
+        return float(idle_s)
+
+    @cached_property
+    def enemy_action_speculation_enabled(self) -> bool:
+        return bool(self.game_config["enemy_action"].get("speculate", False))
+
     @cached_property
     def enemy_generation_llm(self) -> LLM:
         llm_config = self._get_llm_config("enemy_generation")
-        return self._build_llm(llm_config)
+        return self._build_llm(llm_config, "enemy_generation")
+
+    @cached_property
+    def action_judge_batch_size(self) -> int:
+        batch_size = self.game_config["action_judge"].get("batch_size", 8)
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("action_judge.batch_size must be a positive int")
+        return batch_size
+
+    @cached_property
+    def enemy_generation_batch_size(self) -> int:
+        section = self.game_config.get("enemy_generation", {})
+        batch_size = section.get("batch_size", 1)
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("enemy_generation.batch_size must be a positive int")
+        return batch_size
+
+    @cached_property
+    def enemy_pool_size(self) -> int:
+        pool_size = self.game_config.get("enemy_generation", {}).get("pool_size", 0)
+        if not isinstance(pool_size, int) or pool_size < 0:
+            raise ValueError("enemy_generation.pool_size must be a non-negative int")
+        return pool_size
+
+    def _normalize_llm_block(self, value: object) -> object:
+        # recurses into hedged primary/fallback and router targets
+        if isinstance(value, dict):
+            return {
+                key: self._normalize_llm_block(item)
+                for key, item in value.items()
+                if key not in NON_SEMANTIC_LLM_KEYS
+            }
+        if isinstance(value, list):
+            return [self._normalize_llm_block(item) for item in value]
+        return value
+
+    def _get_enemy_library_model_key(self) -> str:
+        # everything that changes how a stored enemy would be generated
+        llm_config = self._get_llm_config("enemy_generation")
+        sprite_section = dict(self.game_config.get("sprite_generator", {}))
+        for key in ["latency_seconds", "warmup"]:
+            sprite_section.pop(key, None)
+        if "prompt_llm" in sprite_section:
+            sprite_section["prompt_llm"] = self._normalize_llm_block(
+                sprite_section["prompt_llm"]
+            )
+        settings = {
+            "llm": self._normalize_llm_block(llm_config),
+            "prompt": self.enemy_generation_prompt,
+            "sprite_generator": sprite_section,
+        }
+        return hashlib.sha256(
+            json.dumps(settings, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @cached_property
+    def enemy_library(self) -> Optional[EnemyLibrary]:
+        library_config = self.game_config.get("enemy_generation", {}).get("library")
+        if library_config is None:
+            return None
+        if not isinstance(library_config, dict) or "path" not in library_config:
+            raise ValueError("enemy_generation.library must include a path")
+        return EnemyLibrary(
+            path=self._resolve_path(library_config["path"]),
+            model_key=self._get_enemy_library_model_key(),
+            sprites_dir=self._resolve_path(library_config.get("sprites_dir")),
+            max_entries=int(library_config.get("max_entries", 500)),
+        )
+
+    @cached_property
+    def enemy_library_reuse_ratio(self) -> float:
+        library_config = self.game_config.get("enemy_generation", {}).get("library")
+        if library_config is None:
+            return 0.0
+        reuse_ratio = float(library_config.get("reuse_ratio", 0.5))
+        if not 0 <= reuse_ratio <= 1:
+            raise ValueError("enemy_generation.library.reuse_ratio must be in [0, 1]")
+        return reuse_ratio
 
     def _get_enemy_generation_words(self, key: str) -> list[str]:
         section = self.game_config.get("enemy_generation", {})
@@ -340,18 +801,48 @@ class GameConfig:
     def creativity_word_overuse_threshold(self) -> int:
         return self.game_config["creativity_tracker"]["word_overuse_threshold"]
 
+    @cached_property
+    def battle_context_builder(self) -> Optional[BattleContextBuilder]:
+        section = self.game_config.get("battle_context")
+        if section is None:
+            return None
+        if not isinstance(section, dict):
+            raise ValueError("battle_context must be a dict")
+        token_budgets = section.get("token_budgets", {})
+        if not isinstance(token_budgets, dict):
+            raise ValueError("battle_context.token_budgets must be a dict")
+        unknown_call_sites = set(token_budgets) - {"judge", "narrator", "enemy_action"}
+        if unknown_call_sites:
+            raise ValueError(
+                "battle_context.token_budgets has unknown call sites: "
+                f"{sorted(unknown_call_sites)}"
+            )
+        if any(int(budget) < 1 for budget in token_budgets.values()):
+            raise ValueError("battle_context.token_budgets must be positive")
+        return BattleContextBuilder(
+            token_counter=get_token_counter(section.get("tokenizer")),
+            token_budgets={
+                call_site: int(budget) for call_site, budget in token_budgets.items()
+            },
+            max_events=int(section.get("max_events", 5)),
+        )
+
     @cached_property
     def hero_max_items(self) -> int:
         return self.game_config["hero"]["max_items"]
 
     @cached_property
-    def enemy_next_action_prompt(self) -> str:
+    def enemy_next_action_prompt(self) -> str | dict:
         return self.game_config["prompts"]["enemy_next_action"]
 
     @cached_property
-    def enemy_generation_prompt(self) -> str:
+    def enemy_generation_prompt(self) -> str | dict:
         return self.game_config["prompts"]["enemy_generation"]
 
+    @cached_property
+    def sprite_generator_warmup(self) -> bool:
+        return bool(self.game_config.get("sprite_generator", {}).get("warmup", False))
+
     @cached_property
     def sprite_generator(self) -> SpriteGenerator:
         section = self.game_config.get("sprite_generator")
@@ -372,7 +863,7 @@ class GameConfig:
             llm_block = section.get("prompt_llm")
             if not isinstance(llm_block, dict) or not self._is_llm_block(llm_block):
                 raise ValueError("sprite_generator.prompt_llm must include type/model")
-            prompt_llm = self._build_llm(llm_block)
+            prompt_llm = self._build_llm(llm_block, "sprite_prompt")
             prompt_template = section.get("prompt_template")
             if prompt_template is None:
                 raise ValueError("sprite_generator.prompt_template is required")
@@ -402,18 +893,27 @@ class GameConfig:
                 kwargs["use_lcm"] = bool(section.get("use_lcm"))
             if "negative_prompt" in section:
                 kwargs["negative_prompt"] = section.get("negative_prompt")
+            if "fuse_lora" in section:
+                kwargs["fuse_lora"] = bool(section.get("fuse_lora"))
             return SDSpriteGenerator(**kwargs)
         raise ValueError(f"Unsupported sprite_generator type: {generator_type}")
 
     @cached_property
-    def action_judge_prompt(self) -> str:
+    def action_judge_prompt(self) -> str | dict:
         prompts = self.game_config["prompts"]
         if "action_judge" in prompts:
             return prompts["action_judge"]
         return prompts["battle_ai_effect_determination"]
 
     @cached_property
-    def action_narration_prompt(self) -> str:
+    def action_judge_and_narrate_prompt(self) -> str | dict:
+        prompts = self.game_config["prompts"]
+        if "action_judge_and_narrate" in prompts:
+            return prompts["action_judge_and_narrate"]
+        raise ValueError("prompts.action_judge_and_narrate is required in config")
+
+    @cached_property
+    def action_narration_prompt(self) -> str | dict:
         prompts = self.game_config["prompts"]
         if "action_narration" in prompts:
             return prompts["action_narration"]
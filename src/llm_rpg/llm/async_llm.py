@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Optional, TypeVar
+
+import httpx
+from ollama import AsyncClient
+from pydantic import BaseModel
+
+from llm_rpg.llm.http_clients import OpenAIClientRegistry, default_client_registry
+from llm_rpg.llm.llm import (
+    GROQ_BASE_URL,
+    GROQ_PRICING,
+    LLM,
+    LLMRecordingMixin,
+    OllamaUsageMixin,
+    OpenAIUsageMixin,
+    build_chat_messages,
+    get_prompt_text,
+)
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.retry import acall_with_retry
+
+T = TypeVar("T")
+
+
+class AsyncLLM(LLMRecordingMixin, ABC):
+    async def agenerate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        return await self._acall_with_retry(
+            lambda: self._agenerate_completion(prompt, system_prompt),
+            get_prompt_text(prompt, system_prompt),
+        )
+
+    async def agenerate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        return await self._acall_with_retry(
+            lambda: self._agenerate_structured_completion(
+                prompt, output_model, system_prompt
+            ),
+            get_prompt_text(prompt, system_prompt),
+        )
+
+    async def _acall_with_retry(self, fn: Callable[[], Awaitable[T]], prompt: str) -> T:
+        fn = self._with_rate_limit(fn, prompt)
+        self._record_prompt_estimate(prompt)
+        start_time = time.perf_counter()
+        try:
+            if self.retry_policy is None:
+                result = await fn()
+            else:
+                result = await acall_with_retry(
+                    fn, self.retry_policy, on_retry=self._on_retry
+                )
+        except Exception:
+            self._record_request(start_time, success=False)
+            raise
+        self._record_request(start_time, success=True)
+        return result
+
+    def _with_rate_limit(
+        self, fn: Callable[[], Awaitable[T]], prompt: str
+    ) -> Callable[[], Awaitable[T]]:
+        if self.rate_limiter is None:
+            return fn
+
+        async def call() -> T:
+            # the limiter blocks, so wait for it off the event loop
+            await asyncio.to_thread(self._acquire_rate_limit, prompt)
+            return await fn()
+
+        return call
+
+    async def aclose(self):
+        pass
+
+    @abstractmethod
+    async def _agenerate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        pass
+
+    @abstractmethod
+    async def _agenerate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        pass
+
+
+class AsyncGroqLLM(OpenAIUsageMixin, AsyncLLM):
+    def __init__(
+        self,
+        llm_cost_tracker: LLMCostTracker,
+        model: str = "llama-3.3-70b-versatile",
+        client_registry: Optional[OpenAIClientRegistry] = None,
+    ):
+        if not os.environ.get("GROQ_API_KEY"):
+            raise ValueError("GROQ_API_KEY is not set")
+        client_registry = client_registry or default_client_registry
+        self.client = client_registry.get_async_client(
+            base_url=GROQ_BASE_URL,
+            api_key=os.environ.get("GROQ_API_KEY"),
+            max_retries=0,
+        )
+        self.model = model
+        self.pricing = GROQ_PRICING
+        self.llm_cost_tracker = llm_cost_tracker
+
+    async def _agenerate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=build_chat_messages(prompt, system_prompt),
+        )
+        self._calculate_completion_costs(response)
+        return response.choices[0].message.content
+
+    async def _agenerate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=build_chat_messages(prompt, system_prompt),
+            response_format={"type": "json_object"},
+        )
+        parsed_output = self._parse_structured_output(
+            response.choices[0].message.content, output_model
+        )
+        self._calculate_completion_costs(response)
+        return parsed_output
+
+
+class AsyncOllamaLLM(OllamaUsageMixin, AsyncLLM):
+    def __init__(
+        self,
+        llm_cost_tracker: LLMCostTracker,
+        model: str,
+        keep_alive: Optional[str | float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        # ollama's AsyncClient has no close of its own, so own the transport
+        # it sends through and close that instead
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.client = AsyncClient(transport=self.transport)
+        self.model = model
+        self.keep_alive = keep_alive
+        self.llm_cost_tracker = llm_cost_tracker
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    async def _agenerate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        response = await self.client.chat(
+            model=self.model,
+            messages=build_chat_messages(prompt, system_prompt),
+            think=False,
+            keep_alive=self.keep_alive,
+        )
+        self._calculate_completion_costs(response)
+        return response.message.content
+
+    async def _agenerate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        response = await self.client.chat(
+            model=self.model,
+            messages=build_chat_messages(prompt, system_prompt),
+            format=output_model.model_json_schema(),
+            think=False,
+            keep_alive=self.keep_alive,
+        )
+        parsed_output = self._parse_structured_output(
+            response.message.content, output_model
+        )
+        self._calculate_completion_costs(response)
+        return parsed_output
+
+
+class BackgroundEventLoop:
+    def __init__(self, name: str = "llm-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, daemon=True, name=self.name
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Cannot block on the LLM event loop from inside it")
+        return self.submit(coro).result()
+
+    def stop(self):
+        with self._lock:
+            loop = self._loop
+            thread = self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+default_event_loop = BackgroundEventLoop()
+
+
+class SyncLLMAdapter(LLM):
+    def __init__(
+        self,
+        async_llm: AsyncLLM,
+        event_loop: Optional[BackgroundEventLoop] = None,
+    ):
+        self.async_llm = async_llm
+        self.event_loop = event_loop or default_event_loop
+        self.model = getattr(async_llm, "model", None)
+        self.llm_cost_tracker = async_llm.llm_cost_tracker
+
+    @property
+    def provider(self) -> str:
+        return type(self.async_llm).__name__
+
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        return self.event_loop.run(
+            self.async_llm.agenerate_completion(prompt, system_prompt)
+        )
+
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        return self.event_loop.run(
+            self.async_llm.agenerate_structured_completion(
+                prompt, output_model, system_prompt
+            )
+        )
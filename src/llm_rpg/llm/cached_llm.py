@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional
+
+from pydantic import BaseModel
+
+from llm_rpg.llm.llm import LLM
+
+
+class LLMCacheMissError(ValueError):
+    pass
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        read_only: bool = False,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        if read_only:
+            if not Path(path).exists():
+                raise ValueError(f"LLM cache '{path}' does not exist for replay")
+            self._connection = sqlite3.connect(
+                f"file:{path}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, "
+                "response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_accessed_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        if self.read_only or self.ttl_seconds is None:
+            return False
+        return now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self._is_expired(created_at, now):
+                self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            if not self.read_only:
+                self._connection.execute(
+                    "UPDATE llm_cache SET last_accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+                self._connection.commit()
+            return response
+
+    def put(self, key: str, response: str):
+        if self.read_only:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, response, created_at, last_accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def _evict(self, now: float):
+        if self.ttl_seconds is not None:
+            self._connection.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+        (n_entries,) = self._connection.execute(
+            "SELECT COUNT(*) FROM llm_cache"
+        ).fetchone()
+        n_to_evict = n_entries - self.max_entries
+        if n_to_evict > 0:
+            self._connection.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_accessed_at ASC LIMIT ?)",
+                (n_to_evict,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (n_entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM llm_cache"
+            ).fetchone()
+        return n_entries
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CachedLLM(LLM):
+    def __init__(self, llm: LLM, cache: LLMResponseCache):
+        self.llm = llm
+        self.cache = cache
+        self.model = getattr(llm, "model", None)
+        self.llm_cost_tracker = llm.llm_cost_tracker
+
+    @property
+    def provider(self) -> str:
+        return self.llm.provider
+
+    @property
+    def generation_params(self) -> dict:
+        return self.llm.generation_params
+
+    def _get_key(
+        self,
+        prompt: str,
+        output_model: Optional[BaseModel] = None,
+        system_prompt: Optional[str] = None,
+    ) -> str:
+        schema_hash = None
+        if output_model is not None:
+            schema = json.dumps(output_model.model_json_schema(), sort_keys=True)
+            schema_hash = hashlib.sha256(schema.encode("utf-8")).hexdigest()
+        key_parts = {
+            "provider": self.llm.provider,
+            "model": self.model,
+            "prompt": prompt,
+            "system_prompt": system_prompt,
+            "schema_hash": schema_hash,
+            "generation_params": self.generation_params,
+        }
+        key_json = json.dumps(key_parts, sort_keys=True, default=str)
+        return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+    def _get_cached(self, key: str) -> Optional[str]:
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.llm_cost_tracker.add_cache_hit()
+            return cached
+        if self.cache.read_only:
+            raise LLMCacheMissError("No cached LLM response for prompt in replay mode")
+        return None
+
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        key = self._get_key(prompt, system_prompt=system_prompt)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+        output = self.llm.generate_completion(prompt, system_prompt)
+        self.cache.put(key, output)
+        return output
+
+    def _generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        key = self._get_key(prompt, system_prompt=system_prompt)
+        cached = self._get_cached(key)
+        if cached is not None:
+            yield cached
+            return
+        output = ""
+        for chunk in self.llm.generate_completion_stream(prompt, system_prompt):
+            output += chunk
+            yield chunk
+        self.cache.put(key, output)
+
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        key = self._get_key(prompt, output_model, system_prompt)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return output_model.model_validate_json(cached)
+        output = self.llm.generate_structured_completion(
+            prompt, output_model, system_prompt
+        )
+        self.cache.put(key, output.model_dump_json())
+        return output
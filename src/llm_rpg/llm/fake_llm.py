@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from pydantic import BaseModel
+
+from llm_rpg.llm.llm import LLM, get_prompt_text
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.rate_limiter import estimate_prompt_tokens
+
+FAKE_WORDS = [
+    "the",
+    "slime",
+    "swings",
+    "a",
+    "rusty",
+    "spoon",
+    "and",
+    "trips",
+    "over",
+    "its",
+    "own",
+    "shadow",
+    "while",
+    "hero",
+    "dodges",
+    "with",
+    "awkward",
+    "grace",
+    "suddenly",
+    "sparkles",
+]
+
+
+@dataclass(frozen=True)
+class Distribution:
+    kind: str = "fixed"
+    value: float = 0.0
+    low: float = 0.0
+    high: float = 0.0
+    mean: float = 0.0
+    stddev: float = 0.0
+    median: float = 0.0
+    sigma: float = 0.0
+
+    def __post_init__(self):
+        if self.kind not in ["fixed", "uniform", "normal", "lognormal"]:
+            raise ValueError(f"Unsupported distribution: {self.kind}")
+
+    @classmethod
+    def from_config(cls, config: dict | float) -> Distribution:
+        if isinstance(config, (int, float)):
+            return cls(kind="fixed", value=float(config))
+        if not isinstance(config, dict):
+            raise ValueError("Distribution config must be a number or a dict")
+        params = {key: float(value) for key, value in config.items() if key != "kind"}
+        return cls(kind=config.get("kind", "fixed"), **params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.low, self.high)
+        elif self.kind == "normal":
+            value = rng.gauss(self.mean, self.stddev)
+        elif self.kind == "lognormal":
+            value = self.median * rng.lognormvariate(0, self.sigma)
+        else:
+            value = self.value
+        return max(0.0, value)
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    time_to_first_token_s: Distribution = field(
+        default_factory=lambda: Distribution(kind="lognormal", median=0.3, sigma=0.5)
+    )
+    tokens_per_s: Distribution = field(
+        default_factory=lambda: Distribution(kind="normal", mean=250, stddev=50)
+    )
+
+    def sample(self, rng: random.Random) -> tuple[float, float]:
+        # clamp throughput so a bad sample cannot stall a load test forever
+        return (
+            self.time_to_first_token_s.sample(rng),
+            max(1.0, self.tokens_per_s.sample(rng)),
+        )
+
+
+def get_prompt_rng(prompt: str, seed: int) -> random.Random:
+    digest = hashlib.sha256(f"{seed}:{prompt}".encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def get_chunk_delay_s(chunk: str, tokens_per_s: float) -> float:
+    # same chars-per-token ratio as estimate_prompt_tokens, without rounding down
+    return len(chunk) / 4 / tokens_per_s
+
+
+def generate_fake_text(
+    rng: random.Random, min_words: int = 8, max_words: int = 24
+) -> str:
+    n_words = rng.randint(min_words, max_words)
+    words = [rng.choice(FAKE_WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def _generate_fake_string(schema: dict, rng: random.Random) -> str:
+    min_length = int(schema.get("minLength", 1))
+    max_length = int(schema.get("maxLength", 200))
+    text = generate_fake_text(rng, min_words=2, max_words=12)[:max_length].strip()
+    if len(text) < min_length:
+        text = text.ljust(min_length, "a")
+    return text
+
+
+def generate_fake_json(
+    schema: dict, rng: random.Random, defs: Optional[dict] = None
+) -> Any:
+    defs = schema.get("$defs", {}) if defs is None else defs
+    if "$ref" in schema:
+        return generate_fake_json(defs[schema["$ref"].split("/")[-1]], rng, defs)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return generate_fake_json(options[0] if options else {}, rng, defs)
+    schema_type = schema.get("type", "object")
+    if schema_type == "object":
+        properties = schema.get("properties", {})
+        return {
+            name: generate_fake_json(property_schema, rng, defs)
+            for name, property_schema in properties.items()
+        }
+    if schema_type == "array":
+        max_items = schema.get("maxItems")
+        min_items = int(
+            schema.get("minItems", 1 if max_items is None else min(1, max_items))
+        )
+        max_items = int(max_items) if max_items is not None else max(1, min_items)
+        if max_items < min_items:
+            raise ValueError("Array schema maxItems is smaller than minItems")
+        # a schema that pins the length, e.g. one judgment per case of a batch,
+        # must get exactly that many items
+        n_items = (
+            rng.randint(min_items, max_items) if min_items < max_items else max_items
+        )
+        return [
+            generate_fake_json(schema.get("items", {}), rng, defs)
+            for _ in range(n_items)
+        ]
+    if schema_type in ["integer", "number"]:
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", low + 10))
+        if schema_type == "integer":
+            return rng.randint(int(low), int(high))
+        return round(rng.uniform(low, high), 1)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    if schema_type == "string":
+        return _generate_fake_string(schema, rng)
+    return None
+
+
+class FakeLLM(LLM):
+    def __init__(
+        self,
+        llm_cost_tracker: LLMCostTracker,
+        model: str = "fake",
+        latency_profile: Optional[LatencyProfile] = None,
+        seed: int = 0,
+    ):
+        self.model = model
+        self.llm_cost_tracker = llm_cost_tracker
+        self.latency_profile = latency_profile or LatencyProfile()
+        self.seed = seed
+        # outputs depend only on the prompt, latencies come from one seeded stream
+        self._latency_rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _sample_latency(self) -> tuple[float, float]:
+        with self._lock:
+            return self.latency_profile.sample(self._latency_rng)
+
+    def _respond(self, prompt: str, output: str) -> str:
+        time_to_first_token_s, tokens_per_s = self._sample_latency()
+        time.sleep(time_to_first_token_s + get_chunk_delay_s(output, tokens_per_s))
+        self._record_usage(
+            estimate_prompt_tokens(prompt), estimate_prompt_tokens(output), 0, 0
+        )
+        return output
+
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        prompt = get_prompt_text(prompt, system_prompt)
+        output = generate_fake_text(get_prompt_rng(prompt, self.seed))
+        return self._respond(prompt, output)
+
+    def _generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        prompt = get_prompt_text(prompt, system_prompt)
+        start_time = time.perf_counter()
+        output = generate_fake_text(get_prompt_rng(prompt, self.seed))
+        time_to_first_token_s, tokens_per_s = self._sample_latency()
+        time.sleep(time_to_first_token_s)
+        words = output.split(" ")
+        chunks = []
+        try:
+            for i, word in enumerate(words):
+                chunk = word if i == 0 else f" {word}"
+                time.sleep(get_chunk_delay_s(chunk, tokens_per_s))
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            # a stream closed early is only charged for what it sent
+            self._record_usage(
+                estimate_prompt_tokens(prompt),
+                estimate_prompt_tokens("".join(chunks)),
+                0,
+                0,
+            )
+            self._record_stream_timing(
+                time_to_first_token_s=time_to_first_token_s,
+                total_latency_s=time.perf_counter() - start_time,
+            )
+
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        prompt = get_prompt_text(prompt, system_prompt)
+        output = generate_fake_json(
+            output_model.model_json_schema(), get_prompt_rng(prompt, self.seed)
+        )
+        self._respond(prompt, json.dumps(output))
+        return output_model.model_validate(output)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+from typing import Optional
+import uuid
+
+from llm_rpg.llm.fake_llm import (
+    Distribution,
+    LatencyProfile,
+    generate_fake_json,
+    generate_fake_text,
+    get_chunk_delay_s,
+    get_prompt_rng,
+)
+from llm_rpg.llm.rate_limiter import estimate_prompt_tokens
+
+
+def extract_json_schema(prompt: str) -> Optional[dict]:
+    # prompts end with the output schema appended as json, take the last one
+    decoder = json.JSONDecoder()
+    schema = None
+    index = prompt.find("{")
+    while index != -1:
+        try:
+            value, end = decoder.raw_decode(prompt, index)
+        except json.JSONDecodeError:
+            index = prompt.find("{", index + 1)
+            continue
+        if isinstance(value, dict) and "properties" in value:
+            schema = value
+        index = prompt.find("{", end)
+    return schema
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server: _FakeHTTPServer
+
+    def log_message(self, format: str, *args):
+        pass
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ["/v1/chat/completions", "/chat/completions"]:
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        messages = request.get("messages", [])
+        prompt = "\n".join(message.get("content") or "" for message in messages)
+        output = self.server.fake_server.generate_output(prompt, request)
+        time_to_first_token_s, tokens_per_s = self.server.fake_server.sample_latency()
+        usage = {
+            "prompt_tokens": estimate_prompt_tokens(prompt),
+            "completion_tokens": estimate_prompt_tokens(output),
+            "total_tokens": estimate_prompt_tokens(prompt)
+            + estimate_prompt_tokens(output),
+            "prompt_tokens_details": {
+                "cached_tokens": self.server.fake_server.get_cached_prompt_tokens(
+                    messages
+                )
+            },
+        }
+        model = request.get("model", "fake")
+        if request.get("stream"):
+            self._send_stream(model, output, usage, time_to_first_token_s, tokens_per_s)
+            return
+        time.sleep(time_to_first_token_s + get_chunk_delay_s(output, tokens_per_s))
+        self._send_json(
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": output},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+        )
+
+    def _send_json(self, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event(self, body: dict | str):
+        data = body if isinstance(body, str) else json.dumps(body)
+        self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_stream(
+        self,
+        model: str,
+        output: str,
+        usage: dict,
+        time_to_first_token_s: float,
+        tokens_per_s: float,
+    ):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None) -> dict:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+
+        time.sleep(time_to_first_token_s)
+        for i, word in enumerate(output.split(" ")):
+            content = word if i == 0 else f" {word}"
+            time.sleep(get_chunk_delay_s(content, tokens_per_s))
+            self._send_event(chunk({"content": content}))
+        self._send_event(chunk({}, finish_reason="stop"))
+        self._send_event(
+            {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            }
+        )
+        self._send_event("[DONE]")
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake_server: FakeOpenAIServer
+
+
+class FakeOpenAIServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_profile: Optional[LatencyProfile] = None,
+        seed: int = 0,
+    ):
+        self.latency_profile = latency_profile or LatencyProfile()
+        self.seed = seed
+        self._latency_rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._seen_system_prompts: set[str] = set()
+        self._httpd = _FakeHTTPServer((host, port), _FakeOpenAIHandler)
+        self._httpd.fake_server = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def sample_latency(self) -> tuple[float, float]:
+        with self._lock:
+            return self.latency_profile.sample(self._latency_rng)
+
+    def get_cached_prompt_tokens(self, messages: list[dict]) -> int:
+        # mimic a server with prefix caching: a repeated system message is free
+        if not messages or messages[0].get("role") != "system":
+            return 0
+        system_prompt = messages[0].get("content") or ""
+        with self._lock:
+            if system_prompt not in self._seen_system_prompts:
+                self._seen_system_prompts.add(system_prompt)
+                return 0
+        return estimate_prompt_tokens(system_prompt)
+
+    def generate_output(self, prompt: str, request: dict) -> str:
+        rng = get_prompt_rng(prompt, self.seed)
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            return json.dumps(generate_fake_json(schema, rng))
+        if response_format.get("type") == "json_object":
+            schema = extract_json_schema(prompt) or {}
+            return json.dumps(generate_fake_json(schema, rng))
+        return generate_fake_text(rng)
+
+    def start(self) -> FakeOpenAIServer:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, daemon=True, name="fake-openai-server"
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local OpenAI-compatible stand-in for load testing"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ttft-median-s", type=float, default=0.3)
+    parser.add_argument("--ttft-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-s-mean", type=float, default=250)
+    parser.add_argument("--tokens-per-s-stddev", type=float, default=50)
+    args = parser.parse_args()
+    latency_profile = LatencyProfile(
+        time_to_first_token_s=Distribution(
+            kind="lognormal", median=args.ttft_median_s, sigma=args.ttft_sigma
+        ),
+        tokens_per_s=Distribution(
+            kind="normal",
+            mean=args.tokens_per_s_mean,
+            stddev=args.tokens_per_s_stddev,
+        ),
+    )
+    server = FakeOpenAIServer(
+        host=args.host, port=args.port, latency_profile=latency_profile, seed=args.seed
+    )
+    print(f"Fake OpenAI-compatible server listening on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import Callable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from llm_rpg.llm.llm import LLM
+
+T = TypeVar("T")
+
+
+def _run_in_thread(fn: Callable[[], T], name: str) -> concurrent.futures.Future[T]:
+    # daemon threads so an abandoned request never blocks shutdown
+    future: concurrent.futures.Future[T] = concurrent.futures.Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, daemon=True, name=name).start()
+    return future
+
+
+def _close_stream(future: concurrent.futures.Future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    _, stream = future.result()
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
+
+
+class HedgedLLM(LLM):
+    def __init__(self, primary: LLM, fallback: LLM, hedge_after_s: float):
+        self.primary = primary
+        self.fallback = fallback
+        self.hedge_after_s = hedge_after_s
+        self.model = getattr(primary, "model", None)
+        self.llm_cost_tracker = primary.llm_cost_tracker
+
+    @property
+    def provider(self) -> str:
+        return (
+            f"{type(self).__name__}({self.primary.provider},{self.fallback.provider})"
+        )
+
+    def _hedge(
+        self,
+        call: Callable[[LLM], T],
+        on_loser: Optional[Callable[[concurrent.futures.Future], None]] = None,
+    ) -> T:
+        primary_future = _run_in_thread(lambda: call(self.primary), "llm-primary")
+        try:
+            return primary_future.result(timeout=self.hedge_after_s)
+        except concurrent.futures.TimeoutError:
+            self.llm_cost_tracker.add_hedge()
+        except Exception:
+            # the primary failed before the budget ran out, go straight to fallback
+            self.llm_cost_tracker.add_hedge()
+            result = call(self.fallback)
+            self.llm_cost_tracker.add_fallback_win()
+            return result
+
+        fallback_future = _run_in_thread(lambda: call(self.fallback), "llm-fallback")
+        pending = {primary_future, fallback_future}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                for loser in pending:
+                    # a blocking request that already started cannot be
+                    # aborted, it runs to completion and is still billed
+                    loser.cancel()
+                    if on_loser is not None:
+                        loser.add_done_callback(on_loser)
+                if future is fallback_future:
+                    self.llm_cost_tracker.add_fallback_win()
+                return future.result()
+        raise primary_future.exception()
+
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        return self._hedge(lambda llm: llm.generate_completion(prompt, system_prompt))
+
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        return self._hedge(
+            lambda llm: llm.generate_structured_completion(
+                prompt, output_model, system_prompt
+            )
+        )
+
+    def _generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        # hedge on the first chunk, then keep reading from whichever stream won
+        def start_stream(llm: LLM) -> tuple[Optional[str], Iterator[str]]:
+            stream = llm.generate_completion_stream(prompt, system_prompt)
+            return next(stream, None), stream
+
+        first_chunk, stream = self._hedge(start_stream, on_loser=_close_stream)
+        if first_chunk is None:
+            return
+        yield first_chunk
+        yield from stream
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+from typing import Any
+
+import httpx
+import openai
+
+
+@dataclass(frozen=True)
+class HTTPClientLimits:
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry_s: float = 30.0
+    timeout_s: float = 60.0
+
+
+class OpenAIClientRegistry:
+    def __init__(self, limits: HTTPClientLimits | None = None):
+        self.limits = limits or HTTPClientLimits()
+        self._clients: dict[tuple, openai.OpenAI] = {}
+        self._async_clients: dict[tuple, openai.AsyncOpenAI] = {}
+        self._lock = threading.Lock()
+
+    def _get_key(self, base_url: str, api_key: str, client_options: dict) -> tuple:
+        return (base_url, api_key, tuple(sorted(client_options.items())))
+
+    def _get_httpx_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.limits.max_connections,
+            max_keepalive_connections=self.limits.max_keepalive_connections,
+            keepalive_expiry=self.limits.keepalive_expiry_s,
+        )
+
+    def _build_http_client(self) -> httpx.Client:
+        return openai.DefaultHttpxClient(
+            limits=self._get_httpx_limits(),
+            timeout=httpx.Timeout(self.limits.timeout_s),
+        )
+
+    def _build_async_http_client(self) -> httpx.AsyncClient:
+        return openai.DefaultAsyncHttpxClient(
+            limits=self._get_httpx_limits(),
+            timeout=httpx.Timeout(self.limits.timeout_s),
+        )
+
+    def get_client(
+        self, base_url: str, api_key: str, **client_options: Any
+    ) -> openai.OpenAI:
+        key = self._get_key(base_url, api_key, client_options)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = openai.OpenAI(
+                    base_url=base_url,
+                    api_key=api_key,
+                    http_client=self._build_http_client(),
+                    **client_options,
+                )
+                self._clients[key] = client
+            return client
+
+    def get_async_client(
+        self, base_url: str, api_key: str, **client_options: Any
+    ) -> openai.AsyncOpenAI:
+        key = self._get_key(base_url, api_key, client_options)
+        with self._lock:
+            client = self._async_clients.get(key)
+            if client is None:
+                client = openai.AsyncOpenAI(
+                    base_url=base_url,
+                    api_key=api_key,
+                    http_client=self._build_async_http_client(),
+                    **client_options,
+                )
+                self._async_clients[key] = client
+            return client
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def aclose(self):
+        with self._lock:
+            clients = list(self._async_clients.values())
+            self._async_clients.clear()
+        for client in clients:
+            await client.close()
+
+
+default_client_registry = OpenAIClientRegistry()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Optional
+
+from pydantic import BaseModel, ValidationError
+
+CODE_FENCE_PATTERN = re.compile(r"```[a-zA-Z]*\s*(.*?)```", re.DOTALL)
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def strip_code_fences(text: str) -> str:
+    match = CODE_FENCE_PATTERN.search(text)
+    return match.group(1) if match else text
+
+
+def extract_first_json_object(text: str) -> Optional[str]:
+    start = text.find("{")
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    is_escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if is_escaped:
+                is_escaped = False
+            elif char == "\\":
+                is_escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+def remove_trailing_commas(text: str) -> str:
+    output = []
+    in_string = False
+    is_escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if is_escaped:
+                is_escaped = False
+            elif char == "\\":
+                is_escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            rest = text[i + 1 :].lstrip()
+            if rest[:1] in ["}", "]"]:
+                continue
+        output.append(char)
+    return "".join(output)
+
+
+def _coerce_numbers(value: Any, schema: dict, defs: dict) -> Any:
+    if "$ref" in schema:
+        return _coerce_numbers(value, defs[schema["$ref"].split("/")[-1]], defs)
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        return {
+            key: _coerce_numbers(item, properties.get(key, {}), defs)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_coerce_numbers(item, schema.get("items", {}), defs) for item in value]
+    if isinstance(value, str) and schema.get("type") in ["integer", "number"]:
+        # e.g. "7", "7/10" or "about 7.5"
+        match = NUMBER_PATTERN.search(value)
+        if match is None:
+            return value
+        number = float(match.group())
+        if schema["type"] == "integer" and number.is_integer():
+            return int(number)
+        return number
+    return value
+
+
+def repair_json(text: str, schema: Optional[dict] = None) -> Any:
+    candidate = extract_first_json_object(strip_code_fences(text))
+    if candidate is None:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+    value = json.loads(remove_trailing_commas(candidate))
+    if schema is not None:
+        value = _coerce_numbers(value, schema, schema.get("$defs", {}))
+    return value
+
+
+def parse_structured_output(
+    text: str, output_model: type[BaseModel]
+) -> tuple[BaseModel, bool]:
+    # returns the parsed output and whether the repair stage was needed
+    try:
+        return output_model.model_validate_json(text), False
+    except ValidationError as exc:
+        original_error = exc
+    try:
+        value = repair_json(text, output_model.model_json_schema())
+        return output_model.model_validate(value), True
+    except (ValidationError, json.JSONDecodeError):
+        raise original_error
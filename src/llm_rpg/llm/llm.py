@@ -1,125 +1,495 @@
 from abc import ABC, abstractmethod
+import time
+from typing import Callable, Iterator, Optional, TypeVar
 
 import openai
 import os
 
 from pydantic import BaseModel
 
+from llm_rpg.llm.http_clients import OpenAIClientRegistry, default_client_registry
+from llm_rpg.llm.json_repair import parse_structured_output
 from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+from llm_rpg.llm.rate_limiter import (
+    RateLimiter,
+    RequestPriority,
+    estimate_prompt_tokens,
+)
+from llm_rpg.llm.retry import LLMErrorKind, RetryPolicy, call_with_retry
 from ollama import chat
 from ollama import ChatResponse
 
+T = TypeVar("T")
+
+
+def get_prompt_text(prompt: str, system_prompt: Optional[str] = None) -> str:
+    return f"{system_prompt}\n{prompt}" if system_prompt else prompt
+
+
+def build_chat_messages(prompt: str, system_prompt: Optional[str] = None) -> list[dict]:
+    # a separate system message keeps the static instructions a stable prefix
+    # that servers with prefix caching can reuse across turns
+    messages = [{"role": "user", "content": prompt}]
+    if system_prompt:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    return messages
+
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+GROQ_PRICING = {
+    "llama-3.3-70b-versatile": {
+        "input_token_price": 0.59 / 1000000,
+        "output_token_price": 0.79 / 1000000,
+    },
+    "openai/gpt-oss-20b": {
+        "input_token_price": 0.075 / 1000000,
+        "output_token_price": 0.30 / 1000000,
+    },
+    "openai/gpt-oss-120b": {
+        "input_token_price": 0.15 / 1000000,
+        "output_token_price": 0.60 / 1000000,
+    },
+}
+
+
+class LLMRecordingMixin:
+    # cost, metrics and rate limit bookkeeping shared by the sync and async llms
+    retry_policy: Optional[RetryPolicy] = None
+    rate_limiter: Optional[RateLimiter] = None
+    priority: RequestPriority = RequestPriority.INTERACTIVE
+    metrics: Optional[LLMMetricsRegistry] = None
+    call_site: str = "unknown"
+
+    def _record_prompt_estimate(self, prompt: str):
+        if self.metrics is not None:
+            self.metrics.record_prompt_estimate(
+                self.call_site,
+                getattr(self, "model", None),
+                estimate_prompt_tokens(prompt),
+            )
+
+    def _record_request(self, start_time: float, success: bool):
+        if self.metrics is None:
+            return
+        self.metrics.record_request(
+            self.call_site,
+            getattr(self, "model", None),
+            latency_s=time.perf_counter() - start_time,
+            success=success,
+        )
+
+    def _acquire_rate_limit(self, prompt: str):
+        wait_s, queue_depth = self.rate_limiter.acquire(
+            self.priority, estimate_prompt_tokens(prompt)
+        )
+        self.llm_cost_tracker.add_rate_limit_wait(wait_s, queue_depth)
+
+    def _record_usage(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        input_cost: float,
+        output_cost: float,
+        cached_input_tokens: int = 0,
+    ):
+        self.llm_cost_tracker.add_cost(
+            input_tokens, output_tokens, input_cost, output_cost
+        )
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_tokens(input_tokens + output_tokens)
+        if self.metrics is not None:
+            self.metrics.record_usage(
+                self.call_site,
+                getattr(self, "model", None),
+                input_tokens,
+                output_tokens,
+                input_cost + output_cost,
+                cached_input_tokens=cached_input_tokens,
+            )
+
+    def _record_stream_timing(
+        self, time_to_first_token_s: Optional[float], total_latency_s: float
+    ):
+        self.llm_cost_tracker.add_stream_timing(
+            time_to_first_token_s=time_to_first_token_s,
+            total_latency_s=total_latency_s,
+        )
+        if self.metrics is not None and time_to_first_token_s is not None:
+            self.metrics.record_time_to_first_token(
+                self.call_site, getattr(self, "model", None), time_to_first_token_s
+            )
+
+    def _parse_structured_output(
+        self, content: str, output_model: BaseModel
+    ) -> BaseModel:
+        output, is_repaired = parse_structured_output(content, output_model)
+        if is_repaired:
+            self.llm_cost_tracker.add_repair()
+            if self.metrics is not None:
+                self.metrics.record_repair(self.call_site, getattr(self, "model", None))
+        return output
+
+    def _on_retry(self, kind: LLMErrorKind, exc: Exception, delay_s: float):
+        is_parse_error = kind == LLMErrorKind.PARSE
+        self.llm_cost_tracker.add_retry(is_parse_error=is_parse_error)
+        if self.metrics is not None:
+            self.metrics.record_retry(
+                self.call_site, getattr(self, "model", None), is_parse_error
+            )
+
+
+class LLM(LLMRecordingMixin, ABC):
+    def generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        return self._call_with_retry(
+            lambda: self._generate_completion(prompt, system_prompt),
+            get_prompt_text(prompt, system_prompt),
+        )
+
+    def generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        return self._call_with_retry(
+            lambda: self._generate_structured_completion(
+                prompt, output_model, system_prompt
+            ),
+            get_prompt_text(prompt, system_prompt),
+        )
+
+    def generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        # only the request up to the first chunk can be retried transparently
+        def start_stream() -> tuple[Optional[str], Iterator[str]]:
+            stream = iter(self._generate_completion_stream(prompt, system_prompt))
+            return next(stream, None), stream
+
+        start_time = time.perf_counter()
+        success = True
+        try:
+            first_chunk, stream = self._call_with_retry(
+                start_stream,
+                get_prompt_text(prompt, system_prompt),
+                record_request=False,
+            )
+            if first_chunk is not None:
+                yield first_chunk
+                yield from stream
+        except Exception:
+            success = False
+            raise
+        finally:
+            # also runs when the caller closes the stream early, e.g. a hedged
+            # loser, which still counts as a request that did not fail
+            self._record_request(start_time, success=success)
+
+    def _call_with_retry(
+        self, fn: Callable[[], T], prompt: str, record_request: bool = True
+    ) -> T:
+        fn = self._with_rate_limit(fn, prompt)
+        self._record_prompt_estimate(prompt)
+        start_time = time.perf_counter()
+        try:
+            if self.retry_policy is None:
+                result = fn()
+            else:
+                result = call_with_retry(fn, self.retry_policy, on_retry=self._on_retry)
+        except Exception:
+            if record_request:
+                self._record_request(start_time, success=False)
+            raise
+        if record_request:
+            self._record_request(start_time, success=True)
+        return result
+
+    def _with_rate_limit(self, fn: Callable[[], T], prompt: str) -> Callable[[], T]:
+        if self.rate_limiter is None:
+            return fn
+
+        def call() -> T:
+            self._acquire_rate_limit(prompt)
+            return fn()
+
+        return call
 
-class LLM(ABC):
     @abstractmethod
-    def generate_completion(self, prompt: str) -> str:
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
         pass
 
     @abstractmethod
-    def generate_structured_completion(
-        self, prompt: str, output_schema: BaseModel
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
     ) -> BaseModel:
         pass
 
+    def _generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        yield self._generate_completion(prompt, system_prompt)
+
+    @property
+    def provider(self) -> str:
+        return type(self).__name__
+
+    @property
+    def generation_params(self) -> dict:
+        return {}
+
+
+class OpenAIUsageMixin:
+    def _calculate_completion_costs(self, response: openai.types.Completion):
+        input_tokens = response.usage.prompt_tokens
+        completion_tokens = response.usage.completion_tokens
+        prompt_tokens_details = getattr(response.usage, "prompt_tokens_details", None)
+        cached_input_tokens = getattr(prompt_tokens_details, "cached_tokens", 0) or 0
+
+        model_pricing = self._get_model_pricing()
+        input_cost = input_tokens * model_pricing["input_token_price"]
+        completion_cost = completion_tokens * model_pricing["output_token_price"]
 
-class GroqLLM(LLM):
+        self._record_usage(
+            input_tokens,
+            completion_tokens,
+            input_cost,
+            completion_cost,
+            cached_input_tokens=cached_input_tokens,
+        )
+
+    def _estimate_completion_costs(self, prompt: str, output: str):
+        # a stream closed before its usage chunk only has the text to go on
+        input_tokens = estimate_prompt_tokens(prompt)
+        completion_tokens = estimate_prompt_tokens(output)
+        model_pricing = self._get_model_pricing()
+        self._record_usage(
+            input_tokens,
+            completion_tokens,
+            input_tokens * model_pricing["input_token_price"],
+            completion_tokens * model_pricing["output_token_price"],
+        )
+
+    def _get_model_pricing(self) -> dict:
+        # models without a price, e.g. a local server, are tracked at zero cost
+        return self.pricing.get(
+            self.model, {"input_token_price": 0, "output_token_price": 0}
+        )
+
+
+class OllamaUsageMixin:
+    def _calculate_completion_costs(self, response: ChatResponse):
+        # ollama only counts the prompt tokens it had to evaluate, so a reused
+        # kv cache prefix shows up as a lower (or missing) prompt_eval_count
+        input_tokens = response.prompt_eval_count or 0
+        completion_tokens = response.eval_count or 0
+
+        self._record_usage(input_tokens, completion_tokens, 0, 0)
+
+
+class OpenAICompatibleLLM(OpenAIUsageMixin, LLM):
     def __init__(
         self,
         llm_cost_tracker: LLMCostTracker,
-        model: str = "llama-3.3-70b-versatile",
+        model: str,
+        base_url: str,
+        api_key: str,
+        pricing: Optional[dict] = None,
+        client_registry: Optional[OpenAIClientRegistry] = None,
     ):
-        if not os.environ.get("GROQ_API_KEY"):
-            raise ValueError("GROQ_API_KEY is not set")
-        self.client = openai.OpenAI(
-            base_url="https://api.groq.com/openai/v1",
-            api_key=os.environ.get("GROQ_API_KEY"),
+        client_registry = client_registry or default_client_registry
+        self.client = client_registry.get_client(
+            base_url=base_url,
+            api_key=api_key,
+            max_retries=0,
         )
         self.model = model
-        self.pricing = {
-            "llama-3.3-70b-versatile": {
-                "input_token_price": 0.59 / 1000000,
-                "output_token_price": 0.79 / 1000000,
-            },
-            "openai/gpt-oss-20b": {
-                "input_token_price": 0.075 / 1000000,
-                "output_token_price": 0.30 / 1000000,
-            },
-            "openai/gpt-oss-120b": {
-                "input_token_price": 0.15 / 1000000,
-                "output_token_price": 0.60 / 1000000,
-            },
-        }
+        self.pricing = pricing or {}
         self.llm_cost_tracker = llm_cost_tracker
 
-    def generate_completion(self, prompt: str) -> str:
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=build_chat_messages(prompt, system_prompt),
         )
         self._calculate_completion_costs(response)
         return response.choices[0].message.content
 
-    def _calculate_completion_costs(self, response: openai.types.Completion):
-        input_tokens = response.usage.prompt_tokens
-        completion_tokens = response.usage.completion_tokens
-
-        input_cost = input_tokens * self.pricing[self.model]["input_token_price"]
-        completion_cost = (
-            completion_tokens * self.pricing[self.model]["output_token_price"]
-        )
-
-        self.llm_cost_tracker.add_cost(
-            input_tokens, completion_tokens, input_cost, completion_cost
+    def _generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        start_time = time.perf_counter()
+        time_to_first_token_s = None
+        chunks = []
+        is_usage_recorded = False
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=build_chat_messages(prompt, system_prompt),
+            stream=True,
+            stream_options={"include_usage": True},
         )
+        try:
+            for chunk in stream:
+                if chunk.usage is not None:
+                    self._calculate_completion_costs(chunk)
+                    is_usage_recorded = True
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                if time_to_first_token_s is None:
+                    time_to_first_token_s = time.perf_counter() - start_time
+                chunks.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+            if not is_usage_recorded:
+                self._estimate_completion_costs(
+                    get_prompt_text(prompt, system_prompt), "".join(chunks)
+                )
+            self._record_stream_timing(
+                time_to_first_token_s=time_to_first_token_s,
+                total_latency_s=time.perf_counter() - start_time,
+            )
 
-    def generate_structured_completion(
-        self, prompt: str, output_model: BaseModel
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
     ) -> BaseModel:
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=build_chat_messages(prompt, system_prompt),
             response_format={"type": "json_object"},
         )
-        parsed_output = output_model.model_validate_json(
-            response.choices[0].message.content
+        parsed_output = self._parse_structured_output(
+            response.choices[0].message.content, output_model
         )
         self._calculate_completion_costs(response)
         return parsed_output
 
 
-class OllamaLLM(LLM):
+class GroqLLM(OpenAICompatibleLLM):
+    def __init__(
+        self,
+        llm_cost_tracker: LLMCostTracker,
+        model: str = "llama-3.3-70b-versatile",
+        client_registry: Optional[OpenAIClientRegistry] = None,
+    ):
+        if not os.environ.get("GROQ_API_KEY"):
+            raise ValueError("GROQ_API_KEY is not set")
+        super().__init__(
+            llm_cost_tracker=llm_cost_tracker,
+            model=model,
+            base_url=GROQ_BASE_URL,
+            api_key=os.environ.get("GROQ_API_KEY"),
+            pricing=GROQ_PRICING,
+            client_registry=client_registry,
+        )
+
+
+class OllamaLLM(OllamaUsageMixin, LLM):
     def __init__(
         self,
         llm_cost_tracker: LLMCostTracker,
         model: str,
+        keep_alive: Optional[str | float] = None,
     ):
         self.model = model
+        self.keep_alive = keep_alive
         self.llm_cost_tracker = llm_cost_tracker
 
-    def _calculate_completion_costs(self, response: ChatResponse):
-        input_tokens = response.prompt_eval_count
-        completion_tokens = response.eval_count
-
-        self.llm_cost_tracker.add_cost(input_tokens, completion_tokens, 0, 0)
+    @property
+    def generation_params(self) -> dict:
+        return {"think": False}
 
-    def generate_completion(self, prompt: str) -> str:
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
         response = chat(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=build_chat_messages(prompt, system_prompt),
             think=False,
+            keep_alive=self.keep_alive,
         )
         self._calculate_completion_costs(response)
         return response.message.content
 
-    def generate_structured_completion(
-        self, prompt: str, output_model: BaseModel
+    def _generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        start_time = time.perf_counter()
+        time_to_first_token_s = None
+        chunks = []
+        is_usage_recorded = False
+        stream = chat(
+            model=self.model,
+            messages=build_chat_messages(prompt, system_prompt),
+            think=False,
+            keep_alive=self.keep_alive,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                if chunk.done:
+                    self._calculate_completion_costs(chunk)
+                    is_usage_recorded = True
+                if not chunk.message.content:
+                    continue
+                if time_to_first_token_s is None:
+                    time_to_first_token_s = time.perf_counter() - start_time
+                chunks.append(chunk.message.content)
+                yield chunk.message.content
+        finally:
+            # closing the generator also closes ollama's http response
+            stream.close()
+            if not is_usage_recorded:
+                self._record_usage(
+                    estimate_prompt_tokens(get_prompt_text(prompt, system_prompt)),
+                    estimate_prompt_tokens("".join(chunks)),
+                    0,
+                    0,
+                )
+            self._record_stream_timing(
+                time_to_first_token_s=time_to_first_token_s,
+                total_latency_s=time.perf_counter() - start_time,
+            )
+
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
     ) -> BaseModel:
         response = chat(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=build_chat_messages(prompt, system_prompt),
             format=output_model.model_json_schema(),
             think=False,
+            keep_alive=self.keep_alive,
+        )
+        parsed_output = self._parse_structured_output(
+            response.message.content, output_model
         )
-        parsed_output = output_model.model_validate_json(response.message.content)
         self._calculate_completion_costs(response)
         return parsed_output
+
+
+def get_provider_llms(providers: list[object]) -> list[LLM]:
+    # a provider may be shared between roles, e.g. the judge that also narrates,
+    # its llm must only be counted once
+    llms: list[LLM] = []
+    for provider in providers:
+        llm = getattr(provider, "llm", None)
+        if llm is not None and all(llm is not seen for seen in llms):
+            llms.append(llm)
+    return llms
@@ -1,11 +1,27 @@
+import threading
+
+
 class LLMCostTracker:
     def __init__(self):
+        # llm calls run on the battle state worker threads
+        self._lock = threading.RLock()
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_input_cost = 0
         self.total_output_cost = 0
         self.total_cost = 0
         self.total_requests = 0
+        self.total_cache_hits = 0
+        self.total_parse_retries = 0
+        self.total_transport_retries = 0
+        self.total_repaired_outputs = 0
+        self.total_hedged_requests = 0
+        self.total_fallback_wins = 0
+        self.total_router_ejections = 0
+        self.total_rate_limit_wait_s = 0.0
+        self.max_rate_limit_queue_depth = 0
+        self.time_to_first_token_s: list[float] = []
+        self.stream_latency_s: list[float] = []
 
     def add_cost(
         self,
@@ -14,18 +30,79 @@ class LLMCostTracker:
         input_cost: float,
         output_cost: float,
     ):
-        self.total_input_tokens += input_tokens
-        self.total_output_tokens += output_tokens
-        self.total_input_cost += input_cost
-        self.total_output_cost += output_cost
-        self.total_cost += input_cost + output_cost
-        self.total_requests += 1
+        with self._lock:
+            self.total_input_tokens += input_tokens
+            self.total_output_tokens += output_tokens
+            self.total_input_cost += input_cost
+            self.total_output_cost += output_cost
+            self.total_cost += input_cost + output_cost
+            self.total_requests += 1
+
+    def add_cache_hit(self):
+        with self._lock:
+            self.add_cost(0, 0, 0, 0)
+            self.total_cache_hits += 1
+
+    def add_retry(self, is_parse_error: bool):
+        with self._lock:
+            if is_parse_error:
+                self.total_parse_retries += 1
+            else:
+                self.total_transport_retries += 1
+
+    def add_repair(self):
+        with self._lock:
+            self.total_repaired_outputs += 1
+
+    def add_hedge(self):
+        with self._lock:
+            self.total_hedged_requests += 1
+
+    def add_fallback_win(self):
+        with self._lock:
+            self.total_fallback_wins += 1
+
+    def add_router_ejection(self):
+        with self._lock:
+            self.total_router_ejections += 1
+
+    def add_rate_limit_wait(self, wait_s: float, queue_depth: int):
+        with self._lock:
+            self.total_rate_limit_wait_s += wait_s
+            self.max_rate_limit_queue_depth = max(
+                self.max_rate_limit_queue_depth, queue_depth
+            )
+
+    def add_stream_timing(
+        self,
+        time_to_first_token_s: float | None,
+        total_latency_s: float,
+    ):
+        with self._lock:
+            if time_to_first_token_s is not None:
+                self.time_to_first_token_s.append(time_to_first_token_s)
+            self.stream_latency_s.append(total_latency_s)
 
     def display_costs(self):
         print(f"Total requests: {self.total_requests}")
+        print(f"Total cache hits: {self.total_cache_hits}")
+        print(f"Total parse retries: {self.total_parse_retries}")
+        print(f"Total transport retries: {self.total_transport_retries}")
+        print(f"Total repaired outputs: {self.total_repaired_outputs}")
+        print(f"Total hedged requests: {self.total_hedged_requests}")
+        print(f"Total fallback wins: {self.total_fallback_wins}")
+        print(f"Total router ejections: {self.total_router_ejections}")
+        print(f"Total rate limit wait: {self.total_rate_limit_wait_s:.3f}s")
+        print(f"Max rate limit queue depth: {self.max_rate_limit_queue_depth}")
         print(f"Total input tokens: {self.total_input_tokens}")
         print(f"Total output tokens: {self.total_output_tokens}")
         print(f"Total tokens: {self.total_input_tokens + self.total_output_tokens}")
         print(f"Total input cost: ${self.total_input_cost:.6f}")
         print(f"Total output cost: ${self.total_output_cost:.6f}")
         print(f"Total cost: ${self.total_cost:.6f}")
+        if self.stream_latency_s:
+            avg_latency = sum(self.stream_latency_s) / len(self.stream_latency_s)
+            print(f"Average stream latency: {avg_latency:.3f}s")
+        if self.time_to_first_token_s:
+            avg_ttft = sum(self.time_to_first_token_s) / len(self.time_to_first_token_s)
+            print(f"Average time to first token: {avg_ttft:.3f}s")
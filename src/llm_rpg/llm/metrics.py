@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timezone
+import json
+import math
+from pathlib import Path
+import threading
+from typing import Optional
+
+
+def get_percentile(values: list[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _summarize(values: deque[float]) -> dict:
+    samples = list(values)
+    return {
+        "count": len(samples),
+        "mean": sum(samples) / len(samples) if samples else None,
+        "p50": get_percentile(samples, 50),
+        "p95": get_percentile(samples, 95),
+        "p99": get_percentile(samples, 99),
+    }
+
+
+class _CallSiteMetrics:
+    def __init__(self, max_samples: int):
+        self.requests = 0
+        self.failures = 0
+        self.parse_retries = 0
+        self.transport_retries = 0
+        self.repaired_outputs = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.speculations: dict[str, int] = {
+            "started": 0,
+            "hits": 0,
+            "misses": 0,
+            "cancelled": 0,
+        }
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_input_tokens = 0
+        self.cost = 0.0
+        self.total_latency_s = 0.0
+        self.latency_s: deque[float] = deque(maxlen=max_samples)
+        self.time_to_first_token_s: deque[float] = deque(maxlen=max_samples)
+        self.estimated_prompt_tokens: deque[float] = deque(maxlen=max_samples)
+        self.evaluated_prompt_tokens: deque[float] = deque(maxlen=max_samples)
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "parse_retries": self.parse_retries,
+            "transport_retries": self.transport_retries,
+            "repaired_outputs": self.repaired_outputs,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": (
+                self.cache_hits / (self.cache_hits + self.cache_misses)
+                if self.cache_hits + self.cache_misses > 0
+                else None
+            ),
+            # speculative requests are also counted in requests and cost,
+            # started minus hits is what speculation wasted
+            "speculations": dict(self.speculations),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "cost": self.cost,
+            "tokens_per_s": (
+                self.output_tokens / self.total_latency_s
+                if self.total_latency_s > 0
+                else None
+            ),
+            "latency_s": _summarize(self.latency_s),
+            "time_to_first_token_s": _summarize(self.time_to_first_token_s),
+            "estimated_prompt_tokens": _summarize(self.estimated_prompt_tokens),
+            # prompt tokens the server had to prefill (ollama prompt_eval_count),
+            # compare across prompt layouts to see the prefix cache savings
+            "evaluated_prompt_tokens": _summarize(self.evaluated_prompt_tokens),
+        }
+
+
+class LLMMetricsRegistry:
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._metrics: dict[tuple[str, str], _CallSiteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, call_site: str, model: Optional[str]) -> _CallSiteMetrics:
+        key = (call_site, str(model))
+        if key not in self._metrics:
+            self._metrics[key] = _CallSiteMetrics(self.max_samples)
+        return self._metrics[key]
+
+    def record_request(
+        self,
+        call_site: str,
+        model: Optional[str],
+        latency_s: float,
+        success: bool = True,
+    ):
+        with self._lock:
+            metrics = self._get(call_site, model)
+            metrics.requests += 1
+            if not success:
+                metrics.failures += 1
+                return
+            metrics.latency_s.append(latency_s)
+            metrics.total_latency_s += latency_s
+
+    def record_usage(
+        self,
+        call_site: str,
+        model: Optional[str],
+        input_tokens: int,
+        output_tokens: int,
+        cost: float,
+        cached_input_tokens: int = 0,
+    ):
+        with self._lock:
+            metrics = self._get(call_site, model)
+            metrics.input_tokens += input_tokens or 0
+            metrics.output_tokens += output_tokens or 0
+            metrics.cached_input_tokens += cached_input_tokens or 0
+            metrics.evaluated_prompt_tokens.append(
+                (input_tokens or 0) - (cached_input_tokens or 0)
+            )
+            metrics.cost += cost
+
+    def record_retry(self, call_site: str, model: Optional[str], is_parse_error: bool):
+        with self._lock:
+            metrics = self._get(call_site, model)
+            if is_parse_error:
+                metrics.parse_retries += 1
+            else:
+                metrics.transport_retries += 1
+
+    def record_repair(self, call_site: str, model: Optional[str]):
+        with self._lock:
+            self._get(call_site, model).repaired_outputs += 1
+
+    def record_cache_lookup(self, call_site: str, model: Optional[str], is_hit: bool):
+        with self._lock:
+            metrics = self._get(call_site, model)
+            if is_hit:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+
+    def record_speculation(self, call_site: str, model: Optional[str], outcome: str):
+        with self._lock:
+            metrics = self._get(call_site, model)
+            if outcome not in metrics.speculations:
+                raise ValueError(f"Unknown speculation outcome '{outcome}'")
+            metrics.speculations[outcome] += 1
+
+    def record_time_to_first_token(
+        self, call_site: str, model: Optional[str], time_to_first_token_s: float
+    ):
+        with self._lock:
+            self._get(call_site, model).time_to_first_token_s.append(
+                time_to_first_token_s
+            )
+
+    def record_prompt_estimate(
+        self, call_site: str, model: Optional[str], estimated_tokens: int
+    ):
+        with self._lock:
+            self._get(call_site, model).estimated_prompt_tokens.append(estimated_tokens)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            call_sites: dict[str, dict] = {}
+            for (call_site, model), metrics in sorted(self._metrics.items()):
+                call_sites.setdefault(call_site, {})[model] = metrics.snapshot()
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "call_sites": call_sites,
+        }
+
+    def export_json(self, path: str):
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import concurrent.futures
+import queue
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+InputT = TypeVar("InputT")
+OutputT = TypeVar("OutputT")
+
+
+class MicroBatcher(Generic[InputT, OutputT]):
+    # collects concurrent requests for max_wait_s into one call of process_batch
+    def __init__(
+        self,
+        process_batch: Callable[[list[InputT]], list[OutputT]],
+        max_batch_size: int = 8,
+        max_wait_s: float = 0.005,
+        name: str = "micro-batcher",
+    ):
+        if max_batch_size < 1:
+            raise ValueError("Micro batcher max_batch_size must be at least 1")
+        if max_wait_s < 0:
+            raise ValueError("Micro batcher max_wait_s must be non-negative")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_s
+        self._queue: queue.Queue[
+            Optional[tuple[InputT, concurrent.futures.Future[OutputT]]]
+        ] = queue.Queue()
+        self._is_closed = False
+        self.n_batches = 0
+        self.n_requests = 0
+        self._worker = threading.Thread(target=self._run, daemon=True, name=name)
+        self._worker.start()
+
+    @property
+    def mean_batch_size(self) -> Optional[float]:
+        return self.n_requests / self.n_batches if self.n_batches else None
+
+    def submit(self, item: InputT) -> concurrent.futures.Future[OutputT]:
+        if self._is_closed:
+            raise ValueError("Micro batcher is closed")
+        future: concurrent.futures.Future[OutputT] = concurrent.futures.Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: InputT) -> OutputT:
+        return self.submit(item).result()
+
+    def close(self):
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(
+        self, first: tuple[InputT, concurrent.futures.Future[OutputT]]
+    ) -> tuple[list[tuple[InputT, concurrent.futures.Future[OutputT]]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining_s = deadline - time.monotonic()
+            try:
+                request = (
+                    self._queue.get(timeout=remaining_s)
+                    if remaining_s > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _run(self):
+        is_closing = False
+        while not is_closing:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, is_closing = self._collect(first)
+            self.n_batches += 1
+            self.n_requests += len(batch)
+            try:
+                outputs = self.process_batch([item for item, _ in batch])
+                if len(outputs) != len(batch):
+                    raise ValueError(
+                        f"Expected {len(batch)} batch outputs, got {len(outputs)}"
+                    )
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
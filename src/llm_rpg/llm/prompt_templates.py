@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import json
+from string import Formatter
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel
+
+from llm_rpg.llm.rate_limiter import estimate_prompt_tokens
+
+
+@lru_cache(maxsize=None)
+def get_schema_block(output_model: type[BaseModel]) -> str:
+    return json.dumps(output_model.model_json_schema(), indent=2)
+
+
+class PromptTemplate:
+    def __init__(
+        self,
+        template: str,
+        name: str,
+        allowed_fields: Iterable[str],
+        required_fields: Iterable[str] = (),
+        output_model: Optional[type[BaseModel]] = None,
+        system_template: Optional[str] = None,
+    ):
+        self.template = template
+        self.name = name
+        self.output_model = output_model
+        self.system_template = system_template
+        self._segments = self._parse(template)
+        self.fields = {field for _, field, _, _ in self._segments if field is not None}
+        unknown_fields = self.fields - set(allowed_fields)
+        if unknown_fields:
+            raise ValueError(
+                f"Prompt '{name}' has unknown placeholders: {sorted(unknown_fields)}"
+            )
+        missing_fields = set(required_fields) - self.fields
+        if missing_fields:
+            raise ValueError(
+                f"Prompt '{name}' is missing placeholders: {sorted(missing_fields)}"
+            )
+        schema_block = get_schema_block(output_model) if output_model else ""
+        self.system_prompt: Optional[str] = None
+        self._suffix = schema_block
+        if system_template is not None:
+            # the system message is sent verbatim every turn so it can be served
+            # from the prefix cache, per-turn values belong in the user template
+            system_segments = self._parse(system_template)
+            system_fields = {field for _, field, _, _ in system_segments if field}
+            if system_fields:
+                raise ValueError(
+                    f"Prompt '{name}' system part must be static, "
+                    f"found placeholders: {sorted(system_fields)}"
+                )
+            self.system_prompt = (
+                "".join(literal for literal, _, _, _ in system_segments) + schema_block
+            )
+            self._suffix = ""
+        self.static_token_estimate = estimate_prompt_tokens(
+            "".join(literal for literal, _, _, _ in self._segments)
+            + self._suffix
+            + (self.system_prompt or "")
+        )
+
+    @classmethod
+    def from_config(
+        cls,
+        config: str | dict,
+        name: str,
+        allowed_fields: Iterable[str],
+        required_fields: Iterable[str] = (),
+        output_model: Optional[type[BaseModel]] = None,
+    ) -> PromptTemplate:
+        if isinstance(config, str):
+            return cls(
+                config,
+                name=name,
+                allowed_fields=allowed_fields,
+                required_fields=required_fields,
+                output_model=output_model,
+            )
+        if not isinstance(config, dict) or set(config) != {"system", "user"}:
+            raise ValueError(
+                f"Prompt '{name}' must be a string or a dict with system and user"
+            )
+        return cls(
+            config["user"],
+            name=name,
+            allowed_fields=allowed_fields,
+            required_fields=required_fields,
+            output_model=output_model,
+            system_template=config["system"],
+        )
+
+    def _parse(
+        self, template: str
+    ) -> list[tuple[str, Optional[str], str, Optional[str]]]:
+        try:
+            segments = list(Formatter().parse(template))
+        except ValueError as exc:
+            raise ValueError(f"Prompt '{self.name}' is not a valid template") from exc
+        for _, field, format_spec, _ in segments:
+            if field is not None and not field.isidentifier():
+                raise ValueError(
+                    f"Prompt '{self.name}' placeholder '{{{field}}}' must be a plain name"
+                )
+            if format_spec and "{" in format_spec:
+                raise ValueError(
+                    f"Prompt '{self.name}' does not support nested placeholders"
+                )
+        return [
+            (literal, field, format_spec or "", conversion)
+            for literal, field, format_spec, conversion in segments
+        ]
+
+    def render(self, **values: Any) -> str:
+        return self._render_body(values) + self._suffix
+
+    def render_cases(self, header: str, cases: list[dict[str, Any]]) -> str:
+        # several renders in one prompt, the schema is only appended once
+        rendered_cases = [
+            f"Case {i}:\n{self._render_body(values)}"
+            for i, values in enumerate(cases, start=1)
+        ]
+        return "\n\n".join([header, *rendered_cases]) + self._suffix
+
+    def _render_body(self, values: dict[str, Any]) -> str:
+        parts = []
+        for literal, field, format_spec, conversion in self._segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            parts.append(format(value, format_spec))
+        return "".join(parts)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from enum import IntEnum
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional
+
+
+class RequestPriority(IntEnum):
+    INTERACTIVE = 0
+    ENEMY_ACTION = 1
+    BACKGROUND = 2
+
+
+def estimate_prompt_tokens(prompt: str) -> int:
+    return len(prompt) // 4
+
+
+class _TokenBucket:
+    def __init__(self, capacity_per_minute: float):
+        if capacity_per_minute <= 0:
+            raise ValueError("Rate limit capacity must be positive")
+        self.capacity = float(capacity_per_minute)
+        self.refill_per_s = self.capacity / 60
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed_s = now - self.updated_at
+        self.available = min(
+            self.capacity, self.available + elapsed_s * self.refill_per_s
+        )
+        self.updated_at = now
+
+    def get_wait_s(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_per_s
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self._request_bucket = (
+            _TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._token_bucket = (
+            _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        )
+        self._condition = threading.Condition()
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        with self._condition:
+            return len(self._waiters)
+
+    def get_queue_depths(self) -> dict[RequestPriority, int]:
+        with self._condition:
+            return {
+                priority: sum(1 for waiter in self._waiters if waiter[0] == priority)
+                for priority in RequestPriority
+            }
+
+    def _get_wait_s(self, estimated_tokens: int) -> float:
+        now = time.monotonic()
+        wait_s = 0.0
+        if self._request_bucket is not None:
+            self._request_bucket.refill(now)
+            wait_s = max(wait_s, self._request_bucket.get_wait_s(1))
+        if self._token_bucket is not None:
+            self._token_bucket.refill(now)
+            wait_s = max(wait_s, self._token_bucket.get_wait_s(estimated_tokens))
+        return wait_s
+
+    def acquire(
+        self,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        estimated_tokens: int = 0,
+    ) -> tuple[float, int]:
+        # waiters are served strictly by priority, then arrival order
+        start_time = time.monotonic()
+        waiter = (int(priority), next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, waiter)
+            queue_depth = len(self._waiters)
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+            try:
+                while True:
+                    timeout_s = None
+                    if self._waiters[0] == waiter:
+                        timeout_s = self._get_wait_s(estimated_tokens)
+                        if timeout_s <= 0:
+                            break
+                    self._condition.wait(timeout=timeout_s)
+                if self._request_bucket is not None:
+                    self._request_bucket.available -= 1
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+        return time.monotonic() - start_time, queue_depth
+
+    def record_tokens(self, n_tokens: int):
+        # tokens are only known once the response arrives, so the bucket may go
+        # into debt and later requests wait until it has refilled
+        if self._token_bucket is None:
+            return
+        with self._condition:
+            self._token_bucket.refill(time.monotonic())
+            self._token_bucket.available -= n_tokens
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
+import json
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import httpx
+import ollama
+import openai
+from pydantic import ValidationError
+
+T = TypeVar("T")
+
+
+class LLMErrorKind(Enum):
+    PARSE = "parse"
+    TRANSPORT = "transport"
+    FATAL = "fatal"
+
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def _is_retryable_status(status_code: Optional[int]) -> bool:
+    if status_code is None:
+        return False
+    return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def classify_llm_error(exc: Exception) -> LLMErrorKind:
+    if isinstance(exc, (ValidationError, json.JSONDecodeError)):
+        return LLMErrorKind.PARSE
+    if isinstance(exc, openai.APIStatusError):
+        if _is_retryable_status(exc.status_code):
+            return LLMErrorKind.TRANSPORT
+        return LLMErrorKind.FATAL
+    if isinstance(exc, ollama.ResponseError):
+        if _is_retryable_status(exc.status_code):
+            return LLMErrorKind.TRANSPORT
+        return LLMErrorKind.FATAL
+    if isinstance(
+        exc,
+        (
+            openai.APIConnectionError,
+            httpx.TransportError,
+            ConnectionError,
+            TimeoutError,
+        ),
+    ):
+        return LLMErrorKind.TRANSPORT
+    return LLMErrorKind.FATAL
+
+
+def get_retry_after_s(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_transport_attempts: int = 3
+    max_parse_attempts: int = 3
+    base_delay_s: float = 0.5
+    max_delay_s: float = 8.0
+    jitter: bool = True
+
+    def get_backoff_delay(
+        self, n_transport_retries: int, retry_after_s: Optional[float] = None
+    ) -> float:
+        if retry_after_s is not None:
+            return retry_after_s
+        delay = min(self.max_delay_s, self.base_delay_s * 2**n_transport_retries)
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+
+OnRetry = Callable[[LLMErrorKind, Exception, float], Any]
+
+
+class _RetryState:
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.n_parse_failures = 0
+        self.n_transport_failures = 0
+
+    def get_delay(self, exc: Exception) -> tuple[LLMErrorKind, Optional[float]]:
+        kind = classify_llm_error(exc)
+        if kind == LLMErrorKind.PARSE:
+            self.n_parse_failures += 1
+            if self.n_parse_failures >= self.policy.max_parse_attempts:
+                return kind, None
+            # the provider answered, so ask again straight away
+            return kind, 0.0
+        if kind == LLMErrorKind.TRANSPORT:
+            self.n_transport_failures += 1
+            if self.n_transport_failures >= self.policy.max_transport_attempts:
+                return kind, None
+            retry_after_s = get_retry_after_s(exc)
+            if retry_after_s is not None and retry_after_s > self.policy.max_delay_s:
+                return kind, None
+            return kind, self.policy.get_backoff_delay(
+                self.n_transport_failures - 1, retry_after_s
+            )
+        return kind, None
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    policy: RetryPolicy,
+    on_retry: Optional[OnRetry] = None,
+) -> T:
+    state = _RetryState(policy)
+    while True:
+        try:
+            return fn()
+        except Exception as exc:
+            kind, delay = state.get_delay(exc)
+            if delay is None:
+                raise
+            if on_retry is not None:
+                on_retry(kind, exc, delay)
+            time.sleep(delay)
+
+
+async def acall_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    on_retry: Optional[OnRetry] = None,
+) -> T:
+    state = _RetryState(policy)
+    while True:
+        try:
+            return await fn()
+        except Exception as exc:
+            kind, delay = state.get_delay(exc)
+            if delay is None:
+                raise
+            if on_retry is not None:
+                on_retry(kind, exc, delay)
+            await asyncio.sleep(delay)
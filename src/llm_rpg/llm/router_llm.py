@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections import deque
+import threading
+import time
+from typing import Callable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from llm_rpg.llm.llm import LLM
+
+T = TypeVar("T")
+
+
+class RouterTarget:
+    def __init__(self, llm: LLM, weight: float = 1.0, window_size: int = 20):
+        if weight <= 0:
+            raise ValueError("Router target weight must be positive")
+        self.llm = llm
+        self.weight = weight
+        self.latencies_s: deque[float] = deque(maxlen=window_size)
+        self.outcomes: deque[bool] = deque(maxlen=window_size)
+        self.ejected_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.llm.provider}:{getattr(self.llm, 'model', None)}"
+
+    @property
+    def avg_latency_s(self) -> Optional[float]:
+        if not self.latencies_s:
+            return None
+        return sum(self.latencies_s) / len(self.latencies_s)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def get_score(self) -> float:
+        avg_latency_s = self.avg_latency_s
+        if avg_latency_s is None:
+            # try unmeasured targets first so every target gets a latency estimate
+            return 0.0
+        return avg_latency_s / self.weight
+
+
+class RouterLLM(LLM):
+    def __init__(
+        self,
+        targets: list[RouterTarget],
+        max_error_rate: float = 0.5,
+        min_requests_for_ejection: int = 3,
+        ejection_s: float = 30.0,
+    ):
+        if not targets:
+            raise ValueError("RouterLLM needs at least one target")
+        self.targets = targets
+        self.max_error_rate = max_error_rate
+        self.min_requests_for_ejection = min_requests_for_ejection
+        self.ejection_s = ejection_s
+        self.model = ",".join(str(getattr(t.llm, "model", None)) for t in targets)
+        self.llm_cost_tracker = targets[0].llm.llm_cost_tracker
+        self._lock = threading.Lock()
+
+    @property
+    def provider(self) -> str:
+        providers = ",".join(target.llm.provider for target in self.targets)
+        return f"{type(self).__name__}({providers})"
+
+    def get_ranked_targets(self) -> list[RouterTarget]:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [t for t in self.targets if t.is_healthy(now)]
+            ejected = [t for t in self.targets if not t.is_healthy(now)]
+            healthy.sort(key=lambda t: t.get_score())
+            # ejected targets are a last resort, soonest to return first
+            ejected.sort(key=lambda t: t.ejected_until)
+        return healthy + ejected
+
+    def _record_success(self, target: RouterTarget, latency_s: float):
+        with self._lock:
+            target.latencies_s.append(latency_s)
+            target.outcomes.append(True)
+
+    def _record_error(self, target: RouterTarget):
+        with self._lock:
+            target.outcomes.append(False)
+            if (
+                len(target.outcomes) >= self.min_requests_for_ejection
+                and target.error_rate >= self.max_error_rate
+            ):
+                target.ejected_until = time.monotonic() + self.ejection_s
+                # give the target a clean slate when it comes back
+                target.outcomes.clear()
+                self.llm_cost_tracker.add_router_ejection()
+
+    def _route(self, call: Callable[[LLM], T]) -> T:
+        last_error: Optional[Exception] = None
+        for target in self.get_ranked_targets():
+            start_time = time.perf_counter()
+            try:
+                result = call(target.llm)
+            except Exception as exc:
+                self._record_error(target)
+                last_error = exc
+                continue
+            self._record_success(target, time.perf_counter() - start_time)
+            return result
+        raise last_error
+
+    def _generate_completion(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        return self._route(lambda llm: llm.generate_completion(prompt, system_prompt))
+
+    def _generate_structured_completion(
+        self,
+        prompt: str,
+        output_model: BaseModel,
+        system_prompt: Optional[str] = None,
+    ) -> BaseModel:
+        return self._route(
+            lambda llm: llm.generate_structured_completion(
+                prompt, output_model, system_prompt
+            )
+        )
+
+    def _generate_completion_stream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        # streams are routed on time to first chunk, after that we are committed
+        def start_stream(llm: LLM) -> tuple[Optional[str], Iterator[str]]:
+            stream = llm.generate_completion_stream(prompt, system_prompt)
+            return next(stream, None), stream
+
+        first_chunk, stream = self._route(start_stream)
+        if first_chunk is None:
+            return
+        yield first_chunk
+        yield from stream
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import math
+from pathlib import Path
+from typing import Optional
+import warnings
+
+
+class TokenCounter(ABC):
+    @abstractmethod
+    def count_tokens(self, text: str) -> int:
+        pass
+
+    @abstractmethod
+    def truncate(self, text: str, max_tokens: int) -> str:
+        pass
+
+
+class HeuristicTokenCounter(TokenCounter):
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+
+    def count_tokens(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return text[: max(0, int(max_tokens * self.chars_per_token))]
+
+
+class HFTokenCounter(TokenCounter):
+    def __init__(self, tokenizer_name: str):
+        from tokenizers import Tokenizer
+
+        self.tokenizer_name = tokenizer_name
+        if Path(tokenizer_name).is_file():
+            self.tokenizer = Tokenizer.from_file(tokenizer_name)
+        else:
+            self.tokenizer = Tokenizer.from_pretrained(tokenizer_name)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        encoding = self.tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        return text[: encoding.offsets[max_tokens - 1][1]]
+
+
+def get_token_counter(tokenizer_name: Optional[str]) -> TokenCounter:
+    if tokenizer_name is None:
+        return HeuristicTokenCounter()
+    try:
+        return HFTokenCounter(tokenizer_name)
+    except Exception as exc:
+        # a missing tokenizer should cost accuracy of the budget, not the game
+        warnings.warn(
+            f"Could not load tokenizer '{tokenizer_name}' ({exc}), "
+            "falling back to estimating 4 characters per token",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return HeuristicTokenCounter()
@@ -22,6 +22,8 @@ from llm_rpg.scenes.battle.battle_states.battle_start_state import BattleStartSt
 from llm_rpg.scenes.battle.battle_states.battle_turn_state import BattleTurnState
 from llm_rpg.systems.battle.battle_ai import BattleAI
 from llm_rpg.systems.battle.battle_log import BattleLog
+from llm_rpg.systems.battle.enemy_action_speculator import EnemyActionSpeculator
+from llm_rpg.systems.battle.hero_judgment_speculator import HeroJudgmentSpeculator
 
 from llm_rpg.systems.battle.creativity_tracker import CreativityTracker
 from llm_rpg.systems.battle.damage_calculator import (
@@ -35,6 +37,7 @@ if TYPE_CHECKING:
     from llm_rpg.game.game import Game
     from llm_rpg.systems.hero.hero import ProposedHeroAction
     from llm_rpg.ui.backgrounds import BattleBackground
+    from llm_rpg.scenes.battle.battle_states.thinking_utils import NarrationStream
 
 
 class BattleScene(Scene):
@@ -52,13 +55,41 @@ class BattleScene(Scene):
             action_narrator=self.game.action_narrator,
             debug=self.game.config.debug_mode,
         )
-        self.battle_log = BattleLog()
+        self.battle_log = BattleLog(context_builder=game.config.battle_context_builder)
+        self.hero_judgment_speculator = (
+            HeroJudgmentSpeculator(
+                self.battle_ai,
+                metrics=game.config.llm_metrics,
+                model=getattr(getattr(game.action_judge, "llm", None), "model", None),
+            )
+            if game.config.hero_judgment_speculation_idle_s is not None
+            else None
+        )
+        self.enemy_action_speculator = (
+            EnemyActionSpeculator(
+                metrics=game.config.llm_metrics,
+                model=getattr(
+                    getattr(game.enemy_action_generator, "llm", None), "model", None
+                ),
+            )
+            if game.config.enemy_action_speculation_enabled
+            else None
+        )
         self.creativity_tracker = CreativityTracker(
             word_overuse_threshold=game.config.creativity_word_overuse_threshold
         )
         self.damage_calculator = DamageCalculator(game_config=game.config)
         self.pending_hero_action: ProposedHeroAction | None = None
         self.latest_event = None
+        self.latest_narration: NarrationStream | None = None
+
+    def close(self):
+        # results of a finished battle are never used, drop the speculations
+        # that have not reached the llm yet
+        if self.hero_judgment_speculator is not None:
+            self.hero_judgment_speculator.cancel()
+        if self.enemy_action_speculator is not None:
+            self.enemy_action_speculator.cancel()
 
     def change_state(self, new_state: BattleStates):
         if new_state == BattleStates.START:
@@ -15,12 +15,14 @@ from llm_rpg.ui.battle_ui import (
 if TYPE_CHECKING:
     from llm_rpg.scenes.battle.battle_scene import BattleScene
     from llm_rpg.systems.battle.battle_log import BattleEvent
+    from llm_rpg.scenes.battle.battle_states.thinking_utils import NarrationStream
 
 
 class BattleEnemyResultState(State):
     def __init__(self, battle_scene: BattleScene):
         self.battle_scene = battle_scene
         self.event: BattleEvent | None = battle_scene.latest_event
+        self.narration: NarrationStream | None = battle_scene.latest_narration
         self.paged_state = PagedTextState(lines=[])
 
     def handle_input(self, event: pygame.event.Event):
@@ -28,6 +30,8 @@ class BattleEnemyResultState(State):
             pygame.K_RETURN,
             pygame.K_SPACE,
         ):
+            if self._is_narrating():
+                return
             if self.event and not self.paged_state.is_last_page:
                 self.paged_state.next_page()
                 return
@@ -36,6 +40,15 @@ class BattleEnemyResultState(State):
             else:
                 self.battle_scene.change_state(BattleStates.TURN)
 
+    def _is_narrating(self) -> bool:
+        return self.narration is not None and not self.narration.is_done
+
+    def _get_narration_error(self) -> str | None:
+        # the card falls back to the damage dealt, say why
+        if self.narration is None or self.narration.error is None:
+            return None
+        return f"Narration failed: {self.narration.error}"
+
     def update(self, dt: float):
         self.battle_scene.update_background(dt)
         return
@@ -54,11 +67,18 @@ class BattleEnemyResultState(State):
             enemy=self.battle_scene.enemy,
         )
         if self.event:
+            is_narrating = self._is_narrating()
+            text_override = None
+            if is_narrating:
+                text_override = self.narration.text or "..."
             card_rect = render_event_card(
                 screen=screen,
                 theme=self.battle_scene.game.theme,
                 event=self.event,
                 paged_state=self.paged_state,
+                text_override=text_override,
+                follow_tail=is_narrating,
+                error_message=self._get_narration_error(),
             )
             render_event_ribbon(
                 screen=screen,
@@ -15,12 +15,14 @@ from llm_rpg.ui.battle_ui import (
     render_enemy_sprite,
 )
 from llm_rpg.scenes.battle.battle_states.thinking_utils import (
+    NarrationStream,
     Outcome,
     make_error_outcome,
     pop_result,
     push_result,
     has_timed_out,
     apply_outcome,
+    stream_narration,
 )
 
 if TYPE_CHECKING:
@@ -33,6 +35,7 @@ class EnemyProcessingOutcome(TypedDict):
     event: BattleEvent
     success: bool
     message: str
+    narration: NarrationStream | None
 
 
 class BattleEnemyThinkingState(State):
@@ -120,15 +123,26 @@ class BattleEnemyThinkingState(State):
 
     def _process_action(self):
         try:
-            proposed_enemy_action = self.battle_scene.enemy.get_next_action(
-                self.battle_scene.battle_log, self.battle_scene.hero
-            )
+            proposed_enemy_action = None
+            speculator = self.battle_scene.enemy_action_speculator
+            if speculator is not None:
+                proposed_enemy_action = speculator.take(
+                    self.battle_scene.enemy,
+                    self.battle_scene.hero,
+                    self.battle_scene.battle_log,
+                )
+            if proposed_enemy_action is None:
+                proposed_enemy_action = self.battle_scene.enemy.get_next_action(
+                    self.battle_scene.battle_log, self.battle_scene.hero
+                )
+            battle_log = self.battle_scene.battle_log
+            battle_log_string = battle_log.to_string_for_battle_ai(call_site="judge")
             action_judgment = self.battle_scene.battle_ai.determine_action_judgment(
                 proposed_action_attacker=proposed_enemy_action,
                 hero=self.battle_scene.hero,
                 enemy=self.battle_scene.enemy,
                 is_hero_attacker=False,
-                battle_log_string=self.battle_scene.battle_log.to_string_for_battle_ai(),
+                battle_log_string=battle_log_string,
             )
             damage_calculation_result = (
                 self.battle_scene.damage_calculator.calculate_damage(
@@ -142,29 +156,40 @@ class BattleEnemyThinkingState(State):
                     equiped_items=[],
                 )
             )
-            action_effect = self.battle_scene.battle_ai.describe_action(
-                proposed_action_attacker=proposed_enemy_action,
-                hero=self.battle_scene.hero,
-                enemy=self.battle_scene.enemy,
-                is_hero_attacker=False,
-                battle_log_string=self.battle_scene.battle_log.to_string_for_battle_ai(),
-                judgment=action_judgment,
-                total_damage=damage_calculation_result.total_dmg,
+            narration = NarrationStream()
+            event = BattleEvent(
+                is_hero_turn=False,
+                character_name=self.battle_scene.enemy.name,
+                proposed_action=proposed_enemy_action,
+                effect_description="",
+                damage_calculation_result=damage_calculation_result,
             )
             outcome: EnemyProcessingOutcome = {
                 "target": "hero",
                 "damage": damage_calculation_result.total_dmg,
-                "event": BattleEvent(
-                    is_hero_turn=False,
-                    character_name=self.battle_scene.enemy.name,
-                    proposed_action=proposed_enemy_action,
-                    effect_description=action_effect.effect_description,
-                    damage_calculation_result=damage_calculation_result,
-                ),
+                "event": event,
                 "success": True,
                 "message": "",
+                "narration": narration,
             }
             self.result_queue.put(outcome)
+            self.processing_done = True
+            stream_narration(
+                narration=narration,
+                event=event,
+                chunks=self.battle_scene.battle_ai.describe_action_stream(
+                    proposed_action_attacker=proposed_enemy_action,
+                    hero=self.battle_scene.hero,
+                    enemy=self.battle_scene.enemy,
+                    is_hero_attacker=False,
+                    battle_log_string=battle_log.to_string_for_battle_ai(
+                        call_site="narrator"
+                    ),
+                    judgment=action_judgment,
+                    total_damage=damage_calculation_result.total_dmg,
+                ),
+            )
+            return
         except Exception as exc:
             push_result(
                 self.result_queue,
@@ -15,12 +15,14 @@ from llm_rpg.ui.battle_ui import (
     render_enemy_sprite,
 )
 from llm_rpg.scenes.battle.battle_states.thinking_utils import (
+    NarrationStream,
     Outcome,
     make_error_outcome,
     push_result,
     pop_result,
     has_timed_out,
     apply_outcome,
+    stream_narration,
 )
 
 if TYPE_CHECKING:
@@ -34,6 +36,7 @@ class ProcessingOutcome(TypedDict):
     event: BattleEvent
     success: bool
     message: str
+    narration: NarrationStream | None
 
 
 class BattleHeroThinkingState(State):
@@ -135,13 +138,26 @@ class BattleHeroThinkingState(State):
                 self.processing_done = True
                 return
 
-            action_judgment = self.battle_scene.battle_ai.determine_action_judgment(
-                proposed_action_attacker=self.proposed_action.action,
-                hero=self.battle_scene.hero,
-                enemy=self.battle_scene.enemy,
-                is_hero_attacker=True,
-                battle_log_string=self.battle_scene.battle_log.to_string_for_battle_ai(),
-            )
+            battle_log = self.battle_scene.battle_log
+            action_judgment = None
+            speculator = self.battle_scene.hero_judgment_speculator
+            if speculator is not None:
+                action_judgment = speculator.take(
+                    action=self.proposed_action.action,
+                    hero=self.battle_scene.hero,
+                    enemy=self.battle_scene.enemy,
+                    battle_log=battle_log,
+                )
+            if action_judgment is None:
+                action_judgment = self.battle_scene.battle_ai.determine_action_judgment(
+                    proposed_action_attacker=self.proposed_action.action,
+                    hero=self.battle_scene.hero,
+                    enemy=self.battle_scene.enemy,
+                    is_hero_attacker=True,
+                    battle_log_string=battle_log.to_string_for_battle_ai(
+                        call_site="judge"
+                    ),
+                )
 
             n_new_words_in_action = (
                 self.battle_scene.creativity_tracker.count_new_words_in_action(
@@ -165,29 +181,40 @@ class BattleHeroThinkingState(State):
                     equiped_items=self.battle_scene.hero.inventory.items,
                 )
             )
-            action_effect = self.battle_scene.battle_ai.describe_action(
-                proposed_action_attacker=self.proposed_action.action,
-                hero=self.battle_scene.hero,
-                enemy=self.battle_scene.enemy,
-                is_hero_attacker=True,
-                battle_log_string=self.battle_scene.battle_log.to_string_for_battle_ai(),
-                judgment=action_judgment,
-                total_damage=damage_calculation_result.total_dmg,
+            narration = NarrationStream()
+            event = BattleEvent(
+                is_hero_turn=True,
+                character_name=self.battle_scene.hero.name,
+                proposed_action=self.proposed_action.action,
+                effect_description="",
+                damage_calculation_result=damage_calculation_result,
             )
             outcome: ProcessingOutcome = {
                 "target": "enemy",
                 "damage": damage_calculation_result.total_dmg,
-                "event": BattleEvent(
-                    is_hero_turn=True,
-                    character_name=self.battle_scene.hero.name,
-                    proposed_action=self.proposed_action.action,
-                    effect_description=action_effect.effect_description,
-                    damage_calculation_result=damage_calculation_result,
-                ),
+                "event": event,
                 "success": True,
                 "message": "",
+                "narration": narration,
             }
             self.result_queue.put(outcome)
+            self.processing_done = True
+            stream_narration(
+                narration=narration,
+                event=event,
+                chunks=self.battle_scene.battle_ai.describe_action_stream(
+                    proposed_action_attacker=self.proposed_action.action,
+                    hero=self.battle_scene.hero,
+                    enemy=self.battle_scene.enemy,
+                    is_hero_attacker=True,
+                    battle_log_string=battle_log.to_string_for_battle_ai(
+                        call_site="narrator"
+                    ),
+                    judgment=action_judgment,
+                    total_damage=damage_calculation_result.total_dmg,
+                ),
+            )
+            return
         except Exception as exc:
             push_result(
                 self.result_queue,
@@ -147,7 +147,11 @@ class BattleStartState(State):
 
     def _generate_enemy(self):
         try:
-            enemy, sprite = self.battle_scene.game.enemy_generator.generate_enemy()
+            enemy_pool = self.battle_scene.game.enemy_pool
+            if enemy_pool is not None:
+                enemy, sprite = enemy_pool.pop(timeout=self.max_wait)
+            else:
+                enemy, sprite = self.battle_scene.game.enemy_generator.generate_enemy()
             scale_enemy(
                 enemy=enemy,
                 battles_won=self.battle_scene.game.battles_won,
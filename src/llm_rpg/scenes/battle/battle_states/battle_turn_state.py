@@ -26,6 +26,7 @@ class BattleTurnState(State):
         self.error_message = ""
         self.submit_requested = False
         self.input_timer = 0.0
+        self.idle_timer = 0.0
 
         self.backspace_held = False
         self.backspace_timer = 0.0
@@ -45,6 +46,7 @@ class BattleTurnState(State):
                     if len(self.input_text.replace(" ", "")) < max_chars:
                         self.input_text += event.unicode
                         self.error_message = ""
+                        self._on_text_changed()
         elif event.type == pygame.KEYUP:
             if event.key == pygame.K_BACKSPACE:
                 self.backspace_held = False
@@ -54,6 +56,30 @@ class BattleTurnState(State):
         if len(self.input_text) > 0:
             self.input_text = self.input_text[:-1]
             self.error_message = ""
+            self._on_text_changed()
+
+    def _on_text_changed(self):
+        self.idle_timer = 0.0
+        speculator = self.battle_scene.hero_judgment_speculator
+        if speculator is not None and speculator.action != self.input_text:
+            speculator.cancel()
+
+    def _speculate_judgment(self):
+        # judge the typed action once the player pauses, so it is ready on enter
+        speculator = self.battle_scene.hero_judgment_speculator
+        idle_s = self.battle_scene.game.config.hero_judgment_speculation_idle_s
+        if speculator is None or self.idle_timer < idle_s:
+            return
+        if not self.input_text.strip() or speculator.action == self.input_text:
+            return
+        if not self._build_proposed_action().is_valid:
+            return
+        speculator.start(
+            action=self.input_text,
+            hero=self.battle_scene.hero,
+            enemy=self.battle_scene.enemy,
+            battle_log=self.battle_scene.battle_log,
+        )
 
     def _build_proposed_action(self) -> ProposedHeroAction:
         if len(self.input_text.strip()) == 0:
@@ -84,6 +110,7 @@ class BattleTurnState(State):
     def update(self, dt: float):
         self.battle_scene.update_background(dt)
         self.input_timer += dt
+        self.idle_timer += dt
 
         if self.backspace_held:
             if self.backspace_timer == 0.0:
@@ -98,6 +125,8 @@ class BattleTurnState(State):
                         time_since_delay % self.backspace_repeat_rate
                     )
 
+        self._speculate_judgment()
+
         if self.submit_requested:
             self.submit_requested = False
             proposed_action = self._build_proposed_action()
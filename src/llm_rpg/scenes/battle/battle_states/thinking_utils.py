@@ -1,17 +1,45 @@
 from __future__ import annotations
 import queue
-from typing import TypedDict, Literal
+import threading
+from typing import Iterator, TypedDict, Literal
 
 from llm_rpg.systems.battle.battle_log import BattleEvent
 from llm_rpg.systems.battle.damage_calculator import DamageCalculationResult
 
 
+class NarrationStream:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._text = ""
+        self._done = threading.Event()
+        self.is_done = False
+        self.error: str | None = None
+
+    @property
+    def text(self) -> str:
+        with self._lock:
+            return self._text
+
+    def append(self, chunk: str):
+        with self._lock:
+            self._text += chunk
+
+    def finish(self, error: str | None = None):
+        self.error = error
+        self.is_done = True
+        self._done.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
 class Outcome(TypedDict):
     target: Literal["enemy", "hero"]
     damage: int
     event: BattleEvent
     success: bool
     message: str
+    narration: NarrationStream | None
 
 
 def make_error_outcome(
@@ -50,9 +78,28 @@ def make_error_outcome(
         "event": event,
         "success": False,
         "message": message,
+        "narration": None,
     }
 
 
+def stream_narration(
+    narration: NarrationStream,
+    event: BattleEvent,
+    chunks: Iterator[str],
+):
+    error = None
+    try:
+        for chunk in chunks:
+            narration.append(chunk)
+    except Exception as exc:
+        error = str(exc)
+    event.effect_description = narration.text or (
+        f"{event.character_name} dealt "
+        f"{event.damage_calculation_result.total_dmg} damage."
+    )
+    narration.finish(error=error)
+
+
 def push_result(q: "queue.Queue[Outcome]", outcome: Outcome):
     q.put(outcome)
 
@@ -76,3 +123,24 @@ def apply_outcome(outcome: Outcome, battle_scene):
         battle_scene.creativity_tracker.add_action(outcome["event"].proposed_action)
     battle_scene.battle_log.add_event(outcome["event"])
     battle_scene.latest_event = outcome["event"]
+    battle_scene.latest_narration = outcome["narration"]
+    if outcome["event"].is_hero_turn:
+        start_enemy_action_speculation(battle_scene, outcome["narration"])
+
+
+def start_enemy_action_speculation(battle_scene, narration: NarrationStream | None):
+    # the enemy action only depends on the battle log, so generate it while the
+    # player is still reading the hero result
+    speculator = battle_scene.enemy_action_speculator
+    if (
+        speculator is None
+        or battle_scene.enemy.is_dead()
+        or battle_scene.hero.is_dead()
+    ):
+        return
+    speculator.start(
+        enemy=battle_scene.enemy,
+        hero=battle_scene.hero,
+        battle_log=battle_scene.battle_log,
+        wait_for=narration.wait if narration is not None else None,
+    )
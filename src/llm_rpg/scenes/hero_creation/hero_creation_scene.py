@@ -22,6 +22,9 @@ class HeroCreationScene(Scene):
     def __init__(self, game: Game):
         super().__init__(game=game)
         self.current_state = HeroCreationChooseNameState(self)
+        # generate the first enemies while the player creates the hero
+        if self.game.enemy_pool is not None:
+            self.game.enemy_pool.start()
 
     def change_state(self, new_state: HeroCreationStates):
         if new_state == HeroCreationStates.CHOOSE_CLASS:
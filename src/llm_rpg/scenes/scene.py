@@ -36,3 +36,7 @@ class Scene(ABC):
 
     def render(self, screen: pygame.Surface):
         self.current_state.render(screen)
+
+    def close(self):
+        # called when the game leaves the scene
+        pass
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
+import gc
 from pathlib import Path
 import random
+import threading
 import time
 from typing import Optional, Tuple
 
@@ -16,12 +18,19 @@ import unfake
 from PIL import Image
 from llm_rpg.systems.battle.enemy import Enemy
 from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.prompt_templates import PromptTemplate
 
 
 class SpriteGenerator(ABC):
     @abstractmethod
     def generate_sprite(self, enemy: Enemy) -> pygame.Surface: ...
 
+    def warmup(self):
+        pass
+
+    def close(self):
+        pass
+
 
 def _clean_sprite(sprite: Image.Image) -> Image.Image:
     result = unfake.process_image_sync(sprite, transparent_background=True)
@@ -78,13 +87,19 @@ class SDSpriteGenerator(SpriteGenerator):
         vae_path: Optional[str] = None,
         use_lcm: bool = False,
         negative_prompt: Optional[str] = None,
+        fuse_lora: bool = False,
         debug: bool = False,
     ):
         self.base_model = base_model
         self.lora_path = lora_path
         self.trigger_prompt = trigger_prompt
         self.prompt_llm = prompt_llm
-        self.prompt_template = prompt_template
+        self.prompt_template = PromptTemplate(
+            prompt_template,
+            name="sprite_prompt",
+            allowed_fields=["enemy_name", "enemy_description"],
+            required_fields=["enemy_description"],
+        )
         self.lcm_lora_path = lcm_lora_path
         self.guidance_scale = guidance_scale
         self.num_inference_steps = num_inference_steps
@@ -93,8 +108,13 @@ class SDSpriteGenerator(SpriteGenerator):
         self.vae_path = vae_path
         self.use_lcm = use_lcm
         self.negative_prompt = negative_prompt
+        self.fuse_lora = fuse_lora
         self.debug = debug
         self.device = self._get_device()
+        # loaded once on first use or warmup, generation is serialised on it
+        self._pipe: Optional[StableDiffusionPipeline] = None
+        self._pipe_lock = threading.Lock()
+        self._is_closed = False
 
     def _get_device(self) -> str:
         if torch.cuda.is_available():
@@ -104,27 +124,24 @@ class SDSpriteGenerator(SpriteGenerator):
         return "cpu"
 
     def _build_sprite_prompt(self, enemy: Enemy) -> str:
-        attempts = 0
-        while attempts < 3:
-            prompt = self.prompt_template.format(
-                enemy_name=enemy.name, enemy_description=enemy.description
-            )
-            try:
-                if self.debug:
-                    print("////////////DEBUG SpritePrompt LLM prompt////////////")
-                    print(prompt)
-                    print("////////////DEBUG SpritePrompt LLM prompt////////////")
-                output = self.prompt_llm.generate_completion(prompt=prompt)
-                if self.debug:
-                    print("////////////DEBUG SpritePrompt LLM response////////////")
-                    print(output)
-                    print("////////////DEBUG SpritePrompt LLM response////////////")
-                return output.strip()
-            except Exception:
-                attempts += 1
-        return enemy.description
+        prompt = self.prompt_template.render(
+            enemy_name=enemy.name, enemy_description=enemy.description
+        )
+        if self.debug:
+            print("////////////DEBUG SpritePrompt LLM prompt////////////")
+            print(prompt)
+            print("////////////DEBUG SpritePrompt LLM prompt////////////")
+        try:
+            output = self.prompt_llm.generate_completion(prompt=prompt)
+        except Exception:
+            return enemy.description
+        if self.debug:
+            print("////////////DEBUG SpritePrompt LLM response////////////")
+            print(output)
+            print("////////////DEBUG SpritePrompt LLM response////////////")
+        return output.strip()
 
-    def generate_sprite(self, enemy: Enemy) -> pygame.Surface:
+    def _load_pipeline(self) -> StableDiffusionPipeline:
         pipe = StableDiffusionPipeline.from_single_file(
             self.base_model,
             torch_dtype=torch.float16,
@@ -150,21 +167,60 @@ class SDSpriteGenerator(SpriteGenerator):
             pipe.set_adapters(["style", "lcm"], adapter_weights=[1.0, 1.0])
         else:
             pipe.load_lora_weights(self.lora_path)
+        if self.fuse_lora:
+            # bake the loras into the unet and text encoder weights, this
+            # removes the per-step adapter overhead
+            pipe.fuse_lora()
+            pipe.unload_lora_weights()
+        return pipe
+
+    def _get_pipeline(self) -> StableDiffusionPipeline:
+        if self._is_closed:
+            raise ValueError("Sprite generator is closed")
+        if self._pipe is None:
+            self._pipe = self._load_pipeline()
+        return self._pipe
+
+    def warmup(self):
+        # loads the pipeline and runs one step so the first enemy does not pay
+        # for loading and kernel selection
+        with self._pipe_lock:
+            pipe = self._get_pipeline()
+            pipe(
+                self.trigger_prompt,
+                num_inference_steps=1,
+                guidance_scale=self.guidance_scale,
+                num_images_per_prompt=1,
+                height=self.inference_height,
+                width=self.inference_width,
+                safety_checker=None,
+            )
+
+    def close(self):
+        # no lock, a running generation keeps its own reference until it is done
+        self._is_closed = True
+        self._pipe = None
+        gc.collect()
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def generate_sprite(self, enemy: Enemy) -> pygame.Surface:
         sprite_prompt = self._build_sprite_prompt(enemy)
         prompt = f"{self.trigger_prompt}, {sprite_prompt}"
         if self.debug:
             print("////////////DEBUG Diffusion prompt////////////")
             print(prompt)
             print("////////////DEBUG Diffusion prompt////////////")
-        sprite = pipe(
-            prompt,
-            num_inference_steps=self.num_inference_steps,
-            guidance_scale=self.guidance_scale,
-            num_images_per_prompt=1,
-            negative_prompt=self.negative_prompt,
-            height=self.inference_height,
-            width=self.inference_width,
-            safety_checker=None,
-        ).images[0]
+        with self._pipe_lock:
+            sprite = self._get_pipeline()(
+                prompt,
+                num_inference_steps=self.num_inference_steps,
+                guidance_scale=self.guidance_scale,
+                num_images_per_prompt=1,
+                negative_prompt=self.negative_prompt,
+                height=self.inference_height,
+                width=self.inference_width,
+                safety_checker=None,
+            ).images[0]
         sprite = _clean_sprite(sprite)
         return _pil_to_surface(sprite)
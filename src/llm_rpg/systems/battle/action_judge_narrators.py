@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import re
+from typing import Annotated
+
+from pydantic import Field
+
+from llm_rpg.systems.battle.action_judges import (
+    ActionJudgment,
+    LLMActionJudge,
+    LLMActionJudgmentOutput,
+)
+from llm_rpg.systems.battle.action_narrators import ActionNarrator, sanitize_narration
+from llm_rpg.systems.battle.enemy import Enemy
+from llm_rpg.systems.hero.hero import Hero
+
+DAMAGE_PLACEHOLDER = "{damage}"
+
+
+class LLMJudgeNarrationOutput(LLMActionJudgmentOutput):
+    narration: Annotated[
+        str,
+        Field(
+            description=(
+                "A single sentence describing the effect of the action. If the action is infeasible, "
+                f"explain why. Write {DAMAGE_PLACEHOLDER} where the amount of damage dealt should appear."
+            ),
+        ),
+    ]
+
+
+class LLMActionJudgeNarrator(LLMActionJudge, ActionNarrator):
+    # judges and narrates in one call, the damage is filled in once it is calculated
+    prompt_name = "action_judge_and_narrate"
+    output_model = LLMJudgeNarrationOutput
+
+    def _to_judgment(self, unscaled_output: LLMJudgeNarrationOutput) -> ActionJudgment:
+        return ActionJudgment(
+            feasibility=unscaled_output.feasibility / 10,
+            potential_damage=unscaled_output.potential_damage / 10,
+            narration=unscaled_output.narration,
+        )
+
+    def describe_action(
+        self,
+        proposed_action_attacker: str,
+        hero: Hero,
+        enemy: Enemy,
+        is_hero_attacker: bool,
+        battle_log_string: str,
+        judgment: ActionJudgment,
+        total_damage: int,
+    ) -> str:
+        if judgment.narration is None:
+            raise ValueError("Judgment has no narration to describe the action with")
+        parts = [
+            sanitize_narration(part)
+            for part in judgment.narration.split(DAMAGE_PLACEHOLDER)
+        ]
+        narration = f" {total_damage} ".join(parts).strip()
+        return re.sub(r"\s+([.?!])", r"\1", narration)
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-import json
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 
 from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.micro_batcher import MicroBatcher
+from llm_rpg.llm.prompt_templates import PromptTemplate
+from llm_rpg.llm.retry import LLMErrorKind, classify_llm_error
 from llm_rpg.objects.item import Item
 from llm_rpg.systems.battle.enemy import Enemy
 from llm_rpg.systems.hero.hero import Hero
@@ -17,6 +20,17 @@ from llm_rpg.systems.hero.hero import Hero
 class ActionJudgment:
     feasibility: float
     potential_damage: float
+    # set by judges that also narrate, with a placeholder for the damage
+    narration: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ActionJudgeRequest:
+    proposed_action_attacker: str
+    hero: Hero
+    enemy: Enemy
+    is_hero_attacker: bool
+    battle_log_string: str
 
 
 class ActionJudge(ABC):
@@ -31,6 +45,24 @@ class ActionJudge(ABC):
     ) -> ActionJudgment:
         raise NotImplementedError
 
+    def judge_actions(self, requests: list[ActionJudgeRequest]) -> list[ActionJudgment]:
+        return [
+            self.judge_action(
+                proposed_action_attacker=request.proposed_action_attacker,
+                hero=request.hero,
+                enemy=request.enemy,
+                is_hero_attacker=request.is_hero_attacker,
+                battle_log_string=request.battle_log_string,
+            )
+            for request in requests
+        ]
+
+    def warmup(self):
+        pass
+
+    def close(self):
+        pass
+
 
 class LLMActionJudgmentOutput(BaseModel):
     feasibility: Annotated[
@@ -57,12 +89,73 @@ class LLMActionJudgmentOutput(BaseModel):
     ]
 
 
+@lru_cache(maxsize=None)
+def get_batch_output_model(
+    output_model: type[BaseModel], n_cases: int
+) -> type[BaseModel]:
+    # the length is part of the schema, so providers with structured output and
+    # the fake backends return exactly one judgment per case
+    return create_model(
+        f"{output_model.__name__}Batch{n_cases}",
+        judgments=(
+            list[output_model],
+            Field(
+                min_length=n_cases,
+                max_length=n_cases,
+                description="One judgment per case, in the order of the cases.",
+            ),
+        ),
+    )
+
+
+ACTION_JUDGE_PROMPT_FIELDS = [
+    "attacker_name",
+    "defender_name",
+    "attacker_description",
+    "defender_description",
+    "hero_name",
+    "items_hero",
+    "battle_log_string",
+    "proposed_action_attacker",
+]
+
+
 class LLMActionJudge(ActionJudge):
-    def __init__(self, llm: LLM, prompt: str, debug: bool = False):
+    prompt_name = "action_judge"
+    output_model: type[LLMActionJudgmentOutput] = LLMActionJudgmentOutput
+
+    def __init__(
+        self, llm: LLM, prompt: str | dict, debug: bool = False, batch_size: int = 8
+    ):
+        if batch_size < 1:
+            raise ValueError("Action judge batch_size must be at least 1")
         self.llm = llm
-        self.prompt = prompt
+        self.prompt_config = prompt
+        self.prompt = PromptTemplate.from_config(
+            prompt,
+            name=self.prompt_name,
+            allowed_fields=ACTION_JUDGE_PROMPT_FIELDS,
+            required_fields=["proposed_action_attacker"],
+            output_model=self.output_model,
+        )
+        # the schema in a batch prompt depends on the number of cases
+        self._batch_prompts: dict[int, PromptTemplate] = {}
+        self.batch_size = batch_size
         self.debug = debug
 
+    def _get_batch_prompt(self, n_cases: int) -> PromptTemplate:
+        batch_prompt = self._batch_prompts.get(n_cases)
+        if batch_prompt is None:
+            batch_prompt = PromptTemplate.from_config(
+                self.prompt_config,
+                name=f"{self.prompt_name}_batch",
+                allowed_fields=ACTION_JUDGE_PROMPT_FIELDS,
+                required_fields=["proposed_action_attacker"],
+                output_model=get_batch_output_model(self.output_model, n_cases),
+            )
+            self._batch_prompts[n_cases] = batch_prompt
+        return batch_prompt
+
     def _format_items(self, items: list[Item]) -> str:
         return "\n".join([f"  - {item.name}: {item.description}" for item in items])
 
@@ -74,6 +167,24 @@ class LLMActionJudge(ActionJudge):
         battle_log_string: str,
         proposed_action_attacker: str,
     ) -> str:
+        return self.prompt.render(
+            **self._get_prompt_values(
+                hero=hero,
+                enemy=enemy,
+                is_hero_attacker=is_hero_attacker,
+                battle_log_string=battle_log_string,
+                proposed_action_attacker=proposed_action_attacker,
+            )
+        )
+
+    def _get_prompt_values(
+        self,
+        hero: Hero,
+        enemy: Enemy,
+        is_hero_attacker: bool,
+        battle_log_string: str,
+        proposed_action_attacker: str,
+    ) -> dict[str, str]:
         items_hero = self._format_items(hero.inventory.items)
         hero_name = hero.name
         if is_hero_attacker:
@@ -86,7 +197,7 @@ class LLMActionJudge(ActionJudge):
             defender_name = hero.name
             attacker_description = enemy.description
             defender_description = hero.description
-        prompt = self.prompt.format(
+        return dict(
             attacker_name=attacker_name,
             defender_name=defender_name,
             attacker_description=attacker_description,
@@ -96,8 +207,6 @@ class LLMActionJudge(ActionJudge):
             battle_log_string=battle_log_string,
             proposed_action_attacker=proposed_action_attacker,
         )
-        schema = json.dumps(LLMActionJudgmentOutput.model_json_schema(), indent=2)
-        return f"{prompt}{schema}"
 
     def judge_action(
         self,
@@ -107,38 +216,155 @@ class LLMActionJudge(ActionJudge):
         is_hero_attacker: bool,
         battle_log_string: str,
     ) -> ActionJudgment:
-        attempts = 0
-        while attempts < 3:
-            prompt = self._get_prompt(
-                hero=hero,
-                enemy=enemy,
-                is_hero_attacker=is_hero_attacker,
-                battle_log_string=battle_log_string,
-                proposed_action_attacker=proposed_action_attacker,
+        prompt = self._get_prompt(
+            hero=hero,
+            enemy=enemy,
+            is_hero_attacker=is_hero_attacker,
+            battle_log_string=battle_log_string,
+            proposed_action_attacker=proposed_action_attacker,
+        )
+        if self.debug:
+            print("////////////DEBUG ActionJudge prompt////////////")
+            print(prompt)
+            print("////////////DEBUG ActionJudge prompt////////////")
+        try:
+            unscaled_output = self.llm.generate_structured_completion(
+                prompt=prompt,
+                output_model=self.output_model,
+                system_prompt=self.prompt.system_prompt,
             )
-            if self.debug:
-                print("////////////DEBUG ActionJudge prompt////////////")
-                print(prompt)
-                print("////////////DEBUG ActionJudge prompt////////////")
-            try:
-                unscaled_output = self.llm.generate_structured_completion(
-                    prompt=prompt, output_model=LLMActionJudgmentOutput
-                )
-                return ActionJudgment(
-                    feasibility=unscaled_output.feasibility / 10,
-                    potential_damage=unscaled_output.potential_damage / 10,
-                )
-            except Exception as exc:
-                print(exc)
-                attempts += 1
+        except Exception as exc:
+            raise ValueError("Failed to determine action judgment") from exc
+        return self._to_judgment(unscaled_output)
+
+    def judge_actions(self, requests: list[ActionJudgeRequest]) -> list[ActionJudgment]:
+        judgments: list[ActionJudgment] = []
+        for start in range(0, len(requests), self.batch_size):
+            chunk = requests[start : start + self.batch_size]
+            if len(chunk) == 1:
+                judgments.extend(super().judge_actions(chunk))
                 continue
-        raise ValueError("Failed to determine action judgment")
+            judgments.extend(self._judge_chunk(chunk))
+        return judgments
+
+    def _judge_chunk(self, requests: list[ActionJudgeRequest]) -> list[ActionJudgment]:
+        batch_prompt = self._get_batch_prompt(len(requests))
+        prompt = batch_prompt.render_cases(
+            header=(
+                f"Judge each of the following {len(requests)} cases independently "
+                "and return one judgment per case, in the same order."
+            ),
+            cases=[
+                self._get_prompt_values(
+                    hero=request.hero,
+                    enemy=request.enemy,
+                    is_hero_attacker=request.is_hero_attacker,
+                    battle_log_string=request.battle_log_string,
+                    proposed_action_attacker=request.proposed_action_attacker,
+                )
+                for request in requests
+            ],
+        )
+        if self.debug:
+            print("////////////DEBUG ActionJudge batch prompt////////////")
+            print(prompt)
+            print("////////////DEBUG ActionJudge batch prompt////////////")
+        try:
+            unscaled_outputs = self.llm.generate_structured_completion(
+                prompt=prompt,
+                output_model=batch_prompt.output_model,
+                system_prompt=batch_prompt.system_prompt,
+            ).judgments
+        except Exception as exc:
+            if classify_llm_error(exc) != LLMErrorKind.PARSE:
+                raise ValueError("Failed to determine action judgments") from exc
+            # e.g. a dropped or merged case fails the length of the schema, the
+            # cases cannot be matched up, judge them one by one
+            return super().judge_actions(requests)
+        return [self._to_judgment(output) for output in unscaled_outputs]
+
+    def _to_judgment(self, unscaled_output: LLMActionJudgmentOutput) -> ActionJudgment:
+        return ActionJudgment(
+            feasibility=unscaled_output.feasibility / 10,
+            potential_damage=unscaled_output.potential_damage / 10,
+        )
+
+
+def format_action_judge_context(
+    hero: Hero, enemy: Enemy, is_hero_attacker: bool, battle_log_string: str
+) -> str:
+    attacker, defender = (hero, enemy) if is_hero_attacker else (enemy, hero)
+    items_hero = "; ".join(
+        f"{item.name}: {item.description}" for item in hero.inventory.items
+    )
+    return (
+        f"Attacker: {attacker.name}, {attacker.description}\n"
+        f"Defender: {defender.name}, {defender.description}\n"
+        f"Items of {hero.name}: {items_hero or 'none'}\n"
+        f"Battle history:\n{battle_log_string}"
+    )
 
 
 class TransformersActionJudge(ActionJudge):
-    def __init__(self, model_name: str, device: str = "cpu"):
+    # expects a sequence regression model with two outputs, feasibility and
+    # potential damage, trained on judgments scaled to 0-1
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        quantize: bool = False,
+        max_length: int = 256,
+        max_batch_size: int = 8,
+        max_batch_wait_s: float = 0.005,
+    ):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        if quantize and device != "cpu":
+            raise ValueError("int8 quantisation of the judge is only supported on cpu")
         self.model_name = model_name
         self.device = device
+        self.max_length = max_length
+        self.max_batch_size = max_batch_size
+        self._torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        if model.config.num_labels != 2:
+            raise ValueError(
+                f"Judge model {model_name} must have 2 outputs, "
+                f"got {model.config.num_labels}"
+            )
+        model.eval()
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        self.model = model.to(device)
+        self.batcher: MicroBatcher[tuple[str, str], ActionJudgment] = MicroBatcher(
+            self._score_batch,
+            max_batch_size=max_batch_size,
+            max_wait_s=max_batch_wait_s,
+            name="transformers-judge",
+        )
+
+    def _score_batch(self, inputs: list[tuple[str, str]]) -> list[ActionJudgment]:
+        actions = [action for action, _ in inputs]
+        contexts = [context for _, context in inputs]
+        # the action comes first so that long battle histories get truncated
+        encoding = self.tokenizer(
+            actions,
+            contexts,
+            padding=True,
+            truncation="only_second",
+            max_length=self.max_length,
+            return_tensors="pt",
+        ).to(self.device)
+        with self._torch.inference_mode():
+            scores = self.model(**encoding).logits.clamp(0, 1).tolist()
+        return [
+            ActionJudgment(feasibility=feasibility, potential_damage=potential_damage)
+            for feasibility, potential_damage in scores
+        ]
 
     def judge_action(
         self,
@@ -148,4 +374,42 @@ class TransformersActionJudge(ActionJudge):
         is_hero_attacker: bool,
         battle_log_string: str,
     ) -> ActionJudgment:
-        raise NotImplementedError("TransformersActionJudge is not implemented yet")
+        context = format_action_judge_context(
+            hero=hero,
+            enemy=enemy,
+            is_hero_attacker=is_hero_attacker,
+            battle_log_string=battle_log_string,
+        )
+        try:
+            return self.batcher((proposed_action_attacker, context))
+        except Exception as exc:
+            raise ValueError("Failed to determine action judgment") from exc
+
+    def judge_actions(self, requests: list[ActionJudgeRequest]) -> list[ActionJudgment]:
+        inputs = [
+            (
+                request.proposed_action_attacker,
+                format_action_judge_context(
+                    hero=request.hero,
+                    enemy=request.enemy,
+                    is_hero_attacker=request.is_hero_attacker,
+                    battle_log_string=request.battle_log_string,
+                ),
+            )
+            for request in requests
+        ]
+        # through the batcher, so that only one forward pass runs on the model
+        # at a time and live judgments can join the same batches
+        futures = [self.batcher.submit(model_input) for model_input in inputs]
+        try:
+            return [future.result() for future in futures]
+        except Exception as exc:
+            raise ValueError("Failed to determine action judgments") from exc
+
+    def warmup(self):
+        # the first forward pass allocates and picks kernels, keep it off the
+        # first battle turn
+        self.batcher(("warmup", "warmup"))
+
+    def close(self):
+        self.batcher.close()
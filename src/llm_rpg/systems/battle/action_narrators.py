@@ -1,14 +1,28 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.prompt_templates import PromptTemplate
 from llm_rpg.objects.item import Item
 from llm_rpg.systems.battle.action_judges import ActionJudgment
 from llm_rpg.systems.battle.enemy import Enemy
 from llm_rpg.systems.hero.hero import Hero
 
 
+def sanitize_narration(text: str) -> str:
+    text = text.replace("’", "'")
+    allowed = {"'", ".", "?", "!"}
+    filtered = "".join(
+        [
+            char if char.isalpha() or char.isspace() or char in allowed else " "
+            for char in text
+        ]
+    )
+    return " ".join(filtered.split())
+
+
 class ActionNarrator(ABC):
     @abstractmethod
     def describe_action(
@@ -23,11 +37,51 @@ class ActionNarrator(ABC):
     ) -> str:
         raise NotImplementedError
 
+    def describe_action_stream(
+        self,
+        proposed_action_attacker: str,
+        hero: Hero,
+        enemy: Enemy,
+        is_hero_attacker: bool,
+        battle_log_string: str,
+        judgment: ActionJudgment,
+        total_damage: int,
+    ) -> Iterator[str]:
+        yield self.describe_action(
+            proposed_action_attacker=proposed_action_attacker,
+            hero=hero,
+            enemy=enemy,
+            is_hero_attacker=is_hero_attacker,
+            battle_log_string=battle_log_string,
+            judgment=judgment,
+            total_damage=total_damage,
+        )
+
+
+ACTION_NARRATION_PROMPT_FIELDS = [
+    "attacker_name",
+    "defender_name",
+    "attacker_description",
+    "defender_description",
+    "hero_name",
+    "items_hero",
+    "battle_log_string",
+    "proposed_action_attacker",
+    "feasibility",
+    "potential_damage",
+    "total_damage",
+]
+
 
 class LLMActionNarrator(ActionNarrator):
-    def __init__(self, llm: LLM, prompt: str, debug: bool = False):
+    def __init__(self, llm: LLM, prompt: str | dict, debug: bool = False):
         self.llm = llm
-        self.prompt = prompt
+        self.prompt = PromptTemplate.from_config(
+            prompt,
+            name="action_narration",
+            allowed_fields=ACTION_NARRATION_PROMPT_FIELDS,
+            required_fields=["proposed_action_attacker"],
+        )
         self.debug = debug
         self._snap_steps = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
         self._feasibility_labels = {
@@ -48,15 +102,7 @@ class LLMActionNarrator(ActionNarrator):
         }
 
     def _sanitize_text(self, text: str) -> str:
-        text = text.replace("’", "'")
-        allowed = {"'", ".", "?", "!"}
-        filtered = "".join(
-            [
-                char if char.isalpha() or char.isspace() or char in allowed else " "
-                for char in text
-            ]
-        )
-        return " ".join(filtered.split())
+        return sanitize_narration(text)
 
     def _snap_score(self, value: float) -> float:
         clamped = max(0.0, min(1.0, value))
@@ -95,7 +141,7 @@ class LLMActionNarrator(ActionNarrator):
             defender_name = hero.name
             attacker_description = enemy.description
             defender_description = hero.description
-        return self.prompt.format(
+        return self.prompt.render(
             attacker_name=attacker_name,
             defender_name=defender_name,
             attacker_description=attacker_description,
@@ -132,9 +178,50 @@ class LLMActionNarrator(ActionNarrator):
             print("////////////DEBUG ActionNarrator prompt////////////")
             print(prompt)
             print("////////////DEBUG ActionNarrator prompt////////////")
-        output = self.llm.generate_completion(prompt=prompt)
+        output = self.llm.generate_completion(
+            prompt=prompt, system_prompt=self.prompt.system_prompt
+        )
         if self.debug:
             print("////////////DEBUG ActionNarrator output////////////")
             print(output)
             print("////////////DEBUG ActionNarrator output////////////")
         return self._sanitize_text(output)
+
+    def describe_action_stream(
+        self,
+        proposed_action_attacker: str,
+        hero: Hero,
+        enemy: Enemy,
+        is_hero_attacker: bool,
+        battle_log_string: str,
+        judgment: ActionJudgment,
+        total_damage: int,
+    ) -> Iterator[str]:
+        prompt = self._get_prompt(
+            hero=hero,
+            enemy=enemy,
+            is_hero_attacker=is_hero_attacker,
+            battle_log_string=battle_log_string,
+            proposed_action_attacker=proposed_action_attacker,
+            judgment=judgment,
+            total_damage=total_damage,
+        )
+        if self.debug:
+            print("////////////DEBUG ActionNarrator prompt////////////")
+            print(prompt)
+            print("////////////DEBUG ActionNarrator prompt////////////")
+        output = ""
+        emitted = ""
+        for chunk in self.llm.generate_completion_stream(
+            prompt=prompt, system_prompt=self.prompt.system_prompt
+        ):
+            output += chunk
+            # sanitizing collapses whitespace, so only emit the stable prefix
+            sanitized = self._sanitize_text(output)
+            if sanitized.startswith(emitted) and len(sanitized) > len(emitted):
+                yield sanitized[len(emitted) :]
+                emitted = sanitized
+        if self.debug:
+            print("////////////DEBUG ActionNarrator output////////////")
+            print(output)
+            print("////////////DEBUG ActionNarrator output////////////")
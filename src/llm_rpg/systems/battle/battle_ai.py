@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Iterator
 
 from llm_rpg.systems.battle.action_judges import ActionJudge, ActionJudgment
 from llm_rpg.systems.battle.action_narrators import ActionNarrator
@@ -56,10 +57,7 @@ class BattleAI:
             enemy=enemy,
             is_hero_attacker=is_hero_attacker,
             battle_log_string=battle_log_string,
-            judgment=ActionJudgment(
-                feasibility=judgment.feasibility,
-                potential_damage=judgment.potential_damage,
-            ),
+            judgment=judgment,
             total_damage=total_damage,
         )
         return ActionEffect(
@@ -67,3 +65,23 @@ class BattleAI:
             potential_damage=judgment.potential_damage,
             effect_description=effect_description,
         )
+
+    def describe_action_stream(
+        self,
+        proposed_action_attacker: str,
+        hero: Hero,
+        enemy: Enemy,
+        is_hero_attacker: bool,
+        battle_log_string: str,
+        judgment: ActionJudgment,
+        total_damage: int,
+    ) -> Iterator[str]:
+        return self.action_narrator.describe_action_stream(
+            proposed_action_attacker=proposed_action_attacker,
+            hero=hero,
+            enemy=enemy,
+            is_hero_attacker=is_hero_attacker,
+            battle_log_string=battle_log_string,
+            judgment=judgment,
+            total_damage=total_damage,
+        )
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from llm_rpg.llm.token_counter import TokenCounter
+
+if TYPE_CHECKING:
+    from llm_rpg.systems.battle.battle_log import BattleEvent
+
+
+def format_event_for_battle_ai(event: BattleEvent) -> str:
+    return f"{event.character_name} turn: {event.effect_description}\n"
+
+
+class BattleContextBuilder:
+    def __init__(
+        self,
+        token_counter: TokenCounter,
+        token_budgets: dict[str, int],
+        max_events: int = 5,
+        default_token_budget: Optional[int] = None,
+    ):
+        self.token_counter = token_counter
+        self.token_budgets = token_budgets
+        self.max_events = max_events
+        self.default_token_budget = default_token_budget
+
+    def _summarize(self, events: list[BattleEvent]) -> str:
+        damage_by_character: dict[str, int] = {}
+        for event in events:
+            damage_by_character[event.character_name] = (
+                damage_by_character.get(event.character_name, 0)
+                + event.damage_calculation_result.total_dmg
+            )
+        damage_text = ", ".join(
+            f"{name} dealt {damage} damage"
+            for name, damage in damage_by_character.items()
+        )
+        return f"Earlier turns ({len(events)}): {damage_text}\n"
+
+    def build(self, events: list[BattleEvent], call_site: str) -> str:
+        token_budget = self.token_budgets.get(call_site, self.default_token_budget)
+        recent_events = events[-self.max_events :] if self.max_events > 0 else []
+        if token_budget is None:
+            return "".join(format_event_for_battle_ai(e) for e in recent_events)
+
+        # newest events first, the latest one is always kept even if truncated
+        lines: list[str] = []
+        n_tokens = 0
+        for event in reversed(recent_events):
+            line = format_event_for_battle_ai(event)
+            n_line_tokens = self.token_counter.count_tokens(line)
+            if n_tokens + n_line_tokens <= token_budget:
+                lines.append(line)
+                n_tokens += n_line_tokens
+                continue
+            if not lines:
+                # keep one token for the newline
+                truncated = self.token_counter.truncate(line, token_budget - 1)
+                lines.append(truncated.rstrip() + "\n")
+                n_tokens = token_budget
+            break
+
+        older_events = events[: len(events) - len(lines)]
+        if older_events:
+            summary = self._summarize(older_events)
+            if n_tokens + self.token_counter.count_tokens(summary) <= token_budget:
+                lines.append(summary)
+        return "".join(reversed(lines))
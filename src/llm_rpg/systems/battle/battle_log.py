@@ -1,4 +1,10 @@
 from dataclasses import dataclass
+from typing import Optional
+
+from llm_rpg.systems.battle.battle_context import (
+    BattleContextBuilder,
+    format_event_for_battle_ai,
+)
 from llm_rpg.systems.battle.damage_calculator import DamageCalculationResult
 
 
@@ -12,8 +18,9 @@ class BattleEvent:
 
 
 class BattleLog:
-    def __init__(self):
+    def __init__(self, context_builder: Optional[BattleContextBuilder] = None):
         self.events: list[BattleEvent] = []
+        self.context_builder = context_builder
 
     def add_event(self, event: BattleEvent):
         self.events.append(event)
@@ -23,12 +30,14 @@ class BattleLog:
             return []
         return self.events[-n_events:]
 
-    def to_string_for_battle_ai(self, n_actions: int = 5):
+    def to_string_for_battle_ai(
+        self, n_actions: int = 5, call_site: Optional[str] = None
+    ):
+        if self.context_builder is not None and call_site is not None:
+            return self.context_builder.build(self.events, call_site)
         battle_log_text = ""
         for event in self.events[-n_actions:]:
-            battle_log_text += (
-                f"{event.character_name} turn: {event.effect_description}\n"
-            )
+            battle_log_text += format_event_for_battle_ai(event)
         return battle_log_text
 
     def get_string_of_last_events(self, n_events: int, debug_mode: bool = False):
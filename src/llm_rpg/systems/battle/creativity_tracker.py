@@ -1,45 +1,56 @@
 import re
 
 
+STOP_WORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "by",
+    "has",
+    "he",
+    "in",
+    "is",
+    "it",
+    "of",
+    "on",
+    "that",
+    "the",
+    "to",
+}
+
+
+def get_preprocessed_words(action: str, stop_words: set[str] = STOP_WORDS):
+    # convert to lowercase
+    action = action.lower()
+    # remove special characters
+    action = re.sub(r"[^a-z\s]", "", action)
+    # split into words
+    words = action.split()
+    # Remove common stop words
+    words = [word for word in words if word not in stop_words]
+
+    return words
+
+
+def normalize_action(action: str) -> str:
+    return " ".join(get_preprocessed_words(action))
+
+
 class CreativityTracker:
     def __init__(
         self,
         word_overuse_threshold,
     ):
         self.words_used = {}
-        self.stop_words = {
-            "a",
-            "an",
-            "and",
-            "are",
-            "as",
-            "at",
-            "be",
-            "by",
-            "has",
-            "he",
-            "in",
-            "is",
-            "it",
-            "of",
-            "on",
-            "that",
-            "the",
-            "to",
-        }
+        self.stop_words = set(STOP_WORDS)
         self.word_overuse_threshold = word_overuse_threshold
 
     def _get_preprocessed_words_in_action(self, action: str):
-        # convert to lowercase
-        action = action.lower()
-        # remove special characters
-        action = re.sub(r"[^a-z\s]", "", action)
-        # split into words
-        words = action.split()
-        # Remove common stop words
-        words = [word for word in words if word not in self.stop_words]
-
-        return words
+        return get_preprocessed_words(action, self.stop_words)
 
     def add_action(self, action: str):
         for word in self._get_preprocessed_words_in_action(action):
@@ -3,6 +3,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 
 from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.prompt_templates import PromptTemplate
 from typing import TYPE_CHECKING
 
 from llm_rpg.systems.battle.battle_log import BattleLog
@@ -20,17 +21,33 @@ class EnemyActionGenerator(ABC):
         raise NotImplementedError
 
 
+ENEMY_ACTION_PROMPT_FIELDS = [
+    "self_name",
+    "self_description",
+    "self_max_hp",
+    "hero_name",
+    "hero_description",
+    "hero_max_hp",
+    "battle_log_string",
+]
+
+
 class LLMEnemyActionGenerator(EnemyActionGenerator):
-    def __init__(self, llm: LLM, prompt: str, debug: bool = False):
+    def __init__(self, llm: LLM, prompt: str | dict, debug: bool = False):
         self.llm = llm
-        self.prompt = prompt
+        self.prompt = PromptTemplate.from_config(
+            prompt,
+            name="enemy_next_action",
+            allowed_fields=ENEMY_ACTION_PROMPT_FIELDS,
+            required_fields=["self_name"],
+        )
         self.debug = debug
 
     def generate_next_action(
         self, enemy: Enemy, hero: Hero, battle_log: BattleLog
     ) -> str:
-        battle_log_string = battle_log.to_string_for_battle_ai()
-        prompt = self.prompt.format(
+        battle_log_string = battle_log.to_string_for_battle_ai(call_site="enemy_action")
+        prompt = self.prompt.render(
             self_name=enemy.name,
             self_description=enemy.description,
             self_max_hp=enemy.get_current_stats().max_hp,
@@ -43,4 +60,6 @@ class LLMEnemyActionGenerator(EnemyActionGenerator):
             print("////////////DEBUG EnemyAction prompt////////////")
             print(prompt)
             print("////////////DEBUG EnemyAction prompt////////////")
-        return self.llm.generate_completion(prompt)
+        return self.llm.generate_completion(
+            prompt, system_prompt=self.prompt.system_prompt
+        )
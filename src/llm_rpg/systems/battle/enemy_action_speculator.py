@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+from llm_rpg.systems.battle.battle_log import BattleLog
+
+if TYPE_CHECKING:
+    from llm_rpg.llm.metrics import LLMMetricsRegistry
+    from llm_rpg.systems.battle.enemy import Enemy
+    from llm_rpg.systems.hero.hero import Hero
+
+
+def get_enemy_action_key(enemy: Enemy, hero: Hero, battle_log: BattleLog) -> tuple:
+    # everything the enemy action prompt is rendered from
+    return (
+        id(enemy),
+        enemy.name,
+        enemy.get_current_stats().max_hp,
+        hero.name,
+        hero.description,
+        hero.get_current_stats().max_hp,
+        len(battle_log.events),
+        battle_log.to_string_for_battle_ai(call_site="enemy_action"),
+    )
+
+
+class EnemyActionSpeculator:
+    def __init__(
+        self,
+        metrics: Optional[LLMMetricsRegistry] = None,
+        model: Optional[str] = None,
+    ):
+        self._lock = threading.Lock()
+        self._future: Optional[concurrent.futures.Future[tuple[tuple, str]]] = None
+        # recorded next to the enemy action requests they are billed with
+        self.metrics = metrics
+        self.model = model
+        self.n_started = 0
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_cancelled = 0
+
+    def _record(self, outcome: str):
+        if self.metrics is not None:
+            self.metrics.record_speculation("enemy_action", self.model, outcome)
+
+    def start(
+        self,
+        enemy: Enemy,
+        hero: Hero,
+        battle_log: BattleLog,
+        wait_for: Optional[Callable[[], None]] = None,
+    ):
+        future: concurrent.futures.Future[tuple[tuple, str]] = (
+            concurrent.futures.Future()
+        )
+
+        def run():
+            try:
+                # e.g. wait for the hero narration, it is part of the battle log
+                if wait_for is not None:
+                    wait_for()
+                # cancelled while waiting, skip the request
+                if not future.set_running_or_notify_cancel():
+                    return
+                key = get_enemy_action_key(enemy, hero, battle_log)
+                future.set_result((key, enemy.get_next_action(battle_log, hero)))
+            except Exception as exc:
+                future.set_exception(exc)
+
+        self.cancel()
+        with self._lock:
+            self._future = future
+            self.n_started += 1
+        self._record("started")
+        threading.Thread(target=run, daemon=True, name="enemy-speculation").start()
+
+    def take(self, enemy: Enemy, hero: Hero, battle_log: BattleLog) -> Optional[str]:
+        with self._lock:
+            future = self._future
+            self._future = None
+        if future is None:
+            return None
+        try:
+            key, action = future.result()
+        except Exception:
+            key, action = None, None
+        if action is None or key != get_enemy_action_key(enemy, hero, battle_log):
+            self.n_misses += 1
+            self._record("misses")
+            return None
+        self.n_hits += 1
+        self._record("hits")
+        return action
+
+    def cancel(self):
+        # a request that already started cannot be aborted, its result is
+        # just never used
+        with self._lock:
+            future = self._future
+            self._future = None
+            if future is not None:
+                self.n_cancelled += 1
+        if future is not None:
+            future.cancel()
+            self._record("cancelled")
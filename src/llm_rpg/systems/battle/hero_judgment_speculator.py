@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from llm_rpg.systems.battle.action_judges import ActionJudgment
+from llm_rpg.systems.battle.battle_log import BattleLog
+
+if TYPE_CHECKING:
+    from llm_rpg.llm.metrics import LLMMetricsRegistry
+    from llm_rpg.systems.battle.battle_ai import BattleAI
+    from llm_rpg.systems.battle.enemy import Enemy
+    from llm_rpg.systems.hero.hero import Hero
+
+
+def get_hero_judgment_key(
+    action: str, hero: Hero, enemy: Enemy, battle_log: BattleLog
+) -> tuple:
+    # everything the judge prompt is rendered from
+    return (
+        action,
+        id(hero),
+        hero.name,
+        hero.description,
+        tuple((item.name, item.description) for item in hero.inventory.items),
+        id(enemy),
+        enemy.name,
+        enemy.description,
+        len(battle_log.events),
+        battle_log.to_string_for_battle_ai(call_site="judge"),
+    )
+
+
+class HeroJudgmentSpeculator:
+    def __init__(
+        self,
+        battle_ai: BattleAI,
+        metrics: Optional[LLMMetricsRegistry] = None,
+        model: Optional[str] = None,
+    ):
+        self.battle_ai = battle_ai
+        # speculative requests are billed to the judge call site, the outcomes
+        # are recorded next to them so the wasted requests show up in the export
+        self.metrics = metrics
+        self.model = model
+        self._lock = threading.Lock()
+        self._key: Optional[tuple] = None
+        self._future: Optional[concurrent.futures.Future[ActionJudgment]] = None
+        self.n_started = 0
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_cancelled = 0
+
+    def _record(self, outcome: str):
+        if self.metrics is not None:
+            self.metrics.record_speculation("judge", self.model, outcome)
+
+    @property
+    def action(self) -> Optional[str]:
+        with self._lock:
+            return self._key[0] if self._key is not None else None
+
+    def start(self, action: str, hero: Hero, enemy: Enemy, battle_log: BattleLog):
+        key = get_hero_judgment_key(action, hero, enemy, battle_log)
+        future: concurrent.futures.Future[ActionJudgment] = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(
+                    self.battle_ai.determine_action_judgment(
+                        proposed_action_attacker=action,
+                        hero=hero,
+                        enemy=enemy,
+                        is_hero_attacker=True,
+                        battle_log_string=key[-1],
+                    )
+                )
+            except Exception as exc:
+                future.set_exception(exc)
+
+        self.cancel()
+        with self._lock:
+            self._key = key
+            self._future = future
+            self.n_started += 1
+        self._record("started")
+        threading.Thread(target=run, daemon=True, name="hero-speculation").start()
+
+    def cancel(self):
+        # the request itself cannot be aborted, its result is just never used
+        with self._lock:
+            is_cancelled = self._future is not None
+            if is_cancelled:
+                self.n_cancelled += 1
+            self._key = None
+            self._future = None
+        if is_cancelled:
+            self._record("cancelled")
+
+    def take(
+        self, action: str, hero: Hero, enemy: Enemy, battle_log: BattleLog
+    ) -> Optional[ActionJudgment]:
+        with self._lock:
+            key, future = self._key, self._future
+            self._key = None
+            self._future = None
+        if future is None:
+            return None
+        if key != get_hero_judgment_key(action, hero, enemy, battle_log):
+            self.n_misses += 1
+            self._record("misses")
+            return None
+        try:
+            judgment = future.result()
+        except Exception:
+            self.n_misses += 1
+            self._record("misses")
+            return None
+        self.n_hits += 1
+        self._record("hits")
+        return judgment
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+from dataclasses import asdict, dataclass, field
+import json
+from pathlib import Path
+import statistics
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from llm_rpg.llm.metrics import get_percentile
+from llm_rpg.llm.retry import LLMErrorKind, classify_llm_error
+from llm_rpg.systems.battle.action_judges import (
+    ActionJudge,
+    ActionJudgeRequest,
+    ActionJudgment,
+)
+
+DEFAULT_CASES_PATH = "benchmarks/judge_cases.jsonl"
+AGREEMENT_TOLERANCE = 0.2
+
+
+@dataclass(frozen=True)
+class BenchmarkItem:
+    name: str
+    description: str
+
+
+@dataclass(frozen=True)
+class BenchmarkInventory:
+    items: list[BenchmarkItem] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class BenchmarkCharacter:
+    # the judges only read the name, description and items of a character
+    name: str
+    description: str
+    inventory: BenchmarkInventory = field(default_factory=BenchmarkInventory)
+
+
+@dataclass(frozen=True)
+class JudgeCase:
+    request: ActionJudgeRequest
+    reference: ActionJudgment
+
+
+@dataclass(frozen=True)
+class JudgeBenchmarkReport:
+    n_cases: int
+    n_failures: int
+    failure_rate: float
+    n_parse_failures: int
+    parse_failure_rate: float
+    wall_time_s: float
+    throughput_per_s: float
+    latency_p50_s: Optional[float]
+    latency_p90_s: Optional[float]
+    latency_p99_s: Optional[float]
+    feasibility_mae: Optional[float]
+    potential_damage_mae: Optional[float]
+    feasibility_correlation: Optional[float]
+    potential_damage_correlation: Optional[float]
+    agreement_rate: Optional[float]
+
+
+def _load_character(data: dict) -> BenchmarkCharacter:
+    items = [
+        BenchmarkItem(name=item["name"], description=item["description"])
+        for item in data.get("items", [])
+    ]
+    return BenchmarkCharacter(
+        name=data["name"],
+        description=data["description"],
+        inventory=BenchmarkInventory(items=items),
+    )
+
+
+def load_judge_cases(path: str | Path) -> list[JudgeCase]:
+    cases = []
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                request = ActionJudgeRequest(
+                    proposed_action_attacker=data["proposed_action"],
+                    hero=_load_character(data["hero"]),
+                    enemy=_load_character(data["enemy"]),
+                    is_hero_attacker=data.get("is_hero_attacker", True),
+                    battle_log_string=data.get("battle_log", ""),
+                )
+                reference = ActionJudgment(
+                    feasibility=float(data["reference"]["feasibility"]),
+                    potential_damage=float(data["reference"]["potential_damage"]),
+                )
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"Invalid judge case on line {line_number}") from exc
+            cases.append(JudgeCase(request=request, reference=reference))
+    return cases
+
+
+def _get_correlation(pairs: list[tuple[float, float]]) -> Optional[float]:
+    try:
+        return statistics.correlation([x for x, _ in pairs], [y for _, y in pairs])
+    except statistics.StatisticsError:
+        # fewer than two values or a constant series
+        return None
+
+
+def is_parse_failure(exc: Exception) -> bool:
+    # the judges wrap the provider error in a ValueError
+    return classify_llm_error(exc.__cause__ or exc) == LLMErrorKind.PARSE
+
+
+def _time_chunk(
+    judge: ActionJudge, chunk: list[JudgeCase]
+) -> tuple[float, Optional[list[ActionJudgment]], Optional[Exception]]:
+    requests = [case.request for case in chunk]
+    start = time.perf_counter()
+    try:
+        if len(requests) == 1:
+            request = requests[0]
+            judgments = [
+                judge.judge_action(
+                    proposed_action_attacker=request.proposed_action_attacker,
+                    hero=request.hero,
+                    enemy=request.enemy,
+                    is_hero_attacker=request.is_hero_attacker,
+                    battle_log_string=request.battle_log_string,
+                )
+            ]
+        else:
+            judgments = judge.judge_actions(requests)
+    except Exception as exc:
+        return time.perf_counter() - start, None, exc
+    return time.perf_counter() - start, judgments, None
+
+
+def run_judge_benchmark(
+    judge: ActionJudge,
+    cases: list[JudgeCase],
+    concurrency: int = 1,
+    batch_size: int = 1,
+    n_warmup: int = 0,
+) -> JudgeBenchmarkReport:
+    if concurrency < 1 or batch_size < 1:
+        raise ValueError("Benchmark concurrency and batch_size must be at least 1")
+    judge.warmup()
+    for case in cases[:n_warmup]:
+        _time_chunk(judge, [case])
+
+    # with batching, every case in a batch is charged the latency of the batch
+    chunks = [cases[i : i + batch_size] for i in range(0, len(cases), batch_size)]
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda chunk: _time_chunk(judge, chunk), chunks))
+    wall_time_s = time.perf_counter() - start
+
+    latencies: list[float] = []
+    pairs: list[tuple[ActionJudgment, ActionJudgment]] = []
+    n_failures = 0
+    n_parse_failures = 0
+    for chunk, (latency_s, judgments, error) in zip(chunks, results):
+        latencies.extend([latency_s] * len(chunk))
+        if judgments is None:
+            n_failures += len(chunk)
+            if is_parse_failure(error):
+                n_parse_failures += len(chunk)
+            continue
+        pairs.extend(
+            (judgment, case.reference) for judgment, case in zip(judgments, chunk)
+        )
+
+    feasibility = [(j.feasibility, r.feasibility) for j, r in pairs]
+    potential_damage = [(j.potential_damage, r.potential_damage) for j, r in pairs]
+    n_agreeing = sum(
+        abs(j.feasibility - r.feasibility) <= AGREEMENT_TOLERANCE
+        and abs(j.potential_damage - r.potential_damage) <= AGREEMENT_TOLERANCE
+        for j, r in pairs
+    )
+    return JudgeBenchmarkReport(
+        n_cases=len(cases),
+        n_failures=n_failures,
+        failure_rate=n_failures / len(cases) if cases else 0.0,
+        n_parse_failures=n_parse_failures,
+        parse_failure_rate=n_parse_failures / len(cases) if cases else 0.0,
+        wall_time_s=wall_time_s,
+        throughput_per_s=len(cases) / wall_time_s if wall_time_s > 0 else 0.0,
+        latency_p50_s=get_percentile(latencies, 50),
+        latency_p90_s=get_percentile(latencies, 90),
+        latency_p99_s=get_percentile(latencies, 99),
+        feasibility_mae=(
+            statistics.fmean(abs(x - y) for x, y in feasibility)
+            if feasibility
+            else None
+        ),
+        potential_damage_mae=(
+            statistics.fmean(abs(x - y) for x, y in potential_damage)
+            if potential_damage
+            else None
+        ),
+        feasibility_correlation=_get_correlation(feasibility),
+        potential_damage_correlation=_get_correlation(potential_damage),
+        agreement_rate=n_agreeing / len(pairs) if pairs else None,
+    )
+
+
+def format_report(report: JudgeBenchmarkReport) -> str:
+    lines = []
+    for name, value in asdict(report).items():
+        if isinstance(value, float):
+            value = f"{value:.4f}"
+        lines.append(f"{name:30} {value}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay judge cases through the configured action judge"
+    )
+    parser.add_argument("cases", nargs="?", default=DEFAULT_CASES_PATH)
+    parser.add_argument("--config", default="config/game_config.yaml")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    from llm_rpg.game.game_config import GameConfig
+
+    load_dotenv("config/.env.secret")
+    config = GameConfig(args.config)
+    try:
+        report = run_judge_benchmark(
+            config.action_judge,
+            load_judge_cases(args.cases),
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            n_warmup=args.warmup,
+        )
+    finally:
+        config.close()
+    print(format_report(report))
+    if args.json_path is not None:
+        Path(args.json_path).write_text(json.dumps(asdict(report), indent=2))
+
+
+if __name__ == "__main__":
+    main()
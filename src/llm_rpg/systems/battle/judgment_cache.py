@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+import time
+from typing import Optional
+
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+from llm_rpg.systems.battle.action_judges import (
+    ActionJudge,
+    ActionJudgeRequest,
+    ActionJudgment,
+)
+from llm_rpg.systems.battle.action_narrators import ActionNarrator
+from llm_rpg.systems.battle.creativity_tracker import normalize_action
+from llm_rpg.systems.battle.enemy import Enemy
+from llm_rpg.systems.hero.hero import Hero
+
+
+class CachedActionJudge(ActionJudge):
+    # the battle history is deliberately not part of the key, repeats are still
+    # punished by the creativity penalty in the damage calculation
+    def __init__(
+        self,
+        judge: ActionJudge,
+        max_entries: int = 256,
+        ttl_s: Optional[float] = None,
+        metrics: Optional[LLMMetricsRegistry] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("Judgment cache max_entries must be at least 1")
+        if isinstance(judge, ActionNarrator):
+            # a hit would replay the narration written for the first action
+            raise ValueError("Judgment cache cannot wrap a judge that also narrates")
+        self.judge = judge
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.metrics = metrics
+        self._entries: OrderedDict[tuple, tuple[float, ActionJudgment]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.n_hits = 0
+        self.n_misses = 0
+
+    @property
+    def llm(self) -> Optional[LLM]:
+        # so that the cost of the wrapped judge is still reported
+        return getattr(self.judge, "llm", None)
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        n_lookups = self.n_hits + self.n_misses
+        return self.n_hits / n_lookups if n_lookups else None
+
+    def _get_key(
+        self,
+        proposed_action_attacker: str,
+        hero: Hero,
+        enemy: Enemy,
+        is_hero_attacker: bool,
+    ) -> tuple:
+        attacker, defender = (hero, enemy) if is_hero_attacker else (enemy, hero)
+        return (
+            normalize_action(proposed_action_attacker),
+            is_hero_attacker,
+            attacker.name,
+            attacker.description,
+            defender.name,
+            defender.description,
+            frozenset((item.name, item.description) for item in hero.inventory.items),
+        )
+
+    def _get(self, key: tuple) -> Optional[ActionJudgment]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, judgment = entry
+            if self.ttl_s is not None and time.monotonic() - created_at > self.ttl_s:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return judgment
+
+    def _put(self, key: tuple, judgment: ActionJudgment):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), judgment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _record_lookup(self, is_hit: bool):
+        with self._lock:
+            if is_hit:
+                self.n_hits += 1
+            else:
+                self.n_misses += 1
+        if self.metrics is not None:
+            self.metrics.record_cache_lookup("judge", "judgment_cache", is_hit)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def judge_action(
+        self,
+        proposed_action_attacker: str,
+        hero: Hero,
+        enemy: Enemy,
+        is_hero_attacker: bool,
+        battle_log_string: str,
+    ) -> ActionJudgment:
+        key = self._get_key(proposed_action_attacker, hero, enemy, is_hero_attacker)
+        judgment = self._get(key)
+        self._record_lookup(judgment is not None)
+        if judgment is not None:
+            return judgment
+        judgment = self.judge.judge_action(
+            proposed_action_attacker=proposed_action_attacker,
+            hero=hero,
+            enemy=enemy,
+            is_hero_attacker=is_hero_attacker,
+            battle_log_string=battle_log_string,
+        )
+        self._put(key, judgment)
+        return judgment
+
+    def judge_actions(self, requests: list[ActionJudgeRequest]) -> list[ActionJudgment]:
+        keys = [
+            self._get_key(
+                request.proposed_action_attacker,
+                request.hero,
+                request.enemy,
+                request.is_hero_attacker,
+            )
+            for request in requests
+        ]
+        judgments = [self._get(key) for key in keys]
+        for judgment in judgments:
+            self._record_lookup(judgment is not None)
+        missing = [i for i, judgment in enumerate(judgments) if judgment is None]
+        if missing:
+            fresh_judgments = self.judge.judge_actions([requests[i] for i in missing])
+            for i, judgment in zip(missing, fresh_judgments):
+                self._put(keys[i], judgment)
+                judgments[i] = judgment
+        return judgments
+
+    def warmup(self):
+        self.judge.warmup()
+
+    def close(self):
+        self.judge.close()
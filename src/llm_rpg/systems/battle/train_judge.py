@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import random
+
+from llm_rpg.systems.battle.action_judges import format_action_judge_context
+from llm_rpg.systems.battle.judge_benchmark import JudgeCase, load_judge_cases
+
+DEFAULT_BASE_MODEL = "prajjwal1/bert-tiny"
+
+
+def get_training_inputs(cases: list[JudgeCase]) -> list[tuple[str, str]]:
+    # the same (action, context) pairs TransformersActionJudge scores
+    return [
+        (
+            case.request.proposed_action_attacker,
+            format_action_judge_context(
+                hero=case.request.hero,
+                enemy=case.request.enemy,
+                is_hero_attacker=case.request.is_hero_attacker,
+                battle_log_string=case.request.battle_log_string,
+            ),
+        )
+        for case in cases
+    ]
+
+
+def train_judge_model(
+    cases: list[JudgeCase],
+    output_dir: str,
+    base_model: str = DEFAULT_BASE_MODEL,
+    n_epochs: int = 3,
+    batch_size: int = 16,
+    learning_rate: float = 5e-5,
+    max_length: int = 256,
+    seed: int = 0,
+):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    if not cases:
+        raise ValueError("No judge cases to train on")
+    if n_epochs < 1 or batch_size < 1:
+        raise ValueError("Judge training n_epochs and batch_size must be at least 1")
+    torch.manual_seed(seed)
+    tokenizer = AutoTokenizer.from_pretrained(base_model)
+    # a fresh two output regression head on top of the base model
+    model = AutoModelForSequenceClassification.from_pretrained(
+        base_model,
+        num_labels=2,
+        problem_type="regression",
+        ignore_mismatched_sizes=True,
+    )
+    inputs = get_training_inputs(cases)
+    labels = torch.tensor(
+        [
+            [case.reference.feasibility, case.reference.potential_damage]
+            for case in cases
+        ]
+    )
+    optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
+    order = list(range(len(cases)))
+    rng = random.Random(seed)
+    model.train()
+    for _ in range(n_epochs):
+        rng.shuffle(order)
+        for start in range(0, len(order), batch_size):
+            indices = order[start : start + batch_size]
+            encoding = tokenizer(
+                [inputs[i][0] for i in indices],
+                [inputs[i][1] for i in indices],
+                padding=True,
+                truncation="only_second",
+                max_length=max_length,
+                return_tensors="pt",
+            )
+            loss = model(**encoding, labels=labels[indices]).loss
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad()
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train a local action judge model on judge cases"
+    )
+    parser.add_argument("cases")
+    parser.add_argument("output_dir")
+    parser.add_argument("--base-model", default=DEFAULT_BASE_MODEL)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--learning-rate", type=float, default=5e-5)
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    train_judge_model(
+        load_judge_cases(args.cases),
+        args.output_dir,
+        base_model=args.base_model,
+        n_epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        max_length=args.max_length,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,28 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
-import json
+from functools import lru_cache
 import random
-from typing import Annotated
+import threading
+from typing import TYPE_CHECKING, Annotated, Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError, WithJsonSchema, create_model
 
 from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.prompt_templates import PromptTemplate
 import pygame
 
-from llm_rpg.sprite_generator.sprite_generator import (
-    SpriteGenerator,
-)
 from llm_rpg.systems.battle.enemy import Enemy, EnemyArchetypes
 from llm_rpg.systems.battle.enemy_action_generators import EnemyActionGenerator
+from llm_rpg.systems.generation.enemy_library import EnemyLibrary, EnemySeed
 from llm_rpg.objects.character import Stats
 
+if TYPE_CHECKING:
+    from llm_rpg.sprite_generator.sprite_generator import SpriteGenerator
+
+ENEMY_GENERATION_PROMPT_FIELDS = ["enemy_character", "enemy_adjective", "enemy_place"]
+
 
 @dataclass(frozen=True)
 class EnemyDescription:
@@ -41,11 +47,33 @@ class LLMEnemyDescriptionOutput(BaseModel):
     ]
 
 
+@lru_cache(maxsize=None)
+def get_enemy_batch_output_model(n_cases: int) -> type[BaseModel]:
+    # items are validated one by one so that a single bad enemy does not
+    # discard the rest of the batch. the length is only pinned in the schema,
+    # so providers and the fake backends return one enemy per case while a
+    # short batch still keeps its valid enemies
+    return create_model(
+        f"LLMEnemyDescriptionBatch{n_cases}Output",
+        enemies=(
+            list[
+                Annotated[
+                    Any, WithJsonSchema(LLMEnemyDescriptionOutput.model_json_schema())
+                ]
+            ],
+            Field(
+                description="One enemy per case, in the order of the cases.",
+                json_schema_extra={"minItems": n_cases, "maxItems": n_cases},
+            ),
+        ),
+    )
+
+
 class EnemyGenerator:
     def __init__(
         self,
         llm: LLM,
-        prompt: str,
+        prompt: str | dict,
         enemy_action_generator: EnemyActionGenerator,
         base_stats: Stats,
         sprite_generator: SpriteGenerator,
@@ -53,9 +81,30 @@ class EnemyGenerator:
         adjectives: list[str],
         places: list[str],
         debug: bool = False,
+        enemy_library: Optional[EnemyLibrary] = None,
+        library_reuse_ratio: float = 0.0,
+        batch_size: int = 1,
     ):
+        if not 0 <= library_reuse_ratio <= 1:
+            raise ValueError("Enemy library reuse ratio must be between 0 and 1")
+        if batch_size < 1:
+            raise ValueError("Enemy generation batch_size must be at least 1")
         self.llm = llm
-        self.prompt = prompt
+        self.prompt = PromptTemplate.from_config(
+            prompt,
+            name="enemy_generation",
+            allowed_fields=ENEMY_GENERATION_PROMPT_FIELDS,
+            output_model=LLMEnemyDescriptionOutput,
+        )
+        self.batch_prompt = PromptTemplate.from_config(
+            prompt,
+            name="enemy_generation_batch",
+            allowed_fields=ENEMY_GENERATION_PROMPT_FIELDS,
+            output_model=get_enemy_batch_output_model(batch_size),
+        )
+        self.batch_size = batch_size
+        self._pending_descriptions: deque[tuple[EnemySeed, EnemyDescription]] = deque()
+        self._pending_lock = threading.Lock()
         self.enemy_action_generator = enemy_action_generator
         self.sprite_generator = sprite_generator
         self.base_stats = base_stats
@@ -63,11 +112,37 @@ class EnemyGenerator:
         self.adjectives = adjectives
         self.places = places
         self.debug = debug
+        self.enemy_library = enemy_library
+        self.library_reuse_ratio = library_reuse_ratio
+        self.n_library_hits = 0
 
     def generate_enemy(self) -> tuple[Enemy, pygame.Surface]:
-        enemy_description = self._generate_enemy_description()
+        if (
+            self.enemy_library is not None
+            and random.random() < self.library_reuse_ratio
+        ):
+            stored_enemy = self.enemy_library.sample()
+            if stored_enemy is not None:
+                self.n_library_hits += 1
+                enemy = self._build_enemy(
+                    EnemyDescription(
+                        name=stored_enemy.name, description=stored_enemy.description
+                    )
+                )
+                return enemy, stored_enemy.load_sprite()
+
+        seed, enemy_description = self._get_next_enemy_description()
+        enemy = self._build_enemy(enemy_description)
+        sprite = self.sprite_generator.generate_sprite(enemy)
+        if self.enemy_library is not None:
+            self.enemy_library.put(
+                seed, name=enemy.name, description=enemy.description, sprite=sprite
+            )
+        return enemy, sprite
+
+    def _build_enemy(self, enemy_description: EnemyDescription) -> Enemy:
         archetype = random.choice(list(EnemyArchetypes))
-        enemy = Enemy(
+        return Enemy(
             name=enemy_description.name,
             description=enemy_description.description,
             level=1,
@@ -75,8 +150,6 @@ class EnemyGenerator:
             archetype=archetype,
             enemy_action_generator=self.enemy_action_generator,
         )
-        sprite = self.sprite_generator.generate_sprite(enemy)
-        return enemy, sprite
 
     def _pick_word(self, words: list[str], label: str) -> str:
         if not words:
@@ -85,35 +158,89 @@ class EnemyGenerator:
             )
         return random.choice(words)
 
-    def _get_prompt(self) -> str:
-        enemy_character = self._pick_word(self.characters, "character")
-        enemy_adjective = self._pick_word(self.adjectives, "adjective")
-        enemy_place = self._pick_word(self.places, "place")
-        prompt = self.prompt.format(
-            enemy_character=enemy_character,
-            enemy_adjective=enemy_adjective,
-            enemy_place=enemy_place,
+    def _get_next_enemy_description(self) -> tuple[EnemySeed, EnemyDescription]:
+        if self.batch_size == 1:
+            seed = self._pick_seed()
+            return seed, self._generate_enemy_description(seed)
+        # one caller generates the next batch, the others wait for it
+        with self._pending_lock:
+            if not self._pending_descriptions:
+                seeds = [self._pick_seed() for _ in range(self.batch_size)]
+                self._pending_descriptions.extend(
+                    self._generate_enemy_descriptions(seeds)
+                )
+            return self._pending_descriptions.popleft()
+
+    def _pick_seed(self) -> EnemySeed:
+        return EnemySeed(
+            character=self._pick_word(self.characters, "character"),
+            adjective=self._pick_word(self.adjectives, "adjective"),
+            place=self._pick_word(self.places, "place"),
+        )
+
+    def _get_prompt_values(self, seed: EnemySeed) -> dict[str, str]:
+        return dict(
+            enemy_character=seed.character,
+            enemy_adjective=seed.adjective,
+            enemy_place=seed.place,
+        )
+
+    def _get_prompt(self, seed: EnemySeed) -> str:
+        return self.prompt.render(**self._get_prompt_values(seed))
+
+    def _generate_enemy_description(self, seed: EnemySeed) -> EnemyDescription:
+        prompt = self._get_prompt(seed)
+        if self.debug:
+            print("////////////DEBUG EnemyGeneration prompt////////////")
+            print(prompt)
+            print("////////////DEBUG EnemyGeneration prompt////////////")
+        try:
+            output = self.llm.generate_structured_completion(
+                prompt=prompt,
+                output_model=LLMEnemyDescriptionOutput,
+                system_prompt=self.prompt.system_prompt,
+            )
+        except Exception as exc:
+            raise ValueError("Failed to generate enemy description") from exc
+        return self._to_enemy_description(output)
+
+    def _to_enemy_description(
+        self, output: LLMEnemyDescriptionOutput
+    ) -> EnemyDescription:
+        return EnemyDescription(
+            name=output.name.strip(),
+            description=output.description.strip(),
+        )
+
+    def _generate_enemy_descriptions(
+        self, seeds: list[EnemySeed]
+    ) -> list[tuple[EnemySeed, EnemyDescription]]:
+        prompt = self.batch_prompt.render_cases(
+            header=(
+                f"Generate {len(seeds)} different enemies, one for each of the "
+                "following cases, in the same order."
+            ),
+            cases=[self._get_prompt_values(seed) for seed in seeds],
         )
-        schema = json.dumps(LLMEnemyDescriptionOutput.model_json_schema(), indent=2)
-        return f"{prompt}{schema}"
-
-    def _generate_enemy_description(self) -> EnemyDescription:
-        attempts = 0
-        while attempts < 3:
-            prompt = self._get_prompt()
-            if self.debug:
-                print("////////////DEBUG EnemyGeneration prompt////////////")
-                print(prompt)
-                print("////////////DEBUG EnemyGeneration prompt////////////")
+        if self.debug:
+            print("////////////DEBUG EnemyGeneration batch prompt////////////")
+            print(prompt)
+            print("////////////DEBUG EnemyGeneration batch prompt////////////")
+        try:
+            output = self.llm.generate_structured_completion(
+                prompt=prompt,
+                output_model=self.batch_prompt.output_model,
+                system_prompt=self.batch_prompt.system_prompt,
+            )
+        except Exception as exc:
+            raise ValueError("Failed to generate enemy descriptions") from exc
+        descriptions = []
+        for seed, item in zip(seeds, output.enemies):
             try:
-                output = self.llm.generate_structured_completion(
-                    prompt=prompt, output_model=LLMEnemyDescriptionOutput
-                )
-                return EnemyDescription(
-                    name=output.name.strip(),
-                    description=output.description.strip(),
-                )
-            except Exception as exc:
-                print(exc)
-                attempts += 1
-        raise ValueError("Failed to generate enemy description")
+                enemy_output = LLMEnemyDescriptionOutput.model_validate(item)
+            except ValidationError:
+                continue
+            descriptions.append((seed, self._to_enemy_description(enemy_output)))
+        if not descriptions:
+            raise ValueError("Failed to generate enemy descriptions")
+        return descriptions
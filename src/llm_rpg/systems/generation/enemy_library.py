@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import pygame
+
+
+@dataclass(frozen=True)
+class EnemySeed:
+    character: str
+    adjective: str
+    place: str
+
+
+@dataclass(frozen=True)
+class StoredEnemy:
+    seed: EnemySeed
+    name: str
+    description: str
+    sprite_path: str
+
+    def load_sprite(self) -> pygame.Surface:
+        return pygame.image.load(self.sprite_path).convert_alpha()
+
+
+class EnemyLibrary:
+    # enemies are only reused for the model settings they were generated with
+    def __init__(
+        self,
+        path: str,
+        model_key: str,
+        sprites_dir: Optional[str] = None,
+        max_entries: int = 500,
+    ):
+        if max_entries < 1:
+            raise ValueError("Enemy library max_entries must be at least 1")
+        self.path = path
+        self.model_key = model_key
+        self.sprites_dir = Path(sprites_dir or Path(path).parent / "enemy_sprites")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.sprites_dir.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS enemies ("
+            "character TEXT NOT NULL, "
+            "adjective TEXT NOT NULL, "
+            "place TEXT NOT NULL, "
+            "model_key TEXT NOT NULL, "
+            "name TEXT NOT NULL, "
+            "description TEXT NOT NULL, "
+            "sprite_path TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "PRIMARY KEY (character, adjective, place, model_key))"
+        )
+        self._connection.commit()
+
+    def _get_sprite_path(self, seed: EnemySeed) -> Path:
+        key = "\n".join([seed.character, seed.adjective, seed.place, self.model_key])
+        return self.sprites_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.png"
+
+    def _to_stored_enemy(self, row: tuple) -> StoredEnemy:
+        character, adjective, place, name, description, sprite_path = row
+        return StoredEnemy(
+            seed=EnemySeed(character=character, adjective=adjective, place=place),
+            name=name,
+            description=description,
+            sprite_path=sprite_path,
+        )
+
+    def get(self, seed: EnemySeed) -> Optional[StoredEnemy]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT character, adjective, place, name, description, sprite_path "
+                "FROM enemies WHERE character = ? AND adjective = ? AND place = ? "
+                "AND model_key = ?",
+                (seed.character, seed.adjective, seed.place, self.model_key),
+            ).fetchone()
+        return self._to_stored_enemy(row) if row is not None else None
+
+    def sample(self) -> Optional[StoredEnemy]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT character, adjective, place, name, description, sprite_path "
+                "FROM enemies WHERE model_key = ? ORDER BY RANDOM() LIMIT 1",
+                (self.model_key,),
+            ).fetchone()
+        return self._to_stored_enemy(row) if row is not None else None
+
+    def put(
+        self, seed: EnemySeed, name: str, description: str, sprite: pygame.Surface
+    ) -> StoredEnemy:
+        sprite_path = self._get_sprite_path(seed)
+        with self._lock:
+            pygame.image.save(sprite, str(sprite_path))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO enemies "
+                "(character, adjective, place, model_key, name, description, "
+                "sprite_path, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    seed.character,
+                    seed.adjective,
+                    seed.place,
+                    self.model_key,
+                    name,
+                    description,
+                    str(sprite_path),
+                    time.time(),
+                ),
+            )
+            self._evict()
+            self._connection.commit()
+        return StoredEnemy(
+            seed=seed, name=name, description=description, sprite_path=str(sprite_path)
+        )
+
+    def _evict(self):
+        # the cap is shared by all model settings, the oldest enemies go first
+        (n_entries,) = self._connection.execute(
+            "SELECT COUNT(*) FROM enemies"
+        ).fetchone()
+        n_to_evict = n_entries - self.max_entries
+        if n_to_evict <= 0:
+            return
+        rows = self._connection.execute(
+            "SELECT rowid, sprite_path FROM enemies "
+            "ORDER BY created_at ASC, rowid ASC LIMIT ?",
+            (n_to_evict,),
+        ).fetchall()
+        self._connection.executemany(
+            "DELETE FROM enemies WHERE rowid = ?", [(rowid,) for rowid, _ in rows]
+        )
+        for _, sprite_path in rows:
+            Path(sprite_path).unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (n_entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM enemies WHERE model_key = ?", (self.model_key,)
+            ).fetchone()
+        return n_entries
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections import deque
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import pygame
+
+    from llm_rpg.systems.battle.enemy import Enemy
+    from llm_rpg.systems.generation.enemy_generator import EnemyGenerator
+
+
+class EnemyPool:
+    # enemies are stored unscaled, scale them with the battles won when popped
+    def __init__(
+        self,
+        enemy_generator: EnemyGenerator,
+        size: int = 2,
+        retry_delay_s: float = 2.0,
+        max_consecutive_failures: int = 3,
+    ):
+        if size < 1:
+            raise ValueError("Enemy pool size must be at least 1")
+        if max_consecutive_failures < 1:
+            raise ValueError("Enemy pool max_consecutive_failures must be at least 1")
+        self.enemy_generator = enemy_generator
+        self.size = size
+        self.retry_delay_s = retry_delay_s
+        self.max_consecutive_failures = max_consecutive_failures
+        self._ready: deque[tuple[Enemy, pygame.Surface]] = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._is_closed = False
+        self._last_error: Optional[Exception] = None
+        self.n_consecutive_failures = 0
+        self.n_generated = 0
+        self.n_hits = 0
+        self.n_misses = 0
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._ready)
+
+    def start(self):
+        with self._condition:
+            if self._worker is not None or self._is_closed:
+                return
+            self._worker = threading.Thread(
+                target=self._run, daemon=True, name="enemy-pool"
+            )
+            self._worker.start()
+
+    def pop(self, timeout: Optional[float] = None) -> tuple[Enemy, pygame.Surface]:
+        self.start()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            if self._ready:
+                self.n_hits += 1
+            else:
+                self.n_misses += 1
+            while not self._ready:
+                if self.n_consecutive_failures >= self.max_consecutive_failures:
+                    # the worker keeps retrying, the next pop can succeed again
+                    self.n_consecutive_failures = 0
+                    raise ValueError("Enemy generation failed") from self._last_error
+                remaining_s = (
+                    deadline - time.monotonic() if deadline is not None else None
+                )
+                if remaining_s is not None and remaining_s <= 0:
+                    raise ValueError("Enemy generation timed out")
+                self._condition.wait(remaining_s)
+            enemy = self._ready.popleft()
+            self._condition.notify_all()
+            return enemy
+
+    def close(self):
+        with self._condition:
+            self._is_closed = True
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._is_closed and len(self._ready) >= self.size:
+                    self._condition.wait()
+                if self._is_closed:
+                    return
+            try:
+                enemy = self.enemy_generator.generate_enemy()
+            except Exception as exc:
+                with self._condition:
+                    self._last_error = exc
+                    self.n_consecutive_failures += 1
+                    self._condition.notify_all()
+                    # back off without holding up close()
+                    self._condition.wait(self.retry_delay_s)
+                continue
+            with self._condition:
+                self._ready.append(enemy)
+                self.n_consecutive_failures = 0
+                self.n_generated += 1
+                self._condition.notify_all()
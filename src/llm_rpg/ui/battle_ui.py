@@ -97,6 +97,8 @@ def render_event_card(
     event: BattleEvent | None,
     paged_state: PagedTextState,
     text_override: str | list[str] | None = None,
+    follow_tail: bool = False,
+    error_message: str | None = None,
 ) -> pygame.Rect:
     padding = theme.spacing(2)
     line_spacing = theme.spacing(1)
@@ -115,9 +117,13 @@ def render_event_card(
             )
         else:
             lines = text_override
+    if error_message:
+        lines = [*lines, f"ERROR: {error_message}"]
     if paged_state.lines != lines:
         paged_state.lines = lines
         paged_state.reset()
+        if follow_tail:
+            paged_state.page_index = paged_state.total_pages - 1
     line_height = small_font.get_linesize() + line_spacing
     text_height = line_height * paged_state.lines_per_page - line_spacing
     panel_height = text_height + padding * 2
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import httpx
+
+from llm_rpg.llm import async_llm
+from llm_rpg.llm.async_llm import (
+    AsyncGroqLLM,
+    AsyncOllamaLLM,
+    BackgroundEventLoop,
+    SyncLLMAdapter,
+)
+from llm_rpg.llm.fake_llm import Distribution, LatencyProfile
+from llm_rpg.llm.fake_server import FakeOpenAIServer
+from llm_rpg.llm.http_clients import OpenAIClientRegistry
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.systems.battle.action_judges import LLMActionJudgmentOutput
+
+NO_LATENCY = LatencyProfile(
+    time_to_first_token_s=Distribution(kind="fixed", value=0.0),
+    tokens_per_s=Distribution(kind="fixed", value=1e9),
+)
+
+
+def _schema_prompt(output_model) -> str:
+    schema = json.dumps(output_model.model_json_schema(), indent=2)
+    return f"Judge the action.\nOutput JSON in this format:\n{schema}"
+
+
+def _build_groq_llm(monkeypatch, server, registry) -> AsyncGroqLLM:
+    monkeypatch.setenv("GROQ_API_KEY", "not-needed")
+    monkeypatch.setattr(async_llm, "GROQ_BASE_URL", server.base_url)
+    return AsyncGroqLLM(llm_cost_tracker=LLMCostTracker(), client_registry=registry)
+
+
+def test_async_groq_llm_against_fake_server(monkeypatch):
+    server = FakeOpenAIServer(latency_profile=NO_LATENCY).start()
+    registry = OpenAIClientRegistry()
+    try:
+        llm = _build_groq_llm(monkeypatch, server, registry)
+
+        async def run():
+            try:
+                return await asyncio.gather(
+                    llm.agenerate_completion("narrate"),
+                    llm.agenerate_structured_completion(
+                        _schema_prompt(LLMActionJudgmentOutput),
+                        LLMActionJudgmentOutput,
+                    ),
+                )
+            finally:
+                await registry.aclose()
+
+        text, judgment = asyncio.run(run())
+    finally:
+        server.stop()
+
+    assert text
+    assert 0 <= judgment.potential_damage <= 10
+    assert llm.llm_cost_tracker.total_requests == 2
+    assert llm.llm_cost_tracker.total_cost > 0
+
+
+def test_sync_adapter_round_trip(monkeypatch):
+    server = FakeOpenAIServer(latency_profile=NO_LATENCY).start()
+    registry = OpenAIClientRegistry()
+    event_loop = BackgroundEventLoop(name="test-llm-event-loop")
+    try:
+        llm = SyncLLMAdapter(
+            _build_groq_llm(monkeypatch, server, registry), event_loop=event_loop
+        )
+
+        judgment = llm.generate_structured_completion(
+            _schema_prompt(LLMActionJudgmentOutput), LLMActionJudgmentOutput
+        )
+        text = llm.generate_completion("narrate")
+        event_loop.run(registry.aclose())
+    finally:
+        event_loop.stop()
+        server.stop()
+
+    assert isinstance(judgment, LLMActionJudgmentOutput)
+    assert text
+    assert llm.provider == "AsyncGroqLLM"
+    assert llm.llm_cost_tracker.total_requests == 2
+    assert not event_loop.is_running
+
+
+class _ClosingTransport(httpx.AsyncBaseTransport):
+    def __init__(self):
+        self.is_closed = False
+
+    async def aclose(self):
+        self.is_closed = True
+
+
+def test_async_ollama_llm_closes_its_transport():
+    transport = _ClosingTransport()
+    llm = AsyncOllamaLLM(
+        llm_cost_tracker=LLMCostTracker(), model="llama3", transport=transport
+    )
+
+    asyncio.run(llm.aclose())
+
+    assert transport.is_closed
+
+
+def test_async_groq_llm_tracks_unpriced_models_at_zero_cost(monkeypatch):
+    server = FakeOpenAIServer(latency_profile=NO_LATENCY).start()
+    registry = OpenAIClientRegistry()
+    try:
+        monkeypatch.setenv("GROQ_API_KEY", "not-needed")
+        monkeypatch.setattr(async_llm, "GROQ_BASE_URL", server.base_url)
+        llm = AsyncGroqLLM(
+            llm_cost_tracker=LLMCostTracker(),
+            model="unpriced-model",
+            client_registry=registry,
+        )
+
+        async def run():
+            try:
+                return await llm.agenerate_completion("narrate")
+            finally:
+                await registry.aclose()
+
+        text = asyncio.run(run())
+    finally:
+        server.stop()
+
+    assert text
+    assert llm.llm_cost_tracker.total_requests == 1
+    assert llm.llm_cost_tracker.total_cost == 0
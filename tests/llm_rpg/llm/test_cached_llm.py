@@ -0,0 +1,100 @@
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from llm_rpg.llm.cached_llm import CachedLLM, LLMCacheMissError, LLMResponseCache
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+
+
+class _Output(BaseModel):
+    name: str
+
+
+class _CountingLLM(LLM):
+    def __init__(self):
+        self.model = "test-model"
+        self.llm_cost_tracker = LLMCostTracker()
+        self.calls = 0
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        self.calls += 1
+        self.llm_cost_tracker.add_cost(10, 5, 0.1, 0.2)
+        return f"answer to {prompt}"
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        self.calls += 1
+        return output_model(name=prompt)
+
+
+def test_cache_hit_skips_inner_llm_and_reports_zero_cost(tmp_path):
+    inner = _CountingLLM()
+    llm = CachedLLM(llm=inner, cache=LLMResponseCache(str(tmp_path / "cache.db")))
+
+    assert llm.generate_completion("hello") == "answer to hello"
+    assert llm.generate_completion("hello") == "answer to hello"
+
+    assert inner.calls == 1
+    assert inner.llm_cost_tracker.total_requests == 2
+    assert inner.llm_cost_tracker.total_cache_hits == 1
+    assert inner.llm_cost_tracker.total_cost == pytest.approx(0.3)
+
+
+def test_structured_and_plain_completions_use_separate_keys(tmp_path):
+    inner = _CountingLLM()
+    llm = CachedLLM(llm=inner, cache=LLMResponseCache(str(tmp_path / "cache.db")))
+
+    llm.generate_completion("slime")
+    output = llm.generate_structured_completion("slime", _Output)
+    cached_output = llm.generate_structured_completion("slime", _Output)
+
+    assert inner.calls == 2
+    assert output == cached_output
+
+
+def test_replay_mode_raises_on_miss(tmp_path):
+    path = str(tmp_path / "cache.db")
+    CachedLLM(llm=_CountingLLM(), cache=LLMResponseCache(path)).generate_completion(
+        "recorded"
+    )
+
+    inner = _CountingLLM()
+    replay = CachedLLM(llm=inner, cache=LLMResponseCache(path, read_only=True))
+
+    assert replay.generate_completion("recorded") == "answer to recorded"
+    with pytest.raises(LLMCacheMissError):
+        replay.generate_completion("new prompt")
+    assert inner.calls == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+
+    cache.put("a", "1")
+    now[0] += 1
+    cache.put("b", "2")
+    now[0] += 1
+    assert cache.get("a") == "1"
+    now[0] += 1
+    cache.put("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_expired_entries_are_not_returned(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), ttl_seconds=60)
+
+    cache.put("a", "1")
+    now[0] += 61
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
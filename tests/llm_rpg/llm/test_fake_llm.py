@@ -0,0 +1,129 @@
+import json
+import random
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from llm_rpg.llm.fake_llm import (
+    Distribution,
+    FakeLLM,
+    LatencyProfile,
+    generate_fake_json,
+)
+from llm_rpg.llm.fake_server import FakeOpenAIServer, extract_json_schema
+from llm_rpg.llm.llm import OpenAICompatibleLLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+from llm_rpg.systems.battle.action_judges import LLMActionJudgmentOutput
+
+
+class _EnemyOutput(BaseModel):
+    name: Annotated[str, Field(min_length=2, max_length=40)]
+    description: str
+
+
+NO_LATENCY = LatencyProfile(
+    time_to_first_token_s=Distribution(kind="fixed", value=0.0),
+    tokens_per_s=Distribution(kind="fixed", value=1e9),
+)
+
+
+def _schema_prompt(output_model) -> str:
+    schema = json.dumps(output_model.model_json_schema(), indent=2)
+    return f"Judge the action.\nOutput JSON in this format:\n{schema}"
+
+
+def test_distribution_from_config_and_sampling():
+    rng = random.Random(0)
+
+    assert Distribution.from_config(0.5).sample(rng) == 0.5
+    uniform = Distribution.from_config({"kind": "uniform", "low": 1, "high": 2})
+    assert all(1 <= uniform.sample(rng) <= 2 for _ in range(100))
+    normal = Distribution.from_config({"kind": "normal", "mean": 0, "stddev": 5})
+    assert all(normal.sample(rng) >= 0 for _ in range(100))
+
+
+def test_fake_llm_outputs_are_schema_valid_and_deterministic():
+    llm = FakeLLM(LLMCostTracker(), latency_profile=NO_LATENCY)
+
+    judgment = llm.generate_structured_completion("hit", LLMActionJudgmentOutput)
+    enemy = llm.generate_structured_completion("slime", _EnemyOutput)
+
+    assert 0 <= judgment.feasibility <= 10
+    assert 2 <= len(enemy.name) <= 40
+    assert judgment == llm.generate_structured_completion(
+        "hit", LLMActionJudgmentOutput
+    )
+    assert llm.generate_completion("a") == "".join(llm.generate_completion_stream("a"))
+    assert llm.llm_cost_tracker.total_requests == 5
+
+
+def test_extract_json_schema_takes_last_schema_in_prompt():
+    prompt = _schema_prompt(LLMActionJudgmentOutput)
+
+    assert extract_json_schema(prompt) == LLMActionJudgmentOutput.model_json_schema()
+    assert extract_json_schema("no schema {here}") is None
+
+
+def test_fake_server_speaks_openai_chat_completions():
+    server = FakeOpenAIServer(latency_profile=NO_LATENCY).start()
+    try:
+        llm = OpenAICompatibleLLM(
+            llm_cost_tracker=LLMCostTracker(),
+            model="fake",
+            base_url=server.base_url,
+            api_key="not-needed",
+        )
+
+        judgment = llm.generate_structured_completion(
+            _schema_prompt(LLMActionJudgmentOutput), LLMActionJudgmentOutput
+        )
+        text = llm.generate_completion("narrate")
+        streamed = "".join(llm.generate_completion_stream("narrate"))
+    finally:
+        server.stop()
+
+    assert 0 <= judgment.potential_damage <= 10
+    assert text == streamed
+    assert llm.llm_cost_tracker.total_requests == 3
+    assert len(llm.llm_cost_tracker.time_to_first_token_s) == 1
+
+
+def test_repeated_system_prompt_is_reported_as_cached_prefix():
+    server = FakeOpenAIServer(latency_profile=NO_LATENCY).start()
+    try:
+        llm = OpenAICompatibleLLM(
+            llm_cost_tracker=LLMCostTracker(),
+            model="fake",
+            base_url=server.base_url,
+            api_key="not-needed",
+        )
+        llm.metrics = LLMMetricsRegistry()
+        llm.call_site = "narrator"
+        system_prompt = "You are a video game narrator. " * 20
+
+        llm.generate_completion("turn 1", system_prompt=system_prompt)
+        llm.generate_completion("turn 2", system_prompt=system_prompt)
+    finally:
+        server.stop()
+
+    metrics = llm.metrics.snapshot()["call_sites"]["narrator"]["fake"]
+    assert metrics["cached_input_tokens"] == len(system_prompt) // 4
+    evaluated = metrics["evaluated_prompt_tokens"]
+    assert evaluated["count"] == 2
+    assert evaluated["p50"] < metrics["input_tokens"] / 2
+
+
+def test_fake_json_honours_array_length_limits():
+    rng = random.Random(0)
+    pinned = {"type": "array", "items": {"type": "integer"}}
+
+    assert len(generate_fake_json({**pinned, "minItems": 4, "maxItems": 4}, rng)) == 4
+    assert len(generate_fake_json({**pinned, "maxItems": 0}, rng)) == 0
+    assert len(generate_fake_json(pinned, rng)) == 1
+    for _ in range(20):
+        assert (
+            2
+            <= len(generate_fake_json({**pinned, "minItems": 2, "maxItems": 5}, rng))
+            <= 5
+        )
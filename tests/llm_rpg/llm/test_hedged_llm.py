@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from llm_rpg.llm.hedged_llm import HedgedLLM
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.rate_limiter import RateLimiter
+
+
+class _SlowLLM(LLM):
+    def __init__(
+        self,
+        name: str,
+        latency_s: float,
+        llm_cost_tracker: LLMCostTracker,
+        error: Exception | None = None,
+    ):
+        self.model = name
+        self.latency_s = latency_s
+        self.llm_cost_tracker = llm_cost_tracker
+        self.error = error
+        self.calls = 0
+        self.finished = threading.Event()
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        self.calls += 1
+        try:
+            time.sleep(self.latency_s)
+            if self.error is not None:
+                raise self.error
+            self._record_usage(10, 5, 0.1, 0.2)
+            return f"{self.model}: {prompt}"
+        finally:
+            self.finished.set()
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        raise NotImplementedError
+
+
+class _RecordingRateLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(tokens_per_minute=100000)
+        self.n_acquired = 0
+        self.recorded_tokens = []
+
+    def acquire(self, priority=None, estimated_tokens=0):
+        self.n_acquired += 1
+        return 0.0, 0
+
+    def record_tokens(self, n_tokens: int):
+        self.recorded_tokens.append(n_tokens)
+        super().record_tokens(n_tokens)
+
+
+def _hedged(primary_latency_s, fallback_latency_s, primary_error=None):
+    tracker = LLMCostTracker()
+    primary = _SlowLLM("primary", primary_latency_s, tracker, primary_error)
+    fallback = _SlowLLM("fallback", fallback_latency_s, tracker)
+    return HedgedLLM(primary, fallback, hedge_after_s=0.05), primary, fallback
+
+
+def test_fast_primary_is_not_hedged():
+    llm, _, fallback = _hedged(primary_latency_s=0.0, fallback_latency_s=0.0)
+
+    assert llm.generate_completion("hi") == "primary: hi"
+    assert fallback.calls == 0
+    assert llm.llm_cost_tracker.total_hedged_requests == 0
+
+
+def test_slow_primary_is_hedged_and_fallback_wins():
+    llm, _, fallback = _hedged(primary_latency_s=1.0, fallback_latency_s=0.0)
+
+    start = time.perf_counter()
+    assert llm.generate_completion("hi") == "fallback: hi"
+    assert time.perf_counter() - start < 0.5
+    assert fallback.calls == 1
+    assert llm.llm_cost_tracker.total_hedged_requests == 1
+    assert llm.llm_cost_tracker.total_fallback_wins == 1
+
+
+def test_primary_can_still_win_after_hedging():
+    llm, _, _ = _hedged(primary_latency_s=0.1, fallback_latency_s=1.0)
+
+    assert llm.generate_completion("hi") == "primary: hi"
+    assert llm.llm_cost_tracker.total_hedged_requests == 1
+    assert llm.llm_cost_tracker.total_fallback_wins == 0
+
+
+def test_failing_primary_falls_back_immediately():
+    llm, _, _ = _hedged(
+        primary_latency_s=0.0,
+        fallback_latency_s=0.0,
+        primary_error=ConnectionError("down"),
+    )
+
+    assert llm.generate_completion("hi") == "fallback: hi"
+
+
+def test_stream_is_hedged_on_first_chunk():
+    llm, _, _ = _hedged(primary_latency_s=1.0, fallback_latency_s=0.0)
+
+    assert "".join(llm.generate_completion_stream("hi")) == "fallback: hi"
+
+
+def test_error_is_raised_when_both_fail():
+    tracker = LLMCostTracker()
+    llm = HedgedLLM(
+        _SlowLLM("primary", 0.1, tracker, ValueError("primary")),
+        _SlowLLM("fallback", 0.0, tracker, ValueError("fallback")),
+        hedge_after_s=0.05,
+    )
+
+    with pytest.raises(ValueError, match="primary"):
+        llm.generate_completion("hi")
+
+
+def test_losing_request_runs_to_completion_and_is_still_billed():
+    tracker = LLMCostTracker()
+    rate_limiter = _RecordingRateLimiter()
+    primary = _SlowLLM("primary", 0.2, tracker)
+    fallback = _SlowLLM("fallback", 0.0, tracker)
+    primary.rate_limiter = fallback.rate_limiter = rate_limiter
+    llm = HedgedLLM(primary, fallback, hedge_after_s=0.05)
+
+    assert llm.generate_completion("hi") == "fallback: hi"
+    assert primary.finished.wait(timeout=1.0)
+
+    # the abandoned primary is not aborted, its cost and tokens still count
+    assert tracker.total_requests == 2
+    assert tracker.total_cost == pytest.approx(0.6)
+    assert rate_limiter.n_acquired == 2
+    assert rate_limiter.recorded_tokens == [15, 15]
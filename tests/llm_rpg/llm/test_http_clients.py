@@ -0,0 +1,31 @@
+import asyncio
+
+from llm_rpg.llm.http_clients import HTTPClientLimits, OpenAIClientRegistry
+
+
+def test_clients_are_reused_per_base_url_and_key():
+    registry = OpenAIClientRegistry(HTTPClientLimits(max_connections=4))
+
+    client = registry.get_client("http://a/v1", "key-a", max_retries=0)
+
+    assert registry.get_client("http://a/v1", "key-a", max_retries=0) is client
+    assert registry.get_client("http://b/v1", "key-a", max_retries=0) is not client
+    assert registry.get_client("http://a/v1", "key-b", max_retries=0) is not client
+    assert registry.get_client("http://a/v1", "key-a", max_retries=1) is not client
+    registry.close()
+
+
+def test_close_closes_sync_clients_and_aclose_async_clients():
+    registry = OpenAIClientRegistry()
+    client = registry.get_client("http://a/v1", "key")
+    async_client = registry.get_async_client("http://a/v1", "key")
+
+    registry.close()
+
+    assert client.is_closed()
+    assert not async_client.is_closed()
+    asyncio.run(registry.aclose())
+    assert async_client.is_closed()
+    # closed clients are dropped, the next request gets a fresh pool
+    assert registry.get_client("http://a/v1", "key") is not client
+    registry.close()
@@ -0,0 +1,72 @@
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from llm_rpg.llm.json_repair import parse_structured_output, repair_json
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+
+
+class _Judgment(BaseModel):
+    feasibility: float
+    potential_damage: int
+    reason: str
+
+
+class _RawLLM(LLM):
+    def __init__(self, content: str):
+        self.model = "raw"
+        self.content = content
+        self.llm_cost_tracker = LLMCostTracker()
+        self.metrics = LLMMetricsRegistry()
+        self.call_site = "judge"
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        return self.content
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        return self._parse_structured_output(self.content, output_model)
+
+
+def test_repair_handles_fences_prose_trailing_commas_and_string_numbers():
+    text = (
+        "Sure! Here is the judgment:\n```json\n"
+        '{"feasibility": "7/10", "potential_damage": "4", '
+        '"reason": "a {curly}, tricky, string",}\n```\nHope this helps.'
+    )
+
+    value = repair_json(text, _Judgment.model_json_schema())
+
+    assert value == {
+        "feasibility": 7.0,
+        "potential_damage": 4,
+        "reason": "a {curly}, tricky, string",
+    }
+
+
+def test_valid_output_is_not_marked_repaired():
+    output, is_repaired = parse_structured_output(
+        '{"feasibility": 1, "potential_damage": 2, "reason": "ok"}', _Judgment
+    )
+
+    assert output.potential_damage == 2
+    assert not is_repaired
+
+
+def test_unrepairable_output_raises_original_validation_error():
+    with pytest.raises(ValidationError):
+        parse_structured_output("I cannot judge this action.", _Judgment)
+
+
+def test_repaired_outputs_are_counted_instead_of_retried():
+    llm = _RawLLM('```{"feasibility": 3, "potential_damage": 5, "reason": "x",}```')
+
+    output = llm.generate_structured_completion("judge", _Judgment)
+
+    assert output.feasibility == 3
+    assert llm.llm_cost_tracker.total_repaired_outputs == 1
+    assert llm.llm_cost_tracker.total_parse_retries == 0
+    snapshot = llm.metrics.snapshot()["call_sites"]["judge"]["raw"]
+    assert snapshot["repaired_outputs"] == 1
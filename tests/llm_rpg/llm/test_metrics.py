@@ -0,0 +1,130 @@
+import json
+import threading
+
+import pytest
+
+from llm_rpg.llm.fake_llm import Distribution, FakeLLM, LatencyProfile
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.metrics import LLMMetricsRegistry, get_percentile
+from llm_rpg.llm.retry import RetryPolicy
+
+
+class _StubLLM(LLM):
+    def __init__(self, metrics: LLMMetricsRegistry):
+        self.model = "stub-model"
+        self.llm_cost_tracker = LLMCostTracker()
+        self.metrics = metrics
+        self.call_site = "judge"
+        self.fail_next = False
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError("flaky")
+        self._record_usage(10, 5, 0.1, 0.2)
+        return prompt
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        raise ValueError("unsupported")
+
+
+def test_get_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert get_percentile(values, 50) == 50.0
+    assert get_percentile(values, 95) == 95.0
+    assert get_percentile(values, 99) == 99.0
+    assert get_percentile([], 50) is None
+
+
+def test_requests_usage_retries_and_failures_are_recorded_per_call_site():
+    metrics = LLMMetricsRegistry()
+    llm = _StubLLM(metrics)
+    llm.retry_policy = RetryPolicy(base_delay_s=0, jitter=False)
+
+    llm.generate_completion("a")
+    llm.fail_next = True
+    llm.generate_completion("b")
+    with pytest.raises(ValueError):
+        llm.generate_structured_completion("c", None)
+
+    snapshot = metrics.snapshot()["call_sites"]["judge"]["stub-model"]
+    assert snapshot["requests"] == 3
+    assert snapshot["failures"] == 1
+    assert snapshot["transport_retries"] == 1
+    assert snapshot["input_tokens"] == 20
+    assert snapshot["output_tokens"] == 10
+    assert snapshot["cost"] == pytest.approx(0.6)
+    assert snapshot["latency_s"]["count"] == 2
+
+
+def test_concurrent_recording_is_not_lost():
+    metrics = LLMMetricsRegistry()
+    tracker = LLMCostTracker()
+
+    def record():
+        for _ in range(1000):
+            metrics.record_usage("narrator", "m", 1, 1, 0.0)
+            tracker.add_cost(1, 1, 0, 0)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.snapshot()["call_sites"]["narrator"]["m"]["input_tokens"] == 8000
+    assert tracker.total_requests == 8000
+
+
+def test_export_json(tmp_path):
+    metrics = LLMMetricsRegistry()
+    metrics.record_request("narrator", "m", latency_s=2.0)
+    metrics.record_usage("narrator", "m", 10, 20, 0.0)
+    metrics.record_time_to_first_token("narrator", "m", 0.5)
+    path = tmp_path / "logs" / "metrics.json"
+
+    metrics.export_json(str(path))
+
+    exported = json.loads(path.read_text())["call_sites"]["narrator"]["m"]
+    assert exported["tokens_per_s"] == 10.0
+    assert exported["time_to_first_token_s"]["p50"] == 0.5
+
+
+def test_stream_timing_is_recorded_on_tracker_and_metrics():
+    metrics = LLMMetricsRegistry()
+    llm = _StubLLM(metrics)
+
+    llm._record_stream_timing(time_to_first_token_s=0.25, total_latency_s=1.0)
+
+    assert llm.llm_cost_tracker.time_to_first_token_s == [0.25]
+    snapshot = metrics.snapshot()["call_sites"]["judge"]["stub-model"]
+    assert snapshot["time_to_first_token_s"]["p50"] == 0.25
+
+
+def test_stream_closed_early_still_records_the_request_and_its_usage():
+    metrics = LLMMetricsRegistry()
+    llm = FakeLLM(
+        llm_cost_tracker=LLMCostTracker(),
+        latency_profile=LatencyProfile(
+            time_to_first_token_s=Distribution(kind="fixed", value=0.0),
+            tokens_per_s=Distribution(kind="fixed", value=1e9),
+        ),
+    )
+    llm.metrics = metrics
+    llm.call_site = "narrator"
+
+    stream = llm.generate_completion_stream("narrate the slime " * 10)
+    first_chunk = next(stream)
+    stream.close()
+
+    assert llm.llm_cost_tracker.total_requests == 1
+    assert llm.llm_cost_tracker.total_input_tokens == 45
+    assert llm.llm_cost_tracker.total_output_tokens == len(first_chunk) // 4
+    assert len(llm.llm_cost_tracker.stream_latency_s) == 1
+    snapshot = metrics.snapshot()["call_sites"]["narrator"][llm.model]
+    assert snapshot["requests"] == 1
+    assert snapshot["failures"] == 0
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from llm_rpg.llm.micro_batcher import MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch():
+    batch_sizes = []
+
+    def process_batch(items):
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process_batch, max_batch_size=4, max_wait_s=0.2)
+    results = {}
+
+    def submit(item):
+        results[item] = batcher(item)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {0: 0, 1: 2, 2: 4, 3: 6}
+    assert batch_sizes == [4]
+    assert batcher.mean_batch_size == 4
+
+
+def test_batch_errors_reach_every_request():
+    def process_batch(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(process_batch, max_wait_s=0)
+
+    with pytest.raises(RuntimeError):
+        batcher(1)
+    batcher.close()
+    with pytest.raises(ValueError):
+        batcher.submit(2)
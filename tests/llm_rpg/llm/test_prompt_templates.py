@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+from pydantic import BaseModel
+
+from llm_rpg.llm.prompt_templates import PromptTemplate
+from llm_rpg.systems.battle.action_judge_narrators import LLMJudgeNarrationOutput
+from llm_rpg.systems.battle.action_judges import (
+    ACTION_JUDGE_PROMPT_FIELDS,
+    LLMActionJudgmentOutput,
+)
+from llm_rpg.systems.battle.action_narrators import ACTION_NARRATION_PROMPT_FIELDS
+from llm_rpg.systems.battle.enemy_action_generators import ENEMY_ACTION_PROMPT_FIELDS
+
+CONFIG_PATH = Path(__file__).parents[3] / "config" / "game_config.yaml"
+
+
+class _Output(BaseModel):
+    name: str
+
+
+def test_render_matches_str_format_with_schema_block():
+    template = "Hi {name}, {{literal}} {score:.1f} {name!r}\n"
+    prompt = PromptTemplate(
+        template, name="test", allowed_fields=["name", "score"], output_model=_Output
+    )
+
+    rendered = prompt.render(name="slime", score=2.345)
+
+    schema = json.dumps(_Output.model_json_schema(), indent=2)
+    assert rendered == template.format(name="slime", score=2.345) + schema
+    assert prompt.fields == {"name", "score"}
+    assert prompt.static_token_estimate > 0
+
+
+def test_unknown_and_missing_placeholders_are_rejected():
+    with pytest.raises(ValueError, match="unknown placeholders"):
+        PromptTemplate("{nmae}", name="test", allowed_fields=["name"])
+    with pytest.raises(ValueError, match="missing placeholders"):
+        PromptTemplate(
+            "no fields", name="test", allowed_fields=["name"], required_fields=["name"]
+        )
+    with pytest.raises(ValueError, match="plain name"):
+        PromptTemplate("{hero.name}", name="test", allowed_fields=["hero"])
+
+
+def test_split_prompt_keeps_static_system_prefix():
+    prompt = PromptTemplate.from_config(
+        {"system": "Judge {{fairly}}.\n", "user": "Action: {action}"},
+        name="test",
+        allowed_fields=["action"],
+        output_model=_Output,
+    )
+
+    schema = json.dumps(_Output.model_json_schema(), indent=2)
+    assert prompt.system_prompt == "Judge {fairly}.\n" + schema
+    assert prompt.render(action="kick") == "Action: kick"
+    with pytest.raises(ValueError, match="must be static"):
+        PromptTemplate.from_config(
+            {"system": "Judge {action}", "user": "{action}"},
+            name="test",
+            allowed_fields=["action"],
+        )
+
+
+def test_configured_prompts_are_valid():
+    prompts = yaml.safe_load(CONFIG_PATH.read_text())["prompts"]
+
+    judge = PromptTemplate.from_config(
+        prompts["action_judge"],
+        name="action_judge",
+        allowed_fields=ACTION_JUDGE_PROMPT_FIELDS,
+        output_model=LLMActionJudgmentOutput,
+    )
+    PromptTemplate.from_config(
+        prompts["action_judge_and_narrate"],
+        name="action_judge_and_narrate",
+        allowed_fields=ACTION_JUDGE_PROMPT_FIELDS,
+        output_model=LLMJudgeNarrationOutput,
+    )
+    PromptTemplate.from_config(
+        prompts["action_narration"],
+        name="action_narration",
+        allowed_fields=ACTION_NARRATION_PROMPT_FIELDS,
+    )
+    PromptTemplate.from_config(
+        prompts["enemy_next_action"],
+        name="enemy_next_action",
+        allowed_fields=ENEMY_ACTION_PROMPT_FIELDS,
+    )
+
+    assert judge.fields == set(ACTION_JUDGE_PROMPT_FIELDS)
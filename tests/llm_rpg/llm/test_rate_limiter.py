@@ -0,0 +1,53 @@
+import threading
+import time
+
+from llm_rpg.llm.rate_limiter import RateLimiter, RequestPriority
+
+
+def test_requests_within_limit_do_not_wait():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+
+    wait_s, queue_depth = limiter.acquire(estimated_tokens=100)
+
+    assert wait_s < 0.05
+    assert queue_depth == 1
+    assert limiter.queue_depth == 0
+
+
+def test_token_debt_delays_next_request():
+    limiter = RateLimiter(tokens_per_minute=60000)
+    limiter.record_tokens(60000 + 100)
+
+    wait_s, _ = limiter.acquire()
+
+    assert wait_s >= 0.08
+
+
+def test_higher_priority_is_served_first():
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter._request_bucket.available = 0
+    order = []
+
+    def acquire(priority: RequestPriority):
+        limiter.acquire(priority)
+        order.append(priority)
+
+    threads = [
+        threading.Thread(target=acquire, args=(RequestPriority.BACKGROUND,)),
+        threading.Thread(target=acquire, args=(RequestPriority.ENEMY_ACTION,)),
+        threading.Thread(target=acquire, args=(RequestPriority.INTERACTIVE,)),
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    assert limiter.queue_depth == 3
+    assert limiter.get_queue_depths()[RequestPriority.INTERACTIVE] == 1
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order == [
+        RequestPriority.INTERACTIVE,
+        RequestPriority.ENEMY_ACTION,
+        RequestPriority.BACKGROUND,
+    ]
+    assert limiter.max_queue_depth == 3
@@ -0,0 +1,100 @@
+import json
+import time
+
+import httpx
+import openai
+import pytest
+
+from llm_rpg.llm.retry import (
+    LLMErrorKind,
+    RetryPolicy,
+    call_with_retry,
+    classify_llm_error,
+)
+
+
+def _rate_limit_error(retry_after: str | None = None) -> openai.RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    request = httpx.Request("POST", "https://example.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def _auth_error() -> openai.AuthenticationError:
+    request = httpx.Request("POST", "https://example.com/v1/chat/completions")
+    response = httpx.Response(401, request=request)
+    return openai.AuthenticationError("bad key", response=response, body=None)
+
+
+class _Flaky:
+    def __init__(self, errors: list[Exception]):
+        self.errors = errors
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_classify_llm_error():
+    assert classify_llm_error(json.JSONDecodeError("x", "", 0)) == LLMErrorKind.PARSE
+    assert classify_llm_error(_rate_limit_error()) == LLMErrorKind.TRANSPORT
+    assert classify_llm_error(ConnectionError()) == LLMErrorKind.TRANSPORT
+    assert classify_llm_error(_auth_error()) == LLMErrorKind.FATAL
+
+
+def test_parse_errors_retry_without_sleeping(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    fn = _Flaky([json.JSONDecodeError("x", "", 0)] * 2)
+
+    assert call_with_retry(fn, RetryPolicy(max_parse_attempts=3)) == "ok"
+    assert fn.calls == 3
+    assert sleeps == [0.0, 0.0]
+
+
+def test_transport_errors_back_off_exponentially(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    policy = RetryPolicy(
+        max_transport_attempts=4, base_delay_s=0.5, max_delay_s=1.5, jitter=False
+    )
+    fn = _Flaky([ConnectionError()] * 3)
+
+    assert call_with_retry(fn, policy) == "ok"
+    assert sleeps == [0.5, 1.0, 1.5]
+
+
+def test_retry_after_header_is_respected(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    fn = _Flaky([_rate_limit_error(retry_after="2")])
+
+    assert call_with_retry(fn, RetryPolicy(max_delay_s=8)) == "ok"
+    assert sleeps == [2.0]
+
+
+def test_retry_after_beyond_max_delay_fails_fast(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda _: None)
+    fn = _Flaky([_rate_limit_error(retry_after="30")])
+
+    with pytest.raises(openai.RateLimitError):
+        call_with_retry(fn, RetryPolicy(max_delay_s=8))
+    assert fn.calls == 1
+
+
+def test_fatal_errors_are_not_retried_and_retries_are_reported(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda _: None)
+    retries = []
+    fn = _Flaky([ConnectionError(), _auth_error()])
+
+    with pytest.raises(openai.AuthenticationError):
+        call_with_retry(
+            fn,
+            RetryPolicy(jitter=False),
+            on_retry=lambda kind, exc, delay: retries.append(kind),
+        )
+    assert fn.calls == 2
+    assert retries == [LLMErrorKind.TRANSPORT]
@@ -0,0 +1,83 @@
+import pytest
+
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.llm.router_llm import RouterLLM, RouterTarget
+
+
+class _StubLLM(LLM):
+    def __init__(self, model: str, llm_cost_tracker: LLMCostTracker):
+        self.model = model
+        self.llm_cost_tracker = llm_cost_tracker
+        self.fail = False
+        self.calls = 0
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError(self.model)
+        return self.model
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        raise NotImplementedError
+
+
+def _router(targets_config: list[tuple[str, float, float]], **kwargs):
+    tracker = LLMCostTracker()
+    targets = []
+    for model, latency_s, weight in targets_config:
+        target = RouterTarget(_StubLLM(model, tracker), weight=weight)
+        target.latencies_s.append(latency_s)
+        targets.append(target)
+    return RouterLLM(targets, **kwargs), {t.llm.model: t for t in targets}
+
+
+def test_fastest_target_is_used():
+    router, _ = _router([("slow", 2.0, 1.0), ("fast", 0.5, 1.0)])
+
+    assert router.generate_completion("hi") == "fast"
+
+
+def test_weight_scales_latency():
+    router, _ = _router([("slow", 2.0, 8.0), ("fast", 0.5, 1.0)])
+
+    assert router.generate_completion("hi") == "slow"
+
+
+def test_unmeasured_target_is_tried_first():
+    router, targets = _router([("measured", 0.1, 1.0)])
+    tracker = router.llm_cost_tracker
+    new_target = RouterTarget(_StubLLM("new", tracker))
+    router.targets.append(new_target)
+
+    assert router.generate_completion("hi") == "new"
+    assert len(new_target.latencies_s) == 1
+
+
+def test_failed_request_fails_over_and_ejects_target():
+    router, targets = _router(
+        [("fast", 0.1, 1.0), ("slow", 1.0, 1.0)],
+        min_requests_for_ejection=2,
+        ejection_s=60,
+    )
+    targets["fast"].llm.fail = True
+
+    assert router.generate_completion("hi") == "slow"
+    assert targets["fast"].is_healthy(0.0)
+    assert router.generate_completion("hi") == "slow"
+
+    assert router.llm_cost_tracker.total_router_ejections == 1
+    assert router.get_ranked_targets()[0] is targets["slow"]
+    assert router.generate_completion("hi") == "slow"
+    assert targets["fast"].llm.calls == 2
+
+
+def test_error_is_raised_when_all_targets_fail():
+    router, targets = _router([("a", 0.1, 1.0), ("b", 0.2, 1.0)])
+    for target in targets.values():
+        target.llm.fail = True
+
+    with pytest.raises(ConnectionError, match="b"):
+        router.generate_completion("hi")
@@ -0,0 +1,91 @@
+from llm_rpg.llm.llm import LLM, get_provider_llms
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.systems.battle.action_judge_narrators import LLMActionJudgeNarrator
+
+
+class _StubLLM(LLM):
+    def __init__(self, narration: str):
+        self.model = "stub"
+        self.llm_cost_tracker = LLMCostTracker()
+        self.narration = narration
+        self.calls = 0
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        raise NotImplementedError
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        self.calls += 1
+        return output_model(feasibility=8, potential_damage=5, narration=self.narration)
+
+
+class _StubInventory:
+    items = []
+
+
+class _StubCharacter:
+    def __init__(self, name: str):
+        self.name = name
+        self.description = f"{name} description"
+        self.inventory = _StubInventory()
+
+
+def _judge_and_describe(narration: str, total_damage: int) -> tuple[str, int]:
+    llm = _StubLLM(narration)
+    judge_narrator = LLMActionJudgeNarrator(
+        llm=llm,
+        prompt={"system": "Judge.", "user": "{proposed_action_attacker}"},
+    )
+    kwargs = dict(
+        proposed_action_attacker="kick",
+        hero=_StubCharacter("Hero"),
+        enemy=_StubCharacter("Slime"),
+        is_hero_attacker=True,
+        battle_log_string="",
+    )
+
+    judgment = judge_narrator.judge_action(**kwargs)
+    description = judge_narrator.describe_action(
+        **kwargs, judgment=judgment, total_damage=total_damage
+    )
+    assert judgment.feasibility == 0.8
+    assert judgment.potential_damage == 0.5
+    return description, llm.calls
+
+
+def test_narration_is_filled_in_without_a_second_call():
+    description, n_calls = _judge_and_describe(
+        "Hero kicks the Slime for {damage} damage!", total_damage=12
+    )
+
+    assert description == "Hero kicks the Slime for 12 damage!"
+    assert n_calls == 1
+
+
+def test_placeholder_at_end_of_sentence():
+    description, _ = _judge_and_describe(
+        "The kick lands, dealing {damage}.", total_damage=3
+    )
+
+    assert description == "The kick lands dealing 3."
+
+
+def test_shared_judge_narrator_cost_is_counted_once():
+    judge_llm = _StubLLM("")
+    enemy_action_llm = _StubLLM("")
+    judge_narrator = LLMActionJudgeNarrator(
+        llm=judge_llm,
+        prompt={"system": "Judge.", "user": "{proposed_action_attacker}"},
+    )
+    enemy_action_generator = type("_Stub", (), {"llm": enemy_action_llm})()
+    judge_llm.llm_cost_tracker.add_cost(10, 10, 0.25, 0.5)
+    enemy_action_llm.llm_cost_tracker.add_cost(10, 10, 0.1, 0.1)
+
+    # as in Game._get_llms, the judge is also the narrator in this mode
+    llms = get_provider_llms(
+        [judge_narrator, judge_narrator, enemy_action_generator, None]
+    )
+
+    assert llms == [judge_llm, enemy_action_llm]
+    assert sum(llm.llm_cost_tracker.total_cost for llm in llms) == 0.95
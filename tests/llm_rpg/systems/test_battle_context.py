@@ -0,0 +1,72 @@
+import pytest
+
+from llm_rpg.llm.token_counter import HeuristicTokenCounter, get_token_counter
+from llm_rpg.systems.battle.battle_context import BattleContextBuilder
+from llm_rpg.systems.battle.battle_log import BattleEvent, BattleLog
+
+
+class _StubDamage:
+    def __init__(self, total_dmg: int):
+        self.total_dmg = total_dmg
+
+
+def _battle_log(effect_descriptions: list[str], builder=None) -> BattleLog:
+    battle_log = BattleLog(context_builder=builder)
+    for i, effect_description in enumerate(effect_descriptions):
+        battle_log.add_event(
+            BattleEvent(
+                is_hero_turn=i % 2 == 0,
+                character_name="Hero" if i % 2 == 0 else "Slime",
+                proposed_action="",
+                effect_description=effect_description,
+                damage_calculation_result=_StubDamage(total_dmg=10),
+            )
+        )
+    return battle_log
+
+
+def test_without_budget_matches_last_events():
+    builder = BattleContextBuilder(HeuristicTokenCounter(), token_budgets={})
+    effects = [f"effect {i}" for i in range(8)]
+
+    assert (
+        _battle_log(effects, builder).to_string_for_battle_ai(call_site="judge")
+        == _battle_log(effects).to_string_for_battle_ai()
+    )
+
+
+def test_older_events_are_summarised_when_over_budget():
+    counter = HeuristicTokenCounter()
+    builder = BattleContextBuilder(counter, token_budgets={"judge": 45})
+    effects = ["a" * 60, "b" * 60, "c" * 40, "d" * 40]
+
+    context = _battle_log(effects, builder).to_string_for_battle_ai(call_site="judge")
+
+    assert context.splitlines() == [
+        "Earlier turns (2): Hero dealt 10 damage, Slime dealt 10 damage",
+        f"Hero turn: {'c' * 40}",
+        f"Slime turn: {'d' * 40}",
+    ]
+    assert counter.count_tokens(context) <= 45
+
+
+def test_latest_event_is_truncated_to_budget():
+    counter = HeuristicTokenCounter()
+    builder = BattleContextBuilder(counter, token_budgets={"narrator": 10})
+
+    context = _battle_log(["x" * 200], builder).to_string_for_battle_ai(
+        call_site="narrator"
+    )
+
+    assert context.startswith("Hero turn: x")
+    assert counter.count_tokens(context) <= 10
+
+
+def test_unloadable_tokenizer_warns_and_falls_back_to_the_heuristic(tmp_path):
+    tokenizer_path = tmp_path / "tokenizer.json"
+    tokenizer_path.write_text("not a tokenizer")
+
+    with pytest.warns(RuntimeWarning, match="Could not load tokenizer"):
+        token_counter = get_token_counter(str(tokenizer_path))
+
+    assert isinstance(token_counter, HeuristicTokenCounter)
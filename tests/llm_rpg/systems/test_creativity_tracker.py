@@ -1,4 +1,7 @@
-from llm_rpg.systems.battle.creativity_tracker import CreativityTracker
+from llm_rpg.systems.battle.creativity_tracker import (
+    CreativityTracker,
+    normalize_action,
+)
 
 
 def test_preprocessing_removes_punctuation_and_stop_words():
@@ -31,3 +34,7 @@ def test_add_action_updates_usage_counts():
     tracker.add_action("lightning")
     # now at 3 uses -> meets threshold
     assert tracker.count_overused_words_in_action("lightning") == 1
+
+
+def test_normalize_action_matches_tracker_preprocessing():
+    assert normalize_action("Kick THE slime, hard!") == "kick slime hard"
@@ -0,0 +1,93 @@
+import threading
+
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+from llm_rpg.systems.battle.battle_log import BattleEvent, BattleLog
+from llm_rpg.systems.battle.enemy_action_speculator import EnemyActionSpeculator
+
+
+class _StubStats:
+    max_hp = 20
+
+
+class _StubHero:
+    name = "Hero"
+    description = "A hero"
+
+    def get_current_stats(self):
+        return _StubStats()
+
+
+class _StubEnemy(_StubHero):
+    name = "Slime"
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_next_action(self, battle_log, hero) -> str:
+        self.calls += 1
+        return f"action after {len(battle_log.events)} events"
+
+
+class _StubDamage:
+    total_dmg = 3
+
+
+def _add_event(battle_log: BattleLog, effect_description: str = "") -> BattleEvent:
+    event = BattleEvent(
+        is_hero_turn=True,
+        character_name="Hero",
+        proposed_action="kick",
+        effect_description=effect_description,
+        damage_calculation_result=_StubDamage(),
+    )
+    battle_log.add_event(event)
+    return event
+
+
+def test_speculated_action_is_reused_after_narration_finishes():
+    enemy, hero, battle_log = _StubEnemy(), _StubHero(), BattleLog()
+    event = _add_event(battle_log)
+    narration_done = threading.Event()
+    speculator = EnemyActionSpeculator()
+
+    speculator.start(enemy, hero, battle_log, wait_for=narration_done.wait)
+    event.effect_description = "Hero kicks the slime."
+    narration_done.set()
+
+    assert speculator.take(enemy, hero, battle_log) == "action after 1 events"
+    assert enemy.calls == 1
+    assert speculator.n_hits == 1
+
+
+def test_speculation_is_discarded_when_battle_log_changed():
+    enemy, hero, battle_log = _StubEnemy(), _StubHero(), BattleLog()
+    speculator = EnemyActionSpeculator()
+
+    speculator.start(enemy, hero, battle_log)
+    speculator._future.result()
+    _add_event(battle_log, "Something else happened.")
+
+    assert speculator.take(enemy, hero, battle_log) is None
+    assert speculator.take(enemy, hero, battle_log) is None
+    assert speculator.n_misses == 1
+
+
+def test_cancel_while_waiting_skips_the_request_and_is_recorded():
+    enemy, hero, battle_log = _StubEnemy(), _StubHero(), BattleLog()
+    narration_done = threading.Event()
+    metrics = LLMMetricsRegistry()
+    speculator = EnemyActionSpeculator(metrics=metrics, model="enemy")
+
+    speculator.start(enemy, hero, battle_log, wait_for=narration_done.wait)
+    future = speculator._future
+    speculator.cancel()
+    narration_done.set()
+    speculator.start(enemy, hero, battle_log)
+    assert speculator.take(enemy, hero, battle_log) == "action after 0 events"
+
+    assert future.cancelled()
+    assert enemy.calls == 1
+    speculations = metrics.snapshot()["call_sites"]["enemy_action"]["enemy"][
+        "speculations"
+    ]
+    assert speculations == {"started": 2, "hits": 1, "misses": 0, "cancelled": 1}
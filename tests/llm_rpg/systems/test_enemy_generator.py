@@ -0,0 +1,83 @@
+from llm_rpg.llm.fake_llm import Distribution, FakeLLM, LatencyProfile
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.objects.character import Stats
+from llm_rpg.systems.generation.enemy_generator import EnemyGenerator
+
+
+class _StubLLM(LLM):
+    def __init__(self, enemies):
+        self.model = "stub"
+        self.llm_cost_tracker = LLMCostTracker()
+        self.enemies = enemies
+        self.prompts = []
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        raise NotImplementedError
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        self.prompts.append(prompt)
+        return output_model(enemies=self.enemies)
+
+
+class _StubSpriteGenerator:
+    def generate_sprite(self, enemy):
+        return f"sprite of {enemy.name}"
+
+
+def _generator(llm, batch_size):
+    return EnemyGenerator(
+        llm=llm,
+        prompt={"system": "Make enemies.", "user": "Noun: {enemy_character}"},
+        enemy_action_generator=None,
+        base_stats=Stats(attack=1, defense=1, focus=1, max_hp=5),
+        sprite_generator=_StubSpriteGenerator(),
+        characters=["slime", "bat", "crab"],
+        adjectives=["angry"],
+        places=["cave"],
+        batch_size=batch_size,
+    )
+
+
+def test_batch_keeps_valid_enemies_for_later_calls():
+    llm = _StubLLM(
+        enemies=[
+            {"name": "Gloop", "description": "A slime."},
+            {"name": "X", "description": "Name too short."},
+            {"description": "No name."},
+            {"name": " Nibbler ", "description": "A bat. "},
+        ]
+    )
+    generator = _generator(llm, batch_size=4)
+
+    first, first_sprite = generator.generate_enemy()
+    second, _ = generator.generate_enemy()
+
+    assert len(llm.prompts) == 1
+    assert llm.prompts[0].count("Noun: ") == 4
+    assert (first.name, second.name) == ("Gloop", "Nibbler")
+    assert second.description == "A bat."
+    assert first_sprite == "sprite of Gloop"
+
+    generator.generate_enemy()
+    assert len(llm.prompts) == 2
+
+
+def test_fake_llm_returns_one_enemy_per_case_of_a_batch():
+    llm = FakeLLM(
+        llm_cost_tracker=LLMCostTracker(),
+        latency_profile=LatencyProfile(
+            time_to_first_token_s=Distribution(kind="fixed", value=0.0),
+            tokens_per_s=Distribution(kind="fixed", value=1e9),
+        ),
+    )
+    generator = _generator(llm, batch_size=4)
+
+    enemies = [generator.generate_enemy()[0] for _ in range(4)]
+
+    assert llm.llm_cost_tracker.total_requests == 1
+    assert all(enemy.name for enemy in enemies)
+    generator.generate_enemy()
+    assert llm.llm_cost_tracker.total_requests == 2
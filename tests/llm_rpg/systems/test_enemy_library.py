@@ -0,0 +1,108 @@
+import os
+from pathlib import Path
+
+import pygame
+import pytest
+import yaml
+
+from llm_rpg.systems.generation.enemy_library import EnemyLibrary, EnemySeed
+
+
+def _library(tmp_path, model_key="model-a", max_entries=10):
+    return EnemyLibrary(
+        path=str(tmp_path / "enemies.sqlite"),
+        model_key=model_key,
+        max_entries=max_entries,
+    )
+
+
+def _sprite(color):
+    sprite = pygame.Surface((4, 4), pygame.SRCALPHA)
+    sprite.fill(color)
+    return sprite
+
+
+def test_enemies_persist_per_model_key(tmp_path):
+    seed = EnemySeed(character="slime", adjective="angry", place="cave")
+    library = _library(tmp_path)
+    stored = library.put(seed, "Slime", "A slime.", _sprite((0, 255, 0, 255)))
+    library.close()
+
+    reopened = _library(tmp_path)
+    other_model = _library(tmp_path, model_key="model-b")
+
+    assert reopened.get(seed) == stored
+    assert reopened.sample() == stored
+    assert Path(stored.sprite_path).is_file()
+    assert other_model.get(seed) is None
+    assert other_model.sample() is None
+
+
+def test_stored_sprite_loads_back(tmp_path):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    library = _library(tmp_path)
+    seed = EnemySeed(character="bat", adjective="tiny", place="attic")
+
+    stored = library.put(seed, "Bat", "A bat.", _sprite((255, 0, 0, 255)))
+    sprite = stored.load_sprite()
+
+    assert sprite.get_size() == (4, 4)
+    assert sprite.get_at((0, 0)) == pygame.Color(255, 0, 0, 255)
+    pygame.display.quit()
+
+
+def test_oldest_enemies_are_evicted_with_their_sprites(tmp_path):
+    library = _library(tmp_path, max_entries=2)
+    seeds = [EnemySeed(character=f"c{i}", adjective="a", place="p") for i in range(3)]
+    stored = [
+        library.put(seed, f"Enemy {i}", "An enemy.", _sprite((0, 0, 0, 255)))
+        for i, seed in enumerate(seeds)
+    ]
+
+    assert len(library) == 2
+    assert library.get(seeds[0]) is None
+    assert not Path(stored[0].sprite_path).exists()
+    assert library.get(seeds[2]) == stored[2]
+
+
+def test_model_key_supports_hedged_and_router_llms(tmp_path, monkeypatch):
+    pytest.importorskip("torch")
+    from llm_rpg.game.game_config import GameConfig
+
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    config_path = Path(__file__).parents[3] / "config" / "game_config.yaml"
+    config = yaml.safe_load(config_path.read_text())
+    config["enemy_generation"]["library"] = {"path": str(tmp_path / "lib.sqlite")}
+    primary = {"type": "groq", "model": "a"}
+    fallback = {"type": "groq", "model": "b"}
+    llm_blocks = [
+        {
+            "type": "hedged",
+            "hedge_after_s": 1,
+            "primary": primary,
+            "fallback": fallback,
+        },
+        # only non-semantic settings differ from the first block
+        {
+            "type": "hedged",
+            "hedge_after_s": 2,
+            "primary": {**primary, "retry": {"base_delay_s": 1}},
+            "fallback": fallback,
+        },
+        {"type": "router", "targets": [primary, fallback]},
+    ]
+
+    model_keys = []
+    for llm_block in llm_blocks:
+        config["enemy_generation"]["llm"] = llm_block
+        path = tmp_path / "config" / "game_config.yaml"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(yaml.safe_dump(config))
+        game_config = GameConfig(str(path))
+        model_keys.append(game_config.enemy_library.model_key)
+        game_config.close()
+
+    assert model_keys[0] == model_keys[1]
+    assert model_keys[0] != model_keys[2]
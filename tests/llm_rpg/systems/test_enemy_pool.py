@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from llm_rpg.systems.generation.enemy_pool import EnemyPool
+
+
+class _StubEnemyGenerator:
+    def __init__(self, n_failures: int = 0):
+        self.n_failures = n_failures
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def generate_enemy(self):
+        self.release.wait()
+        self.calls += 1
+        if self.calls <= self.n_failures:
+            raise RuntimeError("provider down")
+        return f"enemy {self.calls}", f"sprite {self.calls}"
+
+
+def _wait_for(condition, timeout_s: float = 2.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_pool_fills_ahead_and_refills_after_pop():
+    generator = _StubEnemyGenerator()
+    pool = EnemyPool(generator, size=2)
+    pool.start()
+    _wait_for(lambda: len(pool) == 2)
+
+    assert generator.calls == 2
+    assert pool.pop() == ("enemy 1", "sprite 1")
+    _wait_for(lambda: generator.calls == 3)
+    assert pool.n_hits == 1
+    pool.close()
+
+
+def test_pop_waits_for_a_slow_generation():
+    generator = _StubEnemyGenerator()
+    generator.release.clear()
+    pool = EnemyPool(generator, size=1)
+    threading.Timer(0.05, generator.release.set).start()
+
+    assert pool.pop(timeout=2) == ("enemy 1", "sprite 1")
+    assert pool.n_misses == 1
+    pool.close()
+
+
+def test_repeated_failures_surface_on_pop():
+    pool = EnemyPool(
+        _StubEnemyGenerator(n_failures=1000),
+        size=1,
+        retry_delay_s=0.01,
+        max_consecutive_failures=2,
+    )
+
+    with pytest.raises(ValueError, match="failed"):
+        pool.pop(timeout=2)
+    pool.close()
@@ -0,0 +1,79 @@
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+from llm_rpg.systems.battle.action_judges import ActionJudgment
+from llm_rpg.systems.battle.battle_log import BattleLog
+from llm_rpg.systems.battle.hero_judgment_speculator import HeroJudgmentSpeculator
+
+
+class _StubInventory:
+    items = []
+
+
+class _StubCharacter:
+    def __init__(self, name: str):
+        self.name = name
+        self.description = f"{name} description"
+        self.inventory = _StubInventory()
+
+
+class _StubBattleAI:
+    def __init__(self):
+        self.actions = []
+
+    def determine_action_judgment(self, proposed_action_attacker: str, **kwargs):
+        self.actions.append(proposed_action_attacker)
+        return ActionJudgment(feasibility=0.5, potential_damage=0.5)
+
+
+def test_matching_submission_reuses_speculated_judgment():
+    battle_ai = _StubBattleAI()
+    hero, enemy, battle_log = (
+        _StubCharacter("Hero"),
+        _StubCharacter("Slime"),
+        BattleLog(),
+    )
+    speculator = HeroJudgmentSpeculator(battle_ai)
+
+    speculator.start("kick the slime", hero, enemy, battle_log)
+    judgment = speculator.take("kick the slime", hero, enemy, battle_log)
+
+    assert judgment == ActionJudgment(feasibility=0.5, potential_damage=0.5)
+    assert battle_ai.actions == ["kick the slime"]
+    assert speculator.n_hits == 1
+
+
+def test_changed_text_cancels_and_different_submission_misses():
+    battle_ai = _StubBattleAI()
+    hero, enemy, battle_log = (
+        _StubCharacter("Hero"),
+        _StubCharacter("Slime"),
+        BattleLog(),
+    )
+    speculator = HeroJudgmentSpeculator(battle_ai)
+
+    speculator.start("kick", hero, enemy, battle_log)
+    speculator.start("kick the", hero, enemy, battle_log)
+    assert speculator.action == "kick the"
+
+    assert speculator.take("kick the slime", hero, enemy, battle_log) is None
+    assert speculator.take("kick the", hero, enemy, battle_log) is None
+    assert speculator.n_started == 2
+    assert speculator.n_cancelled == 1
+    assert speculator.n_misses == 1
+
+
+def test_speculation_outcomes_are_recorded_in_metrics():
+    battle_ai = _StubBattleAI()
+    hero, enemy, battle_log = (
+        _StubCharacter("Hero"),
+        _StubCharacter("Slime"),
+        BattleLog(),
+    )
+    metrics = LLMMetricsRegistry()
+    speculator = HeroJudgmentSpeculator(battle_ai, metrics=metrics, model="judge")
+
+    speculator.start("kick", hero, enemy, battle_log)
+    speculator.start("kick the slime", hero, enemy, battle_log)
+    speculator.take("kick the slime", hero, enemy, battle_log)
+
+    speculations = metrics.snapshot()["call_sites"]["judge"]["judge"]["speculations"]
+    assert speculations == {"started": 2, "hits": 1, "misses": 0, "cancelled": 1}
@@ -0,0 +1,160 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from llm_rpg.llm.fake_llm import Distribution, FakeLLM, LatencyProfile
+from llm_rpg.llm.llm import LLM
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.systems.battle.action_judges import ActionJudgeRequest, LLMActionJudge
+from llm_rpg.systems.battle.action_judge_narrators import LLMActionJudgeNarrator
+from llm_rpg.systems.battle.judgment_cache import CachedActionJudge
+
+
+class _StubLLM(LLM):
+    def __init__(self, n_judgments=None):
+        self.model = "stub"
+        self.llm_cost_tracker = LLMCostTracker()
+        self.n_judgments = n_judgments
+        self.prompts = []
+
+    def _generate_completion(self, prompt: str, system_prompt=None) -> str:
+        raise NotImplementedError
+
+    def _generate_structured_completion(
+        self, prompt: str, output_model, system_prompt=None
+    ):
+        self.prompts.append(prompt)
+        if "judgments" not in output_model.model_fields:
+            return output_model(feasibility=10, potential_damage=1)
+        n_cases = prompt.count("Case ")
+        n_judgments = self.n_judgments if self.n_judgments is not None else n_cases
+        return output_model(
+            judgments=[
+                {"feasibility": i, "potential_damage": 10 - i}
+                for i in range(n_judgments)
+            ]
+        )
+
+
+class _StubInventory:
+    items = []
+
+
+class _StubCharacter:
+    def __init__(self, name: str):
+        self.name = name
+        self.description = f"{name} description"
+        self.inventory = _StubInventory()
+
+
+def _requests(actions):
+    hero, enemy = _StubCharacter("Hero"), _StubCharacter("Slime")
+    return [
+        ActionJudgeRequest(
+            proposed_action_attacker=action,
+            hero=hero,
+            enemy=enemy,
+            is_hero_attacker=True,
+            battle_log_string="",
+        )
+        for action in actions
+    ]
+
+
+def _judge(llm, batch_size=8):
+    return LLMActionJudge(
+        llm=llm,
+        prompt={"system": "Judge.", "user": "Action: {proposed_action_attacker}"},
+        batch_size=batch_size,
+    )
+
+
+def test_actions_are_packed_into_one_prompt_per_batch():
+    llm = _StubLLM()
+
+    judgments = _judge(llm, batch_size=3).judge_actions(
+        _requests(["kick", "punch", "bite", "roll"])
+    )
+
+    assert len(llm.prompts) == 2
+    assert "Case 3:\nAction: bite" in llm.prompts[0]
+    assert [j.feasibility for j in judgments] == [0.0, 0.1, 0.2, 1.0]
+    assert [j.potential_damage for j in judgments[:3]] == [1.0, 0.9, 0.8]
+
+
+def test_fake_llm_answers_a_batch_in_one_call():
+    llm = FakeLLM(
+        llm_cost_tracker=LLMCostTracker(),
+        latency_profile=LatencyProfile(
+            time_to_first_token_s=Distribution(kind="fixed", value=0.0),
+            tokens_per_s=Distribution(kind="fixed", value=1e9),
+        ),
+    )
+
+    judgments = _judge(llm, batch_size=5).judge_actions(
+        _requests(["kick", "punch", "bite", "roll", "spit"])
+    )
+
+    assert len(judgments) == 5
+    assert llm.llm_cost_tracker.total_requests == 1
+
+
+def test_mismatched_batch_falls_back_to_single_judgments():
+    llm = _StubLLM(n_judgments=1)
+
+    judgments = _judge(llm).judge_actions(_requests(["kick", "punch"]))
+
+    assert len(llm.prompts) == 3
+    assert [j.feasibility for j in judgments] == [1.0, 1.0]
+
+
+def test_cache_only_judges_misses():
+    llm = _StubLLM()
+    cached_judge = CachedActionJudge(_judge(llm))
+    cached_judge.judge_actions(_requests(["kick"]))
+
+    judgments = cached_judge.judge_actions(_requests(["Kick!", "punch", "bite"]))
+
+    assert "Action: kick" not in llm.prompts[-1]
+    assert judgments[0].feasibility == 1.0
+    assert cached_judge.n_hits == 1
+    assert len(cached_judge) == 3
+
+
+@pytest.mark.parametrize("batch_size", [0, "8"])
+def test_invalid_batch_size_in_config_is_rejected(tmp_path, monkeypatch, batch_size):
+    pytest.importorskip("torch")
+    from llm_rpg.game.game_config import GameConfig
+
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    config_path = Path(__file__).parents[3] / "config" / "game_config.yaml"
+    config = yaml.safe_load(config_path.read_text())
+    config["action_judge"]["batch_size"] = batch_size
+    path = tmp_path / "config" / "game_config.yaml"
+    path.parent.mkdir()
+    path.write_text(yaml.safe_dump(config))
+
+    with pytest.raises(ValueError, match="action_judge.batch_size"):
+        GameConfig(str(path)).action_judge
+
+
+def test_judgment_cache_is_skipped_for_the_judge_narrator(tmp_path, monkeypatch):
+    pytest.importorskip("torch")
+    from llm_rpg.game.game_config import GameConfig
+
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    config_path = Path(__file__).parents[3] / "config" / "game_config.yaml"
+    config = yaml.safe_load(config_path.read_text())
+    config["action_judge"]["backend"] = "judge_and_narrate"
+    config["action_judge"]["judgment_cache"] = {"max_entries": 16}
+    path = tmp_path / "config" / "game_config.yaml"
+    path.parent.mkdir()
+    path.write_text(yaml.safe_dump(config))
+    game_config = GameConfig(str(path))
+
+    with pytest.warns(RuntimeWarning, match="judgment_cache"):
+        judge = game_config.action_judge
+
+    assert isinstance(judge, LLMActionJudgeNarrator)
+    assert game_config.action_narrator is judge
@@ -0,0 +1,98 @@
+import json
+
+from llm_rpg.systems.battle.action_judges import ActionJudge, ActionJudgment
+from llm_rpg.systems.battle.judge_benchmark import (
+    load_judge_cases,
+    run_judge_benchmark,
+)
+
+
+class _KeywordJudge(ActionJudge):
+    def judge_action(
+        self,
+        proposed_action_attacker,
+        hero,
+        enemy,
+        is_hero_attacker,
+        battle_log_string,
+    ):
+        if "fail" in proposed_action_attacker:
+            raise ValueError("Failed to determine action judgment")
+        if "garbled" in proposed_action_attacker:
+            raise ValueError("Failed to determine action judgment") from (
+                json.JSONDecodeError("Expecting value", "{", 1)
+            )
+        if "sword" in proposed_action_attacker:
+            return ActionJudgment(feasibility=1.0, potential_damage=0.5)
+        return ActionJudgment(feasibility=0.0, potential_damage=0.0)
+
+
+def _write_cases(path, cases):
+    hero = {
+        "name": "Hero",
+        "description": "A knight",
+        "items": [{"name": "Sword", "description": "Sharp"}],
+    }
+    enemy = {"name": "Slime", "description": "Green"}
+    with open(path, "w") as file:
+        for action, feasibility, potential_damage in cases:
+            case = {
+                "proposed_action": action,
+                "hero": hero,
+                "enemy": enemy,
+                "reference": {
+                    "feasibility": feasibility,
+                    "potential_damage": potential_damage,
+                },
+            }
+            file.write(json.dumps(case) + "\n")
+
+
+def test_report_counts_failures_and_agreement(tmp_path):
+    path = tmp_path / "cases.jsonl"
+    _write_cases(
+        path,
+        [
+            ("swing my sword", 0.9, 0.6),
+            ("cast meteor", 0.0, 0.0),
+            ("sword flurry", 1.0, 0.0),
+            ("fail", 1.0, 1.0),
+        ],
+    )
+    cases = load_judge_cases(path)
+
+    report = run_judge_benchmark(_KeywordJudge(), cases, concurrency=2)
+
+    assert cases[0].request.hero.inventory.items[0].name == "Sword"
+    assert report.n_cases == 4
+    assert report.n_failures == 1
+    assert report.failure_rate == 0.25
+    assert report.n_parse_failures == 0
+    assert report.agreement_rate == 2 / 3
+    assert abs(report.feasibility_mae - 0.1 / 3) < 1e-9
+    assert report.latency_p50_s is not None
+
+
+def test_parse_failures_are_reported_separately(tmp_path):
+    path = tmp_path / "cases.jsonl"
+    _write_cases(
+        path,
+        [("garbled", 1.0, 1.0), ("fail", 1.0, 1.0), ("sword", 1.0, 0.5)],
+    )
+
+    report = run_judge_benchmark(_KeywordJudge(), load_judge_cases(path))
+
+    assert report.n_failures == 2
+    assert report.n_parse_failures == 1
+    assert report.parse_failure_rate == 1 / 3
+
+
+def test_batches_use_judge_actions(tmp_path):
+    path = tmp_path / "cases.jsonl"
+    _write_cases(path, [("sword", 1.0, 0.5)] * 3)
+
+    report = run_judge_benchmark(_KeywordJudge(), load_judge_cases(path), batch_size=2)
+
+    assert report.n_failures == 0
+    assert report.agreement_rate == 1.0
+    assert report.feasibility_correlation is None
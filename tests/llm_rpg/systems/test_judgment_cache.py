@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from llm_rpg.llm.llm import get_provider_llms
+from llm_rpg.llm.metrics import LLMMetricsRegistry
+from llm_rpg.systems.battle.action_judge_narrators import LLMActionJudgeNarrator
+from llm_rpg.systems.battle.action_judges import ActionJudge, ActionJudgment
+from llm_rpg.systems.battle.judgment_cache import CachedActionJudge
+
+
+class _CountingJudge(ActionJudge):
+    def __init__(self):
+        self.calls = 0
+
+    def judge_action(self, proposed_action_attacker, hero, enemy, **kwargs):
+        self.calls += 1
+        return ActionJudgment(feasibility=0.1 * self.calls, potential_damage=0.5)
+
+
+class _StubItem:
+    def __init__(self, name: str):
+        self.name = name
+        self.description = f"{name} description"
+
+
+class _StubInventory:
+    def __init__(self, items):
+        self.items = items
+
+
+class _StubCharacter:
+    def __init__(self, name: str, items=()):
+        self.name = name
+        self.description = f"{name} description"
+        self.inventory = _StubInventory(list(items))
+
+
+def _judge(cached_judge, action, hero, enemy):
+    return cached_judge.judge_action(
+        proposed_action_attacker=action,
+        hero=hero,
+        enemy=enemy,
+        is_hero_attacker=True,
+        battle_log_string="",
+    )
+
+
+def test_normalised_repeats_hit_and_new_items_miss():
+    inner = _CountingJudge()
+    metrics = LLMMetricsRegistry()
+    cached_judge = CachedActionJudge(inner, metrics=metrics)
+    hero, enemy = _StubCharacter("Hero"), _StubCharacter("Slime")
+
+    first = _judge(cached_judge, "Kick the slime!", hero, enemy)
+    assert _judge(cached_judge, "kick slime", hero, enemy) == first
+    hero.inventory.items.append(_StubItem("boots"))
+    _judge(cached_judge, "kick slime", hero, enemy)
+
+    assert inner.calls == 2
+    assert cached_judge.hit_rate == 1 / 3
+    snapshot = metrics.snapshot()["call_sites"]["judge"]["judgment_cache"]
+    assert snapshot["cache_hits"] == 1
+    assert snapshot["cache_misses"] == 2
+
+
+def test_entries_expire_and_are_evicted():
+    inner = _CountingJudge()
+    cached_judge = CachedActionJudge(inner, max_entries=1, ttl_s=0.01)
+    hero, enemy = _StubCharacter("Hero"), _StubCharacter("Slime")
+
+    _judge(cached_judge, "punch", hero, enemy)
+    time.sleep(0.02)
+    _judge(cached_judge, "punch", hero, enemy)
+    _judge(cached_judge, "kick", hero, enemy)
+
+    assert inner.calls == 3
+    assert len(cached_judge) == 1
+
+
+def test_wrapped_judge_llm_is_exposed_for_cost_reporting():
+    inner = _CountingJudge()
+    inner.llm = object()
+
+    assert get_provider_llms([CachedActionJudge(inner)]) == [inner.llm]
+    assert CachedActionJudge(_CountingJudge()).llm is None
+
+
+def test_close_is_passed_to_the_wrapped_judge():
+    class _ClosingJudge(_CountingJudge):
+        is_closed = False
+
+        def close(self):
+            self.is_closed = True
+
+    judge = _ClosingJudge()
+    CachedActionJudge(judge=judge).close()
+    assert judge.is_closed
+
+
+def test_judge_that_also_narrates_is_not_cached():
+    judge_narrator = LLMActionJudgeNarrator(
+        llm=None, prompt="{proposed_action_attacker}"
+    )
+
+    with pytest.raises(ValueError, match="narrates"):
+        CachedActionJudge(judge=judge_narrator)
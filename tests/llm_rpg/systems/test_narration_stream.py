@@ -0,0 +1,125 @@
+from llm_rpg.llm.fake_llm import Distribution, FakeLLM, LatencyProfile
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+from llm_rpg.scenes.battle.battle_states.thinking_utils import (
+    NarrationStream,
+    stream_narration,
+)
+from llm_rpg.systems.battle.action_judges import ActionJudgment
+from llm_rpg.systems.battle.action_narrators import (
+    LLMActionNarrator,
+    sanitize_narration,
+)
+
+NO_LATENCY = LatencyProfile(
+    time_to_first_token_s=Distribution(kind="fixed", value=0.0),
+    tokens_per_s=Distribution(kind="fixed", value=1e9),
+)
+
+
+class _ChunkedLLM(FakeLLM):
+    def __init__(self, chunks: list[str]):
+        super().__init__(llm_cost_tracker=LLMCostTracker(), latency_profile=NO_LATENCY)
+        self.chunks = chunks
+
+    def _generate_completion_stream(self, prompt, system_prompt=None):
+        yield from self.chunks
+
+
+class _StubInventory:
+    items = []
+
+
+class _StubCharacter:
+    def __init__(self, name: str):
+        self.name = name
+        self.description = f"{name} description"
+        self.inventory = _StubInventory()
+
+
+class _StubDamageCalculationResult:
+    total_dmg = 7
+
+
+class _StubEvent:
+    character_name = "Hero"
+    damage_calculation_result = _StubDamageCalculationResult()
+    effect_description = ""
+
+
+def _describe_action_stream(llm):
+    narrator = LLMActionNarrator(llm=llm, prompt="{proposed_action_attacker}")
+    return narrator.describe_action_stream(
+        proposed_action_attacker="kick the slime",
+        hero=_StubCharacter("Hero"),
+        enemy=_StubCharacter("Slime"),
+        is_hero_attacker=True,
+        battle_log_string="",
+        judgment=ActionJudgment(feasibility=1.0, potential_damage=0.5),
+        total_damage=7,
+    )
+
+
+def test_stream_only_emits_the_stable_sanitised_prefix():
+    chunks = ["The  slime", " ", "  swings,", " and\n", "trips"]
+
+    emitted = list(_describe_action_stream(_ChunkedLLM(chunks)))
+
+    assert emitted == ["The slime", " swings", " and", " trips"]
+    assert "".join(emitted) == sanitize_narration("".join(chunks))
+
+
+def test_streamed_fake_narration_matches_the_blocking_one():
+    llm = FakeLLM(llm_cost_tracker=LLMCostTracker(), latency_profile=NO_LATENCY)
+    narrator = LLMActionNarrator(llm=llm, prompt="{proposed_action_attacker}")
+
+    streamed = "".join(_describe_action_stream(llm))
+
+    assert streamed == narrator.describe_action(
+        proposed_action_attacker="kick the slime",
+        hero=_StubCharacter("Hero"),
+        enemy=_StubCharacter("Slime"),
+        is_hero_attacker=True,
+        battle_log_string="",
+        judgment=ActionJudgment(feasibility=1.0, potential_damage=0.5),
+        total_damage=7,
+    )
+
+
+def test_finished_stream_becomes_the_event_description():
+    llm = FakeLLM(llm_cost_tracker=LLMCostTracker(), latency_profile=NO_LATENCY)
+    narration, event = NarrationStream(), _StubEvent()
+
+    stream_narration(narration, event, _describe_action_stream(llm))
+
+    assert narration.is_done
+    assert narration.wait(0)
+    assert narration.error is None
+    assert narration.text
+    assert event.effect_description == narration.text
+
+
+def test_failed_stream_falls_back_to_the_damage_and_keeps_the_error():
+    def failing_chunks():
+        raise ValueError("narrator unavailable")
+        yield
+
+    narration, event = NarrationStream(), _StubEvent()
+
+    stream_narration(narration, event, failing_chunks())
+
+    assert narration.is_done
+    assert narration.error == "narrator unavailable"
+    assert event.effect_description == "Hero dealt 7 damage."
+
+
+def test_partially_streamed_narration_is_kept_on_failure():
+    def failing_chunks():
+        yield "The slime"
+        raise ValueError("connection reset")
+
+    narration, event = NarrationStream(), _StubEvent()
+
+    stream_narration(narration, event, failing_chunks())
+
+    assert narration.error == "connection reset"
+    assert event.effect_description == "The slime"
@@ -0,0 +1,86 @@
+import pytest
+from PIL import Image
+
+from llm_rpg.llm.fake_llm import Distribution, FakeLLM, LatencyProfile
+from llm_rpg.llm.llm_cost_tracker import LLMCostTracker
+
+pytest.importorskip("torch")
+pytest.importorskip("diffusers")
+pytest.importorskip("unfake")
+
+from llm_rpg.sprite_generator import sprite_generator  # noqa: E402
+
+NO_LATENCY = LatencyProfile(
+    time_to_first_token_s=Distribution(kind="fixed", value=0.0),
+    tokens_per_s=Distribution(kind="fixed", value=1e9),
+)
+
+
+class _StubEnemy:
+    name = "Slime"
+    description = "A green slime"
+
+
+class _StubOutput:
+    def __init__(self):
+        self.images = [Image.new("RGBA", (8, 8))]
+
+
+class _StubPipeline:
+    def __init__(self):
+        self.prompts = []
+
+    def __call__(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return _StubOutput()
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    pipelines = []
+
+    def load_pipeline(self):
+        pipelines.append(_StubPipeline())
+        return pipelines[-1]
+
+    monkeypatch.setattr(
+        sprite_generator.SDSpriteGenerator, "_load_pipeline", load_pipeline
+    )
+    # no unfake cleanup and no display needed for convert_alpha
+    monkeypatch.setattr(sprite_generator, "_clean_sprite", lambda sprite: sprite)
+    monkeypatch.setattr(sprite_generator, "_pil_to_surface", lambda sprite: sprite)
+    generator = sprite_generator.SDSpriteGenerator(
+        base_model="base.safetensors",
+        lora_path="style.safetensors",
+        trigger_prompt="pixel art",
+        prompt_llm=FakeLLM(
+            llm_cost_tracker=LLMCostTracker(), latency_profile=NO_LATENCY
+        ),
+        prompt_template="Describe {enemy_description}",
+    )
+    return generator, pipelines
+
+
+def test_pipeline_is_loaded_once_and_kept_resident(generator):
+    generator, pipelines = generator
+
+    generator.warmup()
+    sprites = [generator.generate_sprite(_StubEnemy()) for _ in range(3)]
+
+    assert len(pipelines) == 1
+    assert len(pipelines[0].prompts) == 4
+    assert all(prompt.startswith("pixel art") for prompt in pipelines[0].prompts)
+    assert all(sprite.size == (8, 8) for sprite in sprites)
+
+
+def test_generate_sprite_after_close_raises(generator):
+    generator, pipelines = generator
+    generator.generate_sprite(_StubEnemy())
+
+    generator.close()
+
+    with pytest.raises(ValueError, match="closed"):
+        generator.generate_sprite(_StubEnemy())
+    with pytest.raises(ValueError, match="closed"):
+        generator.warmup()
+    assert len(pipelines) == 1
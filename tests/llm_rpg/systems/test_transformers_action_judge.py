@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+
+from llm_rpg.systems.battle.action_judges import (
+    ActionJudgeRequest,
+    ActionJudgment,
+    TransformersActionJudge,
+)
+from llm_rpg.systems.battle.judge_benchmark import BenchmarkCharacter, JudgeCase
+from llm_rpg.systems.battle.train_judge import train_judge_model
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "kick", "the", "slime"]
+
+
+def _save_tiny_judge(path, feasibility_logit=5.0, potential_damage_logit=-5.0):
+    path.mkdir(exist_ok=True)
+    (path / "vocab.txt").write_text("\n".join(VOCAB))
+    transformers.BertTokenizerFast(vocab_file=str(path / "vocab.txt")).save_pretrained(
+        path
+    )
+    torch.manual_seed(0)
+    model = transformers.BertForSequenceClassification(
+        transformers.BertConfig(
+            vocab_size=len(VOCAB),
+            hidden_size=16,
+            num_hidden_layers=1,
+            num_attention_heads=2,
+            intermediate_size=32,
+            max_position_embeddings=128,
+            num_labels=2,
+            problem_type="regression",
+        )
+    )
+    # constant logits outside 0-1, so the output only depends on the clamp
+    with torch.no_grad():
+        model.classifier.weight.zero_()
+        model.classifier.bias.copy_(
+            torch.tensor([feasibility_logit, potential_damage_logit])
+        )
+    model.save_pretrained(path)
+    return str(path)
+
+
+def _get_request(action: str) -> ActionJudgeRequest:
+    return ActionJudgeRequest(
+        proposed_action_attacker=action,
+        hero=BenchmarkCharacter(name="Hero", description="A knight"),
+        enemy=BenchmarkCharacter(name="Slime", description="A slime"),
+        is_hero_attacker=True,
+        battle_log_string="the slime attacks",
+    )
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_judgments_are_clamped_and_batched_in_chunks(tmp_path, quantize):
+    judge = TransformersActionJudge(
+        _save_tiny_judge(tmp_path), quantize=quantize, max_batch_size=2
+    )
+    try:
+        judgments = judge.judge_actions(
+            [_get_request(action) for action in ["kick", "kick the", "kick slime"]]
+        )
+    finally:
+        judge.close()
+
+    assert len(judgments) == 3
+    for judgment in judgments:
+        assert judgment.feasibility == 1.0
+        assert judgment.potential_damage == 0.0
+    assert judge.batcher.n_requests == 3
+    assert judge.batcher.n_batches >= 2
+
+
+def test_concurrent_judgments_share_one_forward_pass(tmp_path):
+    judge = TransformersActionJudge(_save_tiny_judge(tmp_path), max_batch_wait_s=0.5)
+    barrier = threading.Barrier(3)
+    judgments = []
+
+    def judge_action(action: str):
+        request = _get_request(action)
+        barrier.wait()
+        judgments.append(
+            judge.judge_action(
+                proposed_action_attacker=request.proposed_action_attacker,
+                hero=request.hero,
+                enemy=request.enemy,
+                is_hero_attacker=request.is_hero_attacker,
+                battle_log_string=request.battle_log_string,
+            )
+        )
+
+    threads = [
+        threading.Thread(target=judge_action, args=(action,))
+        for action in ["kick", "kick the", "kick slime"]
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    judge.close()
+
+    assert len(judgments) == 3
+    assert judge.batcher.n_batches == 1
+    assert judge.batcher.n_requests == 3
+
+
+def test_trained_judge_loads_and_warms_up(tmp_path):
+    base_model = _save_tiny_judge(tmp_path / "base")
+    cases = [
+        JudgeCase(
+            request=_get_request(action),
+            reference=ActionJudgment(feasibility=1.0, potential_damage=0.5),
+        )
+        for action in ["kick", "kick the slime"]
+    ]
+
+    train_judge_model(cases, str(tmp_path / "judge"), base_model=base_model, n_epochs=1)
+    judge = TransformersActionJudge(str(tmp_path / "judge"))
+    try:
+        assert judge.batcher.n_batches == 0
+        judge.warmup()
+        assert judge.batcher.n_batches == 1
+        (judgment,) = judge.judge_actions([cases[0].request])
+    finally:
+        judge.close()
+
+    assert 0 <= judgment.feasibility <= 1
+    assert 0 <= judgment.potential_damage <= 1